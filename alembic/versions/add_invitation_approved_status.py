@@ -0,0 +1,28 @@
+"""
+Add the approved invitation status
+
+Revision ID: add_invitation_approved_status
+Revises: add_invitation_message_ids
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_invitation_approved_status'
+down_revision = 'add_invitation_message_ids'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A new enum value cannot be used in the transaction that adds it
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE invitationstatus ADD VALUE IF NOT EXISTS 'approved'")
+
+
+def downgrade():
+    # Postgres cannot drop an enum value; approved invitations go back to accepted
+    op.execute("UPDATE invitations SET status = 'accepted' WHERE status = 'approved'")
@@ -0,0 +1,43 @@
+"""
+Record the messages carrying each invitation's buttons
+
+Revision ID: add_invitation_message_ids
+Revises: add_team_logo_url
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_invitation_message_ids'
+down_revision = 'add_team_logo_url'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ['dm_channel_id', 'dm_message_id', 'approval_channel_id', 'approval_message_id']
+
+
+def upgrade():
+    for column in COLUMNS:
+        op.add_column('invitations', sa.Column(column, sa.BigInteger(), nullable=True))
+    # The expiry sweep looks for pending invitations past their expiry.
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_invitations_expires_at_pending', 'invitations', ['expires_at'],
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'pending'"),
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_invitations_expires_at_pending', table_name='invitations',
+            postgresql_concurrently=True, if_exists=True
+        )
+    for column in reversed(COLUMNS):
+        op.drop_column('invitations', column)
@@ -0,0 +1,50 @@
+"""
+Add indexes for hot repository lookups
+
+Revision ID: add_performance_indexes
+Revises: 5d5539910427
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_performance_indexes'
+down_revision = '5d5539910427'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns, partial index predicate)
+INDEXES = [
+    ('ix_team_members_user_id', 'team_members', ['user_id'], None),
+    ('ix_invitations_user_id_pending', 'invitations', ['user_id'], "status = 'pending'"),
+    ('ix_invitations_inviter_id_pending', 'invitations', ['inviter_id'], "status = 'pending'"),
+    ('ix_scrims_status_open', 'scrims', ['status'], "status = 'open'"),
+    ('ix_scrims_message_id', 'scrims', ['message_id'], None),
+    ('ix_scrims_creator_id', 'scrims', ['creator_id'], None),
+    ('ix_scrims_opponent_id', 'scrims', ['opponent_id'], None),
+    ('ix_users_roblox_username', 'users', ['roblox_username'], None),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
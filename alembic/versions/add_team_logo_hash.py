@@ -0,0 +1,26 @@
+"""
+Add content hash of the stored logo to teams
+
+Revision ID: add_team_logo_hash
+Revises: add_performance_indexes
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_team_logo_hash'
+down_revision = 'add_performance_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Logos are now stored as LOGO_PATH/<sha256>.<ext>; the row keeps the hash
+    op.add_column('teams', sa.Column('logo_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column('teams', 'logo_hash')
@@ -0,0 +1,27 @@
+"""
+Store the uploaded logo's CDN URL on teams
+
+Revision ID: add_team_logo_url
+Revises: add_team_logo_hash
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_team_logo_url'
+down_revision = 'add_team_logo_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('teams', sa.Column('logo_url', sa.String(length=512), nullable=True))
+    op.add_column('teams', sa.Column('logo_url_hash', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    op.drop_column('teams', 'logo_url_hash')
+    op.drop_column('teams', 'logo_url')
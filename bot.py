@@ -1,41 +1,121 @@
-from discord import guild
 from discord.ext import commands
-from intents import get_intents
-from config import BOT_TOKEN
-from database.db import init_db
+from intents import get_bot_options, intents_report
+from config import BOT_TOKEN, BOT_SHARDED
+from database.db import init_db, close_async_engine
+from database.invalidation import invalidation_listener
+from database.repository.server_config_repository import ServerConfigRepository
+from database.repository.user_repository import UserRepository
+from utils.bloxlink import BloxlinkAPI
+from utils.cache import cache
+from utils.command_sync import sync_changed_commands, attach_command_ids
+from utils.sharding import get_shard_options, local_shard_ids
+from utils.transaction_log import transaction_log
+from images.image_processor import shutdown_executor
 import asyncio
-import os
+
+COG_FILES = ['team_commands', 'verification_commands', 'member_events', 'shard_events', 'scrim_commands']
+
+# One gateway connection, or several shards (optionally split across processes)
+BotBase = commands.AutoShardedBot if BOT_SHARDED else commands.Bot
+
+
+class EraLeagueBot(BotBase):
+    """Bot that owns the lifecycle of shared clients (HTTP pool, database engine, logo workers)."""
+
+    def __init__(self, *args, **kwargs):
+        # Commands are synced by sync_changed_commands, not on every connect
+        super().__init__(*args, auto_sync_commands=False, **kwargs)
+        self._started = False
+        self._commands_synced = False
+
+    async def start(self, token: str, *, reconnect: bool = True) -> None:
+        if not self._started:
+            await self.startup()
+            self._started = True
+        await super().start(token, reconnect=reconnect)
+
+    async def startup(self) -> None:
+        """One-time startup, run before connecting: schema check, cache warm-up, cogs."""
+        await BloxlinkAPI.open()
+
+        # Schema check runs once per process, off the event loop
+        await asyncio.to_thread(init_db)
+
+        # Evict in-process cache entries when other processes write
+        invalidation_listener.start()
+
+        # Audit records are written in the background from here on
+        transaction_log.start()
+
+        # Warm the per-guild config cache in one query
+        try:
+            loaded = await ServerConfigRepository().load_all()
+            print(f'Loaded {loaded} server configurations')
+        except Exception as e:
+            print(f'Failed to load server configurations: {e}')
+
+        # Warm the verified-user set used by the verification gate
+        try:
+            verified = await UserRepository().load_verified_ids()
+            print(f'Loaded {verified} verified users')
+        except Exception as e:
+            print(f'Failed to load verified users: {e}')
+
+        for cog in COG_FILES:
+            try:
+                self.load_extension(f'cogs.{cog}')
+                print(f'Successfully loaded extension {cog}')
+            except Exception as e:
+                print(f'Failed to load cog {cog}: {str(e)}')
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            await BloxlinkAPI.close()
+            # Flush queued audit records while the database engine is still open
+            await transaction_log.close()
+            await invalidation_listener.stop()
+            await cache.close()
+            await close_async_engine()
+            shutdown_executor()
+
 
 # Define bot with intents
-bot = commands.Bot(
+bot = EraLeagueBot(
     command_prefix='!',
-    intents=get_intents()
+    **get_bot_options(),
+    **get_shard_options()
 )
 
-# Load cogs in the on_ready event
+# on_ready fires again after every reconnect, so it only does per-session work
 @bot.event
 async def on_ready():
     print(f'Logged in as {bot.user.name} - {bot.user.id}')
     print('------')
-    init_db()
-    
-    # Load all cogs manually without await expressions
-    cog_files = ['team_commands', 'verification_commands', 'scrim_commands']
-    for cog in cog_files:
+
+    if bot._commands_synced:
+        return
+
+    print(intents_report(bot))
+    print(f"Running shards {', '.join(map(str, local_shard_ids(bot)))} of {bot.shard_count or 1}")
+
+    # With shards split across processes, only the process running shard 0 syncs
+    if 0 not in local_shard_ids(bot):
         try:
-            # Use load_extension directly, not async
-            bot.load_extension(f'cogs.{cog}')
-            print(f'Successfully loaded extension {cog}')
+            await attach_command_ids(bot)
+            bot._commands_synced = True
         except Exception as e:
-            print(f'Failed to load cog {cog}: {str(e)}')
-    
+            print(f"Error loading command IDs: {e}")
+        return
+
     try:
-        # Sync commands globally - this is a Pycord 2.x compatible method
-        print("Syncing commands globally...")
-        guild_id = 1062306579636047892  # Your guild ID
-        # For Pycord, we can just use the sync_commands method
-        await bot.sync_commands()
-        print(f"Synced commands globally")
+        synced = await sync_changed_commands(bot)
+        bot._commands_synced = True
+        if synced:
+            print(f"Synced commands for: {', '.join(synced)}")
+        else:
+            print("Command tree unchanged, skipped sync")
     except Exception as e:
         print(f"Error syncing commands: {e}")
 
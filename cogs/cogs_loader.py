@@ -7,6 +7,8 @@ import asyncio
 COGS = [
     'team_commands',
     'verification_commands',
+    'member_events',
+    'shard_events',
     #'scrim_commands',
     # Add other cog names here
 ]
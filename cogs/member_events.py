@@ -0,0 +1,51 @@
+import discord
+from discord.ext import commands
+from utils.member_index import member_index
+
+
+class MemberEvents(commands.Cog):
+    """Keeps the member name index in step with the gateway."""
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # Guilds already cached when the cog loads
+        for guild in bot.guilds:
+            member_index.rebuild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        member_index.rebuild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        member_index.rebuild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        member_index.drop_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        member_index.add(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.name != after.name or before.nick != after.nick:
+            member_index.add(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        # Username changes arrive as user updates, not per-guild member updates
+        if before.name == after.name:
+            return
+        for guild in self.bot.guilds:
+            member = guild.get_member(after.id)
+            if member:
+                member_index.add(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        member_index.remove(member.guild.id, member.id)
+
+
+def setup(bot: commands.Bot):
+    bot.add_cog(MemberEvents(bot))
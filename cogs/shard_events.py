@@ -0,0 +1,73 @@
+import discord
+from discord.ext import commands, tasks
+from config import HOME_GUILD_ID, SHARD_METRICS_INTERVAL
+from utils.sharding import shard_metrics, local_shard_ids
+from cogs.permissions.admin_checker import is_admin
+
+
+class ShardEvents(commands.Cog):
+    """Feeds the per-shard metrics from gateway connection events."""
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.sharded = isinstance(bot, discord.AutoShardedClient)
+        self.sample_shards.change_interval(seconds=SHARD_METRICS_INTERVAL)
+        self.sample_shards.start()
+
+    def cog_unload(self):
+        self.sample_shards.cancel()
+
+    @tasks.loop(seconds=60)
+    async def sample_shards(self):
+        shard_metrics.sample(self.bot)
+
+    @sample_shards.before_loop
+    async def before_sample_shards(self):
+        await self.bot.wait_until_ready()
+
+    # Sharded clients report per shard; a single connection uses the plain events
+    @commands.Cog.listener()
+    async def on_shard_connect(self, shard_id: int):
+        shard_metrics.record_connect(shard_id)
+
+    @commands.Cog.listener()
+    async def on_shard_resumed(self, shard_id: int):
+        shard_metrics.record_resume(shard_id)
+
+    @commands.Cog.listener()
+    async def on_shard_disconnect(self, shard_id: int):
+        shard_metrics.record_disconnect(shard_id)
+
+    @commands.Cog.listener()
+    async def on_connect(self):
+        if not self.sharded:
+            shard_metrics.record_connect(self.bot.shard_id)
+
+    @commands.Cog.listener()
+    async def on_resumed(self):
+        if not self.sharded:
+            shard_metrics.record_resume(self.bot.shard_id)
+
+    @commands.Cog.listener()
+    async def on_disconnect(self):
+        if not self.sharded:
+            shard_metrics.record_disconnect(self.bot.shard_id)
+
+    @commands.slash_command(name="shard-stats", guild_ids=[HOME_GUILD_ID])
+    @commands.check(is_admin)
+    async def shard_stats(self, ctx: discord.ApplicationContext):
+        """
+        Show latency, event rate and reconnects for the shards this process runs (admin only).
+        """
+        shard_ids = local_shard_ids(self.bot)
+
+        embed = discord.Embed(
+            title="Shard Statistics",
+            description="\n".join(shard_metrics.describe(self.bot)),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Shards {', '.join(map(str, shard_ids))} of {self.bot.shard_count or 1} in this process")
+        await ctx.respond(embed=embed, ephemeral=True)
+
+
+def setup(bot: commands.Bot):
+    bot.add_cog(ShardEvents(bot))
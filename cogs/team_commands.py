@@ -1,6 +1,6 @@
 from re import S
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.commands import Option
 from datetime import datetime
 from typing import Union, Optional, Literal
@@ -11,19 +11,33 @@ from database.repository.team_member_repository import TeamMemberRepository
 from database.repository.user_repository import UserRepository
 from database.repository.invitation_repository import InvitationRepository
 from database.repository.server_config_repository import ServerConfigRepository
+from database.repository.session_manager import unit_of_work
 
 # Import models and enums
 from database.models.team_member import RoleType
 from database.models.user import PositionType
 from database.models.team import Team
 from database.models.invitation import InvitationStatus
+from database.models.transaction import ActionType
 
 # Import verification decorator
 from cogs.verification_commands import require_verification
 from cogs.permissions.admin_checker import is_admin
-from images.image_downloader import download_and_save_image
-from cogs.views.invitation_views import PlayerInviteView, AdminApprovalView
+from images.image_downloader import download_logo, LogoDownloadError
+from images.image_processor import normalize_logo, import_logo, logo_file_for, thumbnail_path_for, LogoProcessingError
+from images.logo_cdn import logo_key, cached_logo_url, uploaded_logo_url
+from utils.member_resolver import resolve_members, resolve_member, display_name
+from utils.member_index import find_members_by_name
+from utils.sharding import get_local_guild
+from utils.transaction_log import transaction_log
+from config import HOME_GUILD_ID
+from cogs.views.invitation_views import (
+    PlayerInviteView, AdminApprovalView, RejectionReasonModal,
+    parse_invitation_custom_id, PLAYER_ACTIONS
+)
+import asyncio
 import datetime
+import os
 
 class TeamCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -33,10 +47,76 @@ class TeamCommands(commands.Cog):
         self.invitation_repository = InvitationRepository()
         self.server_config_repository = ServerConfigRepository()
         self.user_repository = UserRepository()
-        # Cache to track pending invitations per inviter
-        self.pending_invites_cache = {}
         # Maximum number of pending invitations allowed per captain/vice-captain
         self.max_pending_invites = 3
+        self.expire_invitations.start()
+    
+    def cog_unload(self):
+        self.expire_invitations.cancel()
+    
+    @tasks.loop(minutes=5)
+    async def expire_invitations(self):
+        """Expire overdue invitations in one statement and update their messages in a batch."""
+        try:
+            expired = await self.invitation_repository.expire_due()
+        except Exception as e:
+            print(f"Error expiring invitations: {e}")
+            return
+        if expired:
+            await self._announce_expired(expired)
+    
+    @expire_invitations.before_loop
+    async def before_expire_invitations(self):
+        await self.bot.wait_until_ready()
+    
+    async def _announce_expired(self, invitations: list) -> None:
+        """
+        Update the DM and approval messages of expired invitations and tell each
+        inviter once about all of their expired invitations.
+
+        Args:
+            invitations: The invitations expired in this tick
+        """
+        semaphore = asyncio.Semaphore(5)
+        expired_embed = discord.Embed(
+            title="Team Invitation Expired",
+            description="This invitation has expired.",
+            color=discord.Color.light_grey()
+        )
+        
+        async def edit_message(channel_id: int, message_id: int) -> None:
+            async with semaphore:
+                try:
+                    message = self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+                    await message.edit(embed=expired_embed, view=None)
+                except discord.HTTPException:
+                    pass
+        
+        async def notify_inviter(inviter_id: int, lines: list) -> None:
+            async with semaphore:
+                try:
+                    inviter = self.bot.get_user(inviter_id) or await self.bot.fetch_user(inviter_id)
+                    await inviter.send("These team invitations expired without a response:\n" + "\n".join(lines))
+                except discord.HTTPException:
+                    pass
+        
+        teams = await self.team_repository.get_by_ids([invitation.team_id for invitation in invitations])
+        jobs = []
+        by_inviter = {}
+        for invitation in invitations:
+            if invitation.dm_message_id:
+                jobs.append(edit_message(invitation.dm_channel_id, invitation.dm_message_id))
+            if invitation.approval_message_id:
+                jobs.append(edit_message(invitation.approval_channel_id, invitation.approval_message_id))
+            
+            team = teams.get(invitation.team_id)
+            team_name = team.name if team else f"Team (ID: {invitation.team_id})"
+            by_inviter.setdefault(invitation.inviter_id, []).append(f"- <@{invitation.user_id}> to '{team_name}'")
+        
+        for inviter_id, lines in by_inviter.items():
+            jobs.append(notify_inviter(inviter_id, lines))
+        
+        await asyncio.gather(*jobs)
 
     @commands.slash_command(name="create-team")
     @commands.check(is_admin)
@@ -65,20 +145,29 @@ class TeamCommands(commands.Cog):
             await ctx.respond("Hex code is required.")
             return
 
+        logo_hash = None
         if not logo_url:
             logo_path = "images/nologo.png"
         else:
-            logo_path = download_and_save_image(logo_url, team_name)
+            await ctx.defer()
+            try:
+                logo_hash, logo_path = await download_logo(logo_url)
+                await normalize_logo(logo_path, logo_hash)
+            except (LogoDownloadError, LogoProcessingError) as e:
+                await ctx.respond(str(e))
+                return
 
         team_obj = await self.team_repository.create(create_role_func=self._create_role,
                                                ctx=ctx,
                                                name=team_name, 
                                                hexcode=hexcode, 
-                                               logo_path=logo_path)
+                                               logo_path=logo_path,
+                                               logo_hash=logo_hash)
         if not team_obj:
             await ctx.respond(f"Team '{team_name}' already exists.")
             return
         
+        transaction_log.record(ActionType.team_create, ctx.author, team_id=team_obj.team_id, name=team_name)
         await ctx.respond(f"Team '{team_name}' created successfully!")
 
     # TODO: Set the user as captain, gotta make all the roblox verification system first and all that
@@ -119,14 +208,18 @@ class TeamCommands(commands.Cog):
             team_name (str): The name of the team.
             user (str): The user to set as the captain.
         """
-        team_obj = self.team_repository.get_by_name(team_name)
+        team_obj = await self.team_repository.get_by_name(team_name)
         if not team_obj:
             await ctx.respond(f"Team '{team_name}' not found.")
             return
         
-        user = await ctx.guild.fetch_member(int(user) if not user.startswith("<@") else int(user[2:-1]))
+        user_id = int(user) if not user.startswith("<@") else int(user.strip("<@!>"))
+        user = await resolve_member(ctx.guild, user_id)
+        if not user:
+            await ctx.respond(f"User <@{user_id}> is not in this server.")
+            return
         
-        team_member = self.team_member_repository.get_by_user_id(user.id)
+        team_member = await self.team_member_repository.get_by_user_id(user.id)
         if not team_member:
             await ctx.respond(f"User {user.mention} is not a member of any team.")
             return
@@ -139,14 +232,19 @@ class TeamCommands(commands.Cog):
             await ctx.respond(f"User {user.mention} is already the {role.name} of team '{team_name}'.")
             return
         
-        # Update the team's captain_id field
-        if not vice_captain:
-            self.team_repository.update(team_id=team_obj.team_id, team_captain_id=team_member.user_id)
-        else:
-            self.team_repository.update(team_id=team_obj.team_id)
-        
-        # Use the specialized update_role method to avoid primary key constraint issues
-        self.team_member_repository.update_role(team_id=team_obj.team_id, user_id=team_member.user_id, role=role)
+        async with unit_of_work():
+            # Update the team's captain_id field
+            if not vice_captain:
+                await self.team_repository.update(team_id=team_obj.team_id, team_captain_id=team_member.user_id)
+            else:
+                await self.team_repository.update(team_id=team_obj.team_id)
+            
+            # Use the specialized update_role method to avoid primary key constraint issues
+            await self.team_member_repository.update_role(team_id=team_obj.team_id, user_id=team_member.user_id, role=role)
+        transaction_log.record(
+            ActionType.role_change, ctx.author, team_id=team_obj.team_id, user_id=team_member.user_id,
+            previous_role=team_member.role.value, role=role.value
+        )
         await ctx.respond(f"{role.name.title()} for team '{team_obj.name}' set to {user.mention}.")
         
     @commands.slash_command(name="search-team")
@@ -159,25 +257,26 @@ class TeamCommands(commands.Cog):
             ctx (discord.ApplicationContext): The context of the command.
             team_name (str): The name of the team to search for.
         """
-        team_obj = self.team_repository.get_by_name(team_name)
+        team_obj = await self.team_repository.get_by_name(team_name)
         if not team_obj:
             await ctx.respond(f"Team '{team_name}' not found.")
             return
         
         team_title = f"**{team_obj.name}**"
         team_role = ctx.guild.get_role(team_obj.team_role_id)
-        file = discord.File(team_obj.logo_path, filename="logo.png")
-        
-        if not file:
-            file = discord.File("images/nologo.png", filename="nologo.png")
-            
-        logo_url = "attachment://logo.png" if file else "attachment://nologo.png"
+        # Reuse the CDN copy of the logo if it is current; otherwise upload the thumbnail once
+        current_logo_key = logo_key(team_obj.logo_hash, team_obj.logo_path)
+        logo_url = cached_logo_url(team_obj.logo_url, team_obj.logo_url_hash, current_logo_key)
+        file = None
+        if not logo_url:
+            file = discord.File(logo_file_for(team_obj.logo_path, team_obj.logo_hash), filename="logo.png")
+            logo_url = "attachment://logo.png"
 
         extra_info = f"""
         Team role: <@&{team_role.id}>
         Team color: {team_obj.hexcode}
         Team captain: <@{team_obj.team_captain_id if team_obj.team_captain_id else "None"}>
-        Total members: {len(self.team_member_repository.get_by_team_id(team_obj.team_id))}
+        Total members: {len(await self.team_member_repository.get_by_team_id(team_obj.team_id))}
         """
 
         embed = discord.Embed(
@@ -186,9 +285,49 @@ class TeamCommands(commands.Cog):
             color=discord.Color(int(team_obj.hexcode[1:], 16))
         )
         embed.set_thumbnail(url=logo_url)
-        embed.add_field(name="🔹 Current Roster", value=self._fetch_team_players(team_obj.team_id), inline=True)
+        embed.add_field(name="🔹 Current Roster", value=await self._fetch_team_players(team_obj.team_id), inline=True)
         embed.add_field(name="🔹 Extra info", value=extra_info, inline=True)
-        await ctx.respond(embed=embed, files=[file])
+        if not file:
+            await ctx.respond(embed=embed)
+            return
+
+        response = await ctx.respond(embed=embed, files=[file])
+        message = await response.original_response() if isinstance(response, discord.Interaction) else response
+        uploaded_url = uploaded_logo_url(message)
+        if uploaded_url:
+            await self.team_repository.update(team_id=team_obj.team_id, logo_url=uploaded_url, logo_url_hash=current_logo_key)
+
+    @commands.slash_command(name="normalize-logos")
+    @commands.check(is_admin)
+    async def normalize_logos(self, ctx: discord.ApplicationContext) -> None:
+        """
+        Backfill normalized logos and thumbnails for every team (admin only).
+
+        Args:
+            ctx (discord.ApplicationContext): The context of the command.
+        """
+        await ctx.defer(ephemeral=True)
+        processed, failed = 0, []
+        for team in await self.team_repository.get_all():
+            try:
+                if team.logo_hash:
+                    if os.path.exists(thumbnail_path_for(team.logo_hash)):
+                        continue
+                    await normalize_logo(team.logo_path, team.logo_hash)
+                elif team.logo_path and team.logo_path != "images/nologo.png" and os.path.exists(team.logo_path):
+                    # Logo from before content-addressed storage: import it first
+                    logo_hash, logo_path = await import_logo(team.logo_path)
+                    await self.team_repository.update(team_id=team.team_id, logo_hash=logo_hash, logo_path=logo_path)
+                else:
+                    continue
+                processed += 1
+            except (LogoProcessingError, OSError):
+                failed.append(team.name)
+
+        message = f"Normalized {processed} team logos."
+        if failed:
+            message += f" Failed: {', '.join(failed)}"
+        await ctx.respond(message, ephemeral=True)
 
     @commands.slash_command(name="force-add-player-to-team")
     @commands.check(is_admin)
@@ -202,17 +341,18 @@ class TeamCommands(commands.Cog):
             team_name (str): The name of the team.
             user (discord.Member): The user to add to the team.
         """
-        team_obj = self.team_repository.get_by_name(team_name)
+        team_obj = await self.team_repository.get_by_name(team_name)
         if not team_obj:
             await ctx.respond(f"Team '{team_name}' not found.")
             return
         
-        team_member = self.team_member_repository.get_by_user_id(user.id)
+        team_member = await self.team_member_repository.get_by_user_id(user.id)
         if team_member:
             await ctx.respond(f"User {user.mention} is already a member of team '{team_obj.name}'.")
             return
         
-        self.team_member_repository.create(team_id=team_obj.team_id, user_id=user.id, role=RoleType.member, team_display_name=user.display_name)
+        await self.team_member_repository.create(team_id=team_obj.team_id, user_id=user.id, role=RoleType.member, team_display_name=user.display_name)
+        transaction_log.record(ActionType.join, ctx.author, team_id=team_obj.team_id, user_id=user.id, forced=True)
         await user.add_roles(ctx.guild.get_role(team_obj.team_role_id))
         await ctx.respond(f"User {user.mention} added to team '{team_obj.name}'.")
         
@@ -228,17 +368,18 @@ class TeamCommands(commands.Cog):
             team_name (str): The name of the team.
             user (discord.Member): The user to kick from the team.
         """
-        team_obj = self.team_repository.get_by_name(team_name)
+        team_obj = await self.team_repository.get_by_name(team_name)
         if not team_obj:
             await ctx.respond(f"Team '{team_name}' not found.")
             return
         
-        team_member = self.team_member_repository.get_by_user_id(user.id)
+        team_member = await self.team_member_repository.get_by_user_id(user.id)
         if not team_member:
             await ctx.respond(f"User {user.mention} is not a member of team '{team_obj.name}'.")
             return
         
-        self.team_member_repository.delete(user.id)
+        await self.team_member_repository.delete(user.id)
+        transaction_log.record(ActionType.kick, ctx.author, team_id=team_member.team_id, user_id=user.id, forced=True)
         await user.remove_roles(ctx.guild.get_role(team_obj.team_role_id))
         await ctx.respond(f"User {user.mention} kicked from team '{team_obj.name}'.")
 
@@ -254,13 +395,13 @@ class TeamCommands(commands.Cog):
             rating (float): Rating from 0 to 5 stars (can use half stars like 3.5).
         """
         # First check if user exists in database
-        user_obj = self.user_repository.get_by_id(user.id)
+        user_obj = await self.user_repository.get_by_id(user.id)
         if not user_obj:
             await ctx.respond(f"User {user.mention} does not exist in the database.", ephemeral=True)
             return
         
         # Set the rating in the User model
-        updated_user = self.user_repository.set_player_rating(user.id, rating)
+        updated_user = await self.user_repository.set_player_rating(user.id, rating)
         if not updated_user:
             await ctx.respond(f"Failed to update rating for {user.mention}.", ephemeral=True)
             return
@@ -283,13 +424,13 @@ class TeamCommands(commands.Cog):
             position (str): The volleyball position.
         """
         # First check if user exists in database
-        user_obj = self.user_repository.get_by_id(user.id)
+        user_obj = await self.user_repository.get_by_id(user.id)
         if not user_obj:
             await ctx.respond(f"User {user.mention} does not exist in the database.", ephemeral=True)
             return
         
         # Set the position in the User model
-        updated_user = self.user_repository.set_player_position(user.id, position)
+        updated_user = await self.user_repository.set_player_position(user.id, position)
         if not updated_user:
             await ctx.respond(f"Failed to update position for {user.mention}.", ephemeral=True)
             return
@@ -310,7 +451,7 @@ class TeamCommands(commands.Cog):
             limit (int): Number of players to show (default 10).
         """
         # Get top players for the specified position
-        top_players = self.user_repository.get_top_players_by_position(position.lower().replace(' ', '_'), limit)
+        top_players = await self.user_repository.get_top_players_by_position(position.lower().replace(' ', '_'), limit)
         
         if not top_players:
             await ctx.respond(f"No rated players found for position: {position}", ephemeral=True)
@@ -323,18 +464,16 @@ class TeamCommands(commands.Cog):
             color=discord.Color.gold()
         )
         
+        # Resolve every ranked player at once (member cache first, then batched lookups)
+        members = await resolve_members(ctx.guild, [player.user_id for player in top_players])
+        
         # Add player entries to the embed
         for i, player in enumerate(top_players):
             # Format the rating as stars
             star_display = self._format_rating_stars(player.rating)
             
-            # Format the player entry
-            try:
-                discord_user = await ctx.guild.fetch_member(player.user_id)
-                player_name = discord_user.name
-            except:
-                # Use the database name if we can't fetch the member
-                player_name = player.display_name or player.username
+            # Fall back to the database name if the player is not in the guild
+            player_name = display_name(player.user_id, members, player)
                 
             embed.add_field(
                 name=f"#{i+1}: {player_name}",
@@ -355,8 +494,8 @@ class TeamCommands(commands.Cog):
             ctx (discord.ApplicationContext): The context of the command.
             limit (int): Maximum number of teams to display. Defaults to 25.
         """
-        # Get all teams from the database with the optional limit
-        teams = self.team_repository.get_all(limit=limit)
+        # Get teams with their captain, vice captain and member count in a single query
+        teams = await self.team_repository.get_summaries(limit=limit)
         
         if not teams:
             await ctx.respond("No teams found in the database.", ephemeral=True)
@@ -382,9 +521,6 @@ class TeamCommands(commands.Cog):
             timestamp=datetime.datetime.now()
         )
         
-        # Import the RoleType at the top level
-        from database.models.team_member import RoleType
-        
         teams_list = ""
         captains_list = ""
         vices_list = ""
@@ -393,21 +529,14 @@ class TeamCommands(commands.Cog):
         for team in teams:
             # Get team role mention
             role_mention = f"<@&{team.team_role_id}>" if team.team_role_id else "No role assigned"
-            teams_list += f"{role_mention}\n"
-            
-            # Get all members of this team
-            team_members = self.team_member_repository.get_by_team_id(team.team_id)
-            
-            # Find captain and vice captain
-            captain = next((member for member in team_members if member.role == RoleType.captain), None) if team_members else None
-            vice_captain = next((member for member in team_members if member.role == RoleType.vice_captain), None) if team_members else None
+            teams_list += f"{role_mention} ({team.member_count})\n"
             
             # Format captain information
-            captain_info = f"<@{captain.user_id}>" if captain else "*None*"
+            captain_info = f"<@{team.captain_id}>" if team.captain_id else "*None*"
             captains_list += f"{captain_info}\n"
             
             # Format vice captain information
-            vice_info = f"<@{vice_captain.user_id}>" if vice_captain else "*None*"
+            vice_info = f"<@{team.vice_captain_id}>" if team.vice_captain_id else "*None*"
             vices_list += f"{vice_info}\n"
         
         # Add fields to the embed
@@ -417,8 +546,8 @@ class TeamCommands(commands.Cog):
         
         await ctx.respond(embed=embed)
     
-    def _fetch_team_players(self, team_id: int) -> str:
-        roster_members = self.team_member_repository.get_by_team_id(team_id)
+    async def _fetch_team_players(self, team_id: int) -> str:
+        roster_members = await self.team_member_repository.get_by_team_id(team_id)
         if not roster_members:
             return "- No players added yet."
         
@@ -467,7 +596,7 @@ class TeamCommands(commands.Cog):
             ctx (discord.ApplicationContext): The context of the command.
             channel (discord.TextChannel): The channel to use for approvals.
         """
-        config = self.server_config_repository.set_approval_channel(ctx.guild.id, channel.id)
+        config = await self.server_config_repository.set_approval_channel(ctx.guild.id, channel.id)
         await ctx.respond(f"Team invitation approval channel set to {channel.mention}.", ephemeral=True)
         
     async def _verify_team_and_team_member(self, ctx: discord.ApplicationContext, team_name: str = None) -> tuple:
@@ -483,21 +612,21 @@ class TeamCommands(commands.Cog):
         """
         # Get user's team if no team_name provided
         if team_name is None:
-            team_member = self.team_member_repository.get_by_user_id(ctx.author.id)
+            team_member = await self.team_member_repository.get_by_user_id(ctx.author.id)
             if not team_member:
                 await ctx.respond("You are not a member of any team.", ephemeral=True)
                 return None, None
                 
-            team_obj = self.team_repository.get_by_id(team_member.team_id)
+            team_obj = await self.team_repository.get_by_id(team_member.team_id)
         else:
             # Check if team exists
-            team_obj = self.team_repository.get_by_name(team_name)
+            team_obj = await self.team_repository.get_by_name(team_name)
             if not team_obj:
                 await ctx.respond(f"Team '{team_name}' not found.", ephemeral=True)
                 return None, None
                 
             # Check if user is a team member
-            team_member = self.team_member_repository.get_by_user_id(ctx.author.id)
+            team_member = await self.team_member_repository.get_by_user_id(ctx.author.id)
         
         # Verify team membership
         if not team_member or team_member.team_id != team_obj.team_id:
@@ -539,16 +668,14 @@ class TeamCommands(commands.Cog):
         if discord_username:
             # Handle both direct mentions and plain usernames
             if discord_username.startswith("<@") and discord_username.endswith(">"):
-                user_id = int(discord_username[2:-1])
-                try:
-                    target_member = await ctx.guild.fetch_member(user_id)
-                except:
+                user_id = int(discord_username.strip("<@!>"))
+                target_member = await resolve_member(ctx.guild, user_id)
+                if not target_member:
                     await ctx.respond(f"Could not find user with ID {user_id}.", ephemeral=True)
                     return
             else:
-                # Search by username
-                members = [m for m in ctx.guild.members if m.name.lower() == discord_username.lower() or 
-                          (m.nick and m.nick.lower() == discord_username.lower())]
+                # Search by username or nickname via the member name index
+                members = await find_members_by_name(ctx.guild, discord_username)
                 if len(members) == 1:
                     target_member = members[0]
                 elif len(members) > 1:
@@ -559,7 +686,7 @@ class TeamCommands(commands.Cog):
                     return
             
             # Get the team member
-            target_team_member = self.team_member_repository.get_by_user_id(target_member.id)
+            target_team_member = await self.team_member_repository.get_by_user_id(target_member.id)
             if not target_team_member:
                 await ctx.respond(f"{target_member.mention} is not a member of any team.", ephemeral=True)
                 return
@@ -575,7 +702,8 @@ class TeamCommands(commands.Cog):
                 return
                 
             # Remove from team
-            self.team_member_repository.delete(target_team_member.user_id)
+            await self.team_member_repository.delete(target_team_member.user_id)
+            transaction_log.record(ActionType.kick, ctx.author, team_id=team_obj.team_id, user_id=target_team_member.user_id)
             
             # Remove team role
             await target_member.remove_roles(ctx.guild.get_role(team_obj.team_role_id))
@@ -586,13 +714,13 @@ class TeamCommands(commands.Cog):
         # Find user by Roblox username if provided
         if roblox_username:
             # Find user by Roblox username in database
-            target_user = self.user_repository.get_by_roblox_username(roblox_username)
+            target_user = await self.user_repository.get_by_roblox_username(roblox_username)
             if not target_user:
                 await ctx.respond(f"Could not find a user with Roblox username '{roblox_username}'.", ephemeral=True)
                 return
                 
             # Get the team member
-            target_team_member = self.team_member_repository.get_by_user_id(target_user.user_id)
+            target_team_member = await self.team_member_repository.get_by_user_id(target_user.user_id)
             if not target_team_member:
                 await ctx.respond(f"User with Roblox username '{roblox_username}' is not a member of any team.", ephemeral=True)
                 return
@@ -608,17 +736,15 @@ class TeamCommands(commands.Cog):
                 return
                 
             # Remove from team
-            self.team_member_repository.delete(target_team_member.user_id)
+            await self.team_member_repository.delete(target_team_member.user_id)
+            transaction_log.record(ActionType.kick, ctx.author, team_id=team_obj.team_id, user_id=target_team_member.user_id)
             
             # Try to remove role if user is in the guild
-            try:
-                target_member = await ctx.guild.fetch_member(target_user.user_id)
-                if target_member:
-                    await target_member.remove_roles(ctx.guild.get_role(team_obj.team_role_id))
-                    await ctx.respond(f"{target_member.mention} has been kicked from team '{team_obj.name}'.")
-                else:
-                    await ctx.respond(f"User with Roblox username '{roblox_username}' has been kicked from team '{team_obj.name}'.")
-            except:
+            target_member = await resolve_member(ctx.guild, target_user.user_id)
+            if target_member:
+                await target_member.remove_roles(ctx.guild.get_role(team_obj.team_role_id))
+                await ctx.respond(f"{target_member.mention} has been kicked from team '{team_obj.name}'.")
+            else:
                 await ctx.respond(f"User with Roblox username '{roblox_username}' has been kicked from team '{team_obj.name}'.")
 
     @commands.slash_command(name="invite-player")
@@ -632,63 +758,20 @@ class TeamCommands(commands.Cog):
             team_name (str): The name of the team.
             user (discord.Member): The user to invite.
         """
-        # Check if team exists
-        team_obj = self.team_repository.get_by_name(team_name)
-        if not team_obj:
-            await ctx.respond(f"Team '{team_name}' not found.", ephemeral=True)
-            return
-        
-        # Check if inviter is a team captain or vice-captain
-        team_member = self.team_member_repository.get_by_user_id(ctx.author.id)
-        if not team_member or team_member.team_id != team_obj.team_id or team_member.role not in [RoleType.captain, RoleType.vice_captain]:
-            await ctx.respond(f"You must be a captain or vice-captain of team '{team_name}' to invite players.", ephemeral=True)
-            return
-        
-        # Check if user is already in a team
-        existing_member = self.team_member_repository.get_by_user_id(user.id)
-        if existing_member:
-            await ctx.respond(f"{user.mention} is already a member of a team.", ephemeral=True)
-            return
+        # Acknowledge the interaction immediately to prevent timeout; Discord calls
+        # stay out of the invitation transaction, which holds the invitee's lock
+        await ctx.defer(ephemeral=True)
         
-        # Check if user already has a pending invitation
-        pending_invites = self.invitation_repository.get_pending_by_user_id(user.id)
-        if pending_invites:
-            await ctx.respond(f"{user.mention} already has a pending invitation. They must accept or decline it first.", ephemeral=True)
+        team_obj, invitation, error = await self._create_invitation(team_name, ctx.author.id, user)
+        if error:
+            await ctx.followup.send(error, ephemeral=True)
             return
-        
-        # Check inviter's pending invitation count
-        inviter_id = ctx.author.id
-        if inviter_id in self.pending_invites_cache:
-            if len(self.pending_invites_cache[inviter_id]) >= self.max_pending_invites:
-                await ctx.respond(f"You have reached the maximum limit of {self.max_pending_invites} pending invitations.", ephemeral=True)
-                return
-        else:
-            # Initialize cache for this inviter
-            self.pending_invites_cache[inviter_id] = set()
             
-            # Refresh cache with current pending invitations from database
-            db_pending = self.invitation_repository.get_pending_by_inviter_id(inviter_id)
-            for inv in db_pending:
-                self.pending_invites_cache[inviter_id].add(inv.invitation_id)
-                
-            # Check again after refresh
-            if len(self.pending_invites_cache[inviter_id]) >= self.max_pending_invites:
-                await ctx.respond(f"You have reached the maximum limit of {self.max_pending_invites} pending invitations.", ephemeral=True)
-                return
-        
-        # Acknowledge the interaction immediately to prevent timeout
-        await ctx.defer(ephemeral=True)
-        
-        # Create invitation
-        invitation = self.invitation_repository.create(
-            team_id=team_obj.team_id,
-            user_id=user.id,
-            inviter_id=ctx.author.id
+        transaction_log.record(
+            ActionType.invite, ctx.author, team_id=team_obj.team_id, user_id=user.id,
+            invitation_id=invitation.invitation_id
         )
         
-        # Add to cache
-        self.pending_invites_cache[inviter_id].add(invitation.invitation_id)
-        
         # Send DM to user
         try:
             embed = discord.Embed(
@@ -705,13 +788,13 @@ class TeamCommands(commands.Cog):
                 
             embed.add_field(name="Expires", value=f"<t:{expiry_timestamp}:R>")
             
-            # Create view with buttons
-            view = PlayerInviteView(
-                invitation_data=vars(invitation),
-                callback=self._handle_player_response
-            )
-            
+            # Buttons encode the invitation ID; clicks are routed by on_interaction
+            view = PlayerInviteView(invitation.invitation_id)
             dm = await user.send(embed=embed, view=view)
+            view.stop()
+            await self.invitation_repository.set_messages(
+                invitation.invitation_id, dm_channel_id=dm.channel.id, dm_message_id=dm.id
+            )
             
             # Send admin approval request
             await self._send_admin_approval(ctx.guild, team_obj, user, ctx.author, invitation)
@@ -723,47 +806,153 @@ class TeamCommands(commands.Cog):
             # Use followup instead of respond since we already deferred
             await ctx.followup.send(f"Unable to send DM to {user.mention}. Make sure they have DMs enabled.", ephemeral=True)
             # Clean up invitation
-            self.invitation_repository.update_status(invitation.invitation_id, InvitationStatus.expired)
-            self.pending_invites_cache[inviter_id].remove(invitation.invitation_id)
+            await self.invitation_repository.transition_status(
+                invitation.invitation_id, [InvitationStatus.pending], InvitationStatus.expired
+            )
     
-    async def _handle_player_response(self, invitation_id: int, status: InvitationStatus, interaction: discord.Interaction) -> None:
+    async def _create_invitation(self, team_name: str, inviter_id: int, user: discord.Member) -> tuple:
         """
-        Handle player response to invitation.
+        Run the invitation checks and the insert in one transaction.
 
         Args:
-            invitation_id: The ID of the invitation
-            status: The new status of the invitation
-            interaction: The interaction that triggered this
+            team_name: The name of the team
+            inviter_id: The Discord ID of the inviting captain
+            user: The user to invite
+
+        Returns:
+            tuple: (team, invitation, None) on success, (None, None, error message) otherwise
+        """
+        async with unit_of_work():
+            # Check if team exists
+            team_obj = await self.team_repository.get_by_name(team_name)
+            if not team_obj:
+                return None, None, f"Team '{team_name}' not found."
+            
+            # Check if inviter is a team captain or vice-captain
+            team_member = await self.team_member_repository.get_by_user_id(inviter_id)
+            if not team_member or team_member.team_id != team_obj.team_id or team_member.role not in [RoleType.captain, RoleType.vice_captain]:
+                return None, None, f"You must be a captain or vice-captain of team '{team_name}' to invite players."
+            
+            # Check if user is already in a team
+            existing_member = await self.team_member_repository.get_by_user_id(user.id)
+            if existing_member:
+                return None, None, f"{user.mention} is already a member of a team."
+            
+            # Hold the invitee's lock so concurrent invites can't both pass the checks below
+            await self.invitation_repository.lock_invitee(user.id)
+            
+            # Check if user already has a pending invitation
+            pending_invites = await self.invitation_repository.get_pending_by_user_id(user.id)
+            if pending_invites:
+                return None, None, f"{user.mention} already has a pending invitation. They must accept or decline it first."
+            
+            # Create invitation; the inviter's quota is checked atomically with the insert
+            invitation = await self.invitation_repository.create_within_quota(
+                team_id=team_obj.team_id,
+                user_id=user.id,
+                inviter_id=inviter_id,
+                max_pending=self.max_pending_invites
+            )
+            if not invitation:
+                return None, None, f"You have reached the maximum limit of {self.max_pending_invites} pending invitations."
+            return team_obj, invitation, None
+    
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction) -> None:
+        """
+        Route invitation button clicks by custom_id.
+
+        The buttons are not backed by live View objects, so this works for any
+        invitation ever sent, including across restarts; the state comes from
+        the database.
         """
-        # Update invitation status
-        invitation = self.invitation_repository.update_status(invitation_id, status)
+        if interaction.type != discord.InteractionType.component:
+            return
+        parsed = parse_invitation_custom_id(interaction.custom_id)
+        if not parsed:
+            return
+        action, invitation_id = parsed
+        
+        invitation = await self.invitation_repository.get_by_id(invitation_id)
         if not invitation:
+            await interaction.response.send_message("This invitation no longer exists.", ephemeral=True)
+            return
+        
+        if action in PLAYER_ACTIONS:
+            # Only allow the invited user to interact with these buttons
+            if interaction.user.id != invitation.user_id:
+                await interaction.response.send_message("This invitation is not for you.", ephemeral=True)
+                return
+            if invitation.status != InvitationStatus.pending:
+                await interaction.response.send_message(f"This invitation has already been {invitation.status.value}.", ephemeral=True)
+                return
+            
+            # The status above may already be stale (a second click, the expiry
+            # sweep); only the conditional update decides who wins
+            status = InvitationStatus.accepted if action == "accept" else InvitationStatus.declined
+            invitation = await self.invitation_repository.transition_status(
+                invitation_id, [InvitationStatus.pending], status
+            )
+            if not invitation:
+                await interaction.response.send_message("This invitation has already been handled.", ephemeral=True)
+                return
+            
+            if action == "accept":
+                await interaction.response.send_message("You've accepted the team invitation!", ephemeral=True)
+            else:
+                await interaction.response.send_message("You've declined the team invitation.", ephemeral=True)
+            await self._handle_player_response(invitation, status, interaction)
             return
         
-        # Update cache
-        if invitation.inviter_id in self.pending_invites_cache:
-            if invitation.invitation_id in self.pending_invites_cache[invitation.inviter_id]:
-                self.pending_invites_cache[invitation.inviter_id].remove(invitation.invitation_id)
+        # Approve / reject: administrators only
+        if not isinstance(interaction.user, discord.Member) or not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("You don't have permission to approve team invitations.", ephemeral=True)
+            return
         
+        if action == "approve":
+            # Send a temporary response; the handler edits it
+            await interaction.response.send_message("Processing approval...", ephemeral=True)
+            await self._handle_admin_response(invitation_id, True, interaction)
+        else:
+            await interaction.response.send_modal(RejectionReasonModal(invitation_id, self._handle_admin_response))
+    
+    async def _handle_player_response(self, invitation, status: InvitationStatus, interaction: discord.Interaction) -> None:
+        """
+        Handle player response to invitation, after its status was updated.
+
+        Args:
+            invitation: The updated invitation
+            status: The new status of the invitation
+            interaction: The interaction that triggered this
+        """
         # Handle accepted invitations (they still need admin approval)
         if status == InvitationStatus.accepted:
             # Logic to handle accepted invitation will be handled by admin approval
             pass
         elif status == InvitationStatus.declined:
-            # Notify team captain
-            guild = self.bot.get_guild(1370422733086658631)  # Your guild ID
+            # Notify team captain. The league guild may run on another shard's
+            # process; DMs work from any shard, so fall back to the user
+            guild = get_local_guild(self.bot, HOME_GUILD_ID)
             if guild:
-                inviter = guild.get_member(invitation.inviter_id)
-                if inviter:
-                    team = self.team_repository.get_by_id(invitation.team_id)
-                    user = guild.get_member(invitation.user_id)
-                    user_mention = user.mention if user else f"User (ID: {invitation.user_id})"
-                    team_name = team.name if team else f"Team (ID: {invitation.team_id})"
-                    
-                    try:
-                        await inviter.send(f"{user_mention} has declined your invitation to join '{team_name}'")
-                    except discord.Forbidden:
-                        pass  # Can't send DM, but that's okay
+                # Members may not be cached under the lazy member cache profile
+                members = await resolve_members(guild, [invitation.inviter_id, invitation.user_id])
+                inviter = members.get(invitation.inviter_id)
+                user = members.get(invitation.user_id)
+            else:
+                try:
+                    inviter = await self.bot.get_or_fetch_user(invitation.inviter_id)
+                except discord.HTTPException:
+                    inviter = None
+                user = interaction.user if interaction.user.id == invitation.user_id else None
+            if inviter:
+                team = await self.team_repository.get_by_id(invitation.team_id)
+                user_mention = user.mention if user else f"User (ID: {invitation.user_id})"
+                team_name = team.name if team else f"Team (ID: {invitation.team_id})"
+                
+                try:
+                    await inviter.send(f"{user_mention} has declined your invitation to join '{team_name}'")
+                except discord.Forbidden:
+                    pass  # Can't send DM, but that's okay
     
     async def _send_admin_approval(self, guild: discord.Guild, team: Team, user: discord.Member, inviter: discord.Member, invitation) -> None:
         """
@@ -777,7 +966,7 @@ class TeamCommands(commands.Cog):
             invitation: The invitation object
         """
         # Get approval channel from config
-        config = self.server_config_repository.get_by_guild_id(guild.id)
+        config = await self.server_config_repository.get_by_guild_id(guild.id)
         if not config or not config.team_invite_approval_channel_id:
             # Try to inform the inviter that no approval channel is set
             try:
@@ -809,14 +998,13 @@ class TeamCommands(commands.Cog):
             
         embed.add_field(name="Expires", value=f"<t:{expiry_timestamp}:R>", inline=True)
         
-        # Create view with approval buttons
-        view = AdminApprovalView(
-            invitation_data=vars(invitation),
-            callback=self._handle_admin_response
+        # Send to approval channel; buttons encode the invitation ID
+        view = AdminApprovalView(invitation.invitation_id)
+        message = await approval_channel.send(embed=embed, view=view)
+        view.stop()
+        await self.invitation_repository.set_messages(
+            invitation.invitation_id, approval_channel_id=approval_channel.id, approval_message_id=message.id
         )
-        
-        # Send to approval channel
-        await approval_channel.send(embed=embed, view=view)
     
     async def _handle_admin_response(self, invitation_id: int, approved: bool, interaction: discord.Interaction, reason: str = None) -> None:
         """
@@ -828,49 +1016,67 @@ class TeamCommands(commands.Cog):
             interaction: The interaction that triggered this
             reason: The reason for rejection (if not approved)
         """
+        guild = interaction.guild
+        
+        # Discord lookups happen before the transaction, which only runs the writes
+        invitation = await self.invitation_repository.get_by_id(invitation_id)
+        if not invitation:
+            await interaction.edit_original_response(content="This invitation no longer exists.")
+            return
+            
+        # Get relevant objects using DTO pattern
+        team_dto = await self.team_repository.get_by_id(invitation.team_id)  # This returns a TeamDTO
+        members = await resolve_members(guild, [invitation.user_id, invitation.inviter_id])
+        user = members.get(invitation.user_id)
+        inviter = members.get(invitation.inviter_id)
+        
+        # Verify all objects were found successfully
+        if not team_dto:
+            await interaction.edit_original_response(content=f"Could not find team (ID: {invitation.team_id}).")
+            return
         
-        # Get invitation details
+        if not user or not inviter:
+            await interaction.edit_original_response(content="Could not find team or user information.")
+            return
+        
+        if approved and invitation.status != InvitationStatus.accepted:
+            # Check if invitation was accepted by the player
+            await interaction.edit_original_response(content=f"The invitation has not been accepted by the player yet.")
+            return
+        
+        # Conditional updates: of two admins (or an approval and a rejection)
+        # only the first moves the invitation, the other finds nothing to update
         try:
-            invitation = self.invitation_repository.get_by_id(invitation_id)
-            if not invitation:
-                await interaction.edit_original_response(content="This invitation no longer exists.")
-                return
-                
-            # Update cache if needed
-            if invitation.inviter_id in self.pending_invites_cache and invitation.invitation_id in self.pending_invites_cache[invitation.inviter_id]:
-                self.pending_invites_cache[invitation.inviter_id].remove(invitation.invitation_id)
-            
-            # Get relevant objects using DTO pattern
-            guild = interaction.guild
-            team_dto = self.team_repository.get_by_id(invitation.team_id)  # This returns a TeamDTO
-            user = guild.get_member(invitation.user_id)
-            inviter = guild.get_member(invitation.inviter_id)
-            
-            # Verify all objects were found successfully
-            if not team_dto:
-                await interaction.edit_original_response(content=f"Could not find team (ID: {invitation.team_id}).")
-                return
+            async with unit_of_work():
+                if approved:
+                    decided = await self.invitation_repository.transition_status(
+                        invitation.invitation_id, [InvitationStatus.accepted], InvitationStatus.approved
+                    )
+                    if decided:
+                        # Add user to team
+                        await self.team_member_repository.create(
+                            team_id=team_dto.team_id,
+                            user_id=user.id,
+                            role=RoleType.member,
+                            team_display_name=user.display_name
+                        )
+                else:
+                    decided = await self.invitation_repository.transition_status(
+                        invitation.invitation_id, [InvitationStatus.pending, InvitationStatus.accepted], InvitationStatus.declined
+                    )
                 
         except Exception as e:
             await interaction.edit_original_response(content=f"Error processing invitation: {str(e)}")
             return
         
-        if not team_dto or not user or not inviter:
-            await interaction.edit_original_response(content="Could not find team or user information.")
+        if not decided:
+            await interaction.edit_original_response(content="This invitation has already been handled.")
             return
         
         if approved:
-            # Check if invitation was accepted by the player
-            if invitation.status != InvitationStatus.accepted:
-                await interaction.edit_original_response(content=f"The invitation has not been accepted by the player yet.")
-                return
-                
-            # Add user to team
-            self.team_member_repository.create(
-                team_id=team_dto.team_id,
-                user_id=user.id,
-                role=RoleType.member,
-                team_display_name=user.display_name
+            transaction_log.record(
+                ActionType.join, interaction.user, team_id=team_dto.team_id, user_id=user.id,
+                invitation_id=invitation.invitation_id, inviter_id=invitation.inviter_id
             )
             
             # Assign team role to user
@@ -903,9 +1109,6 @@ class TeamCommands(commands.Cog):
             await interaction.edit_original_response(content=f"Successfully approved {user.display_name} to join team '{team_dto.name}'!")
                 
         else:  # Rejected
-            # Update invitation status
-            self.invitation_repository.update_status(invitation.invitation_id, InvitationStatus.declined)
-            
             # Notify user and team captain
             rejection_msg = f"Your invitation to join team '{team_dto.name}' was not approved by the admins."
             if reason:
@@ -917,7 +1120,7 @@ class TeamCommands(commands.Cog):
                 pass
                 
             try:
-                await inviter.send(f"Your invitation for {user.mention} to join team '{team.name}' was not approved by the admins." + (f" Reason: {reason}" if reason else ""))
+                await inviter.send(f"Your invitation for {user.mention} to join team '{team_dto.name}' was not approved by the admins." + (f" Reason: {reason}" if reason else ""))
             except discord.Forbidden:
                 pass
                 
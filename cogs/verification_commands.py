@@ -1,17 +1,85 @@
+import asyncio
+import datetime
+import logging
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+from typing import Dict
 from database.repository.user_repository import UserRepository
+from database.repository.server_config_repository import ServerConfigRepository
 from utils.bloxlink import BloxlinkAPI
-from utils.verification import require_verification, ensure_user_verified
+from utils.verification import require_verification, ensure_user_verified, sweep_guild_verification, SweepProgress
 from cogs.permissions.admin_checker import is_admin
+from config import HOME_GUILD_ID
+
+logger = logging.getLogger(__name__)
 
 
 class VerificationCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.user_repository = UserRepository()
+        self.server_config_repository = ServerConfigRepository()
+        self._sweeps: Dict[int, asyncio.Task] = {}
+        self.nightly_sweep.start()
+    
+    def cog_unload(self):
+        self.nightly_sweep.cancel()
+        for task in self._sweeps.values():
+            task.cancel()
     
-    @commands.slash_command(name="verify", guild_ids=[1370422733086658631])
+    def _start_sweep(self, guild: discord.Guild, message: discord.Message) -> bool:
+        """
+        Start a background verification sweep for a guild, reporting into one message.
+        
+        Returns:
+            False if a sweep is already running for the guild
+        """
+        running = self._sweeps.get(guild.id)
+        if running and not running.done():
+            return False
+        
+        async def report(progress: SweepProgress) -> None:
+            try:
+                await message.edit(content=progress.describe())
+            except discord.HTTPException:
+                pass
+        
+        async def run() -> None:
+            try:
+                await sweep_guild_verification(guild, on_progress=report)
+            except Exception as e:
+                logger.error(f"Verification sweep failed for guild {guild.id}: {str(e)}")
+                try:
+                    await message.edit(content=f"Verification sweep failed: {str(e)}")
+                except discord.HTTPException:
+                    pass
+            finally:
+                self._sweeps.pop(guild.id, None)
+        
+        self._sweeps[guild.id] = asyncio.create_task(run())
+        return True
+    
+    @tasks.loop(time=datetime.time(hour=4, tzinfo=datetime.timezone.utc))
+    async def nightly_sweep(self):
+        """Sweep every guild that has a log channel configured, one guild at a time."""
+        for guild in self.bot.guilds:
+            channel_id = await self.server_config_repository.get_log_channel_id(guild.id)
+            channel = guild.get_channel(channel_id) if channel_id else None
+            if not channel:
+                continue
+            
+            try:
+                message = await channel.send("Starting scheduled verification sweep...")
+            except discord.HTTPException:
+                continue
+            if self._start_sweep(guild, message):
+                await self._sweeps[guild.id]
+    
+    @nightly_sweep.before_loop
+    async def before_nightly_sweep(self):
+        await self.bot.wait_until_ready()
+    
+    @commands.slash_command(name="verify", guild_ids=[HOME_GUILD_ID])
     async def verify(self, ctx: discord.ApplicationContext):
         """
         Verify your Roblox account using Bloxlink.
@@ -23,7 +91,7 @@ class VerificationCommands(commands.Cog):
             await ctx.respond("Your account is verified with Bloxlink and has been registered in our system.", ephemeral=True)
         # If not verified, ensure_user_verified already sent an error message
     
-    @commands.slash_command(name="verification-status", guild_ids=[1370422733086658631])
+    @commands.slash_command(name="verification-status", guild_ids=[HOME_GUILD_ID])
     async def verification_status(self, ctx: discord.ApplicationContext, user: discord.Member = None):
         """
         Check the verification status of a user.
@@ -34,7 +102,7 @@ class VerificationCommands(commands.Cog):
         target = user or ctx.author
         
         # Check if the user exists in the database
-        db_user = self.user_repository.get_by_id(target.id)
+        db_user = await self.user_repository.get_by_id(target.id)
         
         if not db_user:
             await ctx.respond(f"{target.mention} is not registered in our system. Use `/verify` to register.", ephemeral=True)
@@ -56,7 +124,7 @@ class VerificationCommands(commands.Cog):
         
         await ctx.respond(embed=embed, ephemeral=True)
     
-    @commands.slash_command(name="force-verify", guild_ids=[1370422733086658631])
+    @commands.slash_command(name="force-verify", guild_ids=[HOME_GUILD_ID])
     @commands.check(is_admin)
     @require_verification()
     async def force_verify(self, ctx: discord.ApplicationContext, user: discord.Member, roblox_username: str):
@@ -68,18 +136,18 @@ class VerificationCommands(commands.Cog):
             roblox_username (str): The Roblox username to associate with the user.
         """
         # Check if user already exists
-        db_user = self.user_repository.get_by_id(user.id)
+        db_user = await self.user_repository.get_by_id(user.id)
         
         if db_user:
             # Update existing user
-            self.user_repository.update_roblox_verification(
+            await self.user_repository.update_roblox_verification(
                 user_id=user.id,
                 is_verified=True,
                 roblox_username=roblox_username
             )
         else:
             # Create new user
-            self.user_repository.create(
+            await self.user_repository.create(
                 user_id=user.id,
                 username=user.name,
                 display_name=user.display_name,
@@ -89,6 +157,44 @@ class VerificationCommands(commands.Cog):
         
         await ctx.respond(f"{user.mention} has been force verified with Roblox username '{roblox_username}'.", ephemeral=True)
 
+    
+    @commands.slash_command(name="bloxlink-stats", guild_ids=[HOME_GUILD_ID])
+    @commands.check(is_admin)
+    async def bloxlink_stats(self, ctx: discord.ApplicationContext):
+        """
+        Show Bloxlink cache, latency, rate limiter and circuit breaker statistics (admin only).
+        """
+        stats = BloxlinkAPI.stats()
+        cache = stats['cache']
+        
+        embed = discord.Embed(title="Bloxlink Statistics", color=discord.Color.blue())
+        embed.add_field(name="Cache Hit Rate", value=f"{cache['hit_rate']:.1%} ({cache['hits']}/{cache['hits'] + cache['misses']})", inline=True)
+        embed.add_field(name="Cached Users", value=f"{cache['size']}/{cache['maxsize']}", inline=True)
+        embed.add_field(name="Coalesced Requests", value=str(stats['coalesced']), inline=True)
+        embed.add_field(name="Upstream Calls", value=str(stats['upstream_calls']), inline=True)
+        embed.add_field(name="Upstream Latency", value=f"avg {stats['upstream_avg_ms']:.0f} ms / max {stats['upstream_max_ms']:.0f} ms", inline=True)
+        embed.add_field(name="Circuit Breaker", value=f"{stats['breaker']['state']} (opened {stats['breaker']['times_opened']}x, rejected {stats['breaker']['rejected']})", inline=True)
+        embed.add_field(name="Rate Limiter", value=f"{stats['limiter']['tokens']}/{stats['limiter']['capacity']} tokens, rejected {stats['limiter']['rejected']}", inline=True)
+        
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    
+    @commands.slash_command(name="verify-guild", guild_ids=[HOME_GUILD_ID])
+    @commands.check(is_admin)
+    async def verify_guild(self, ctx: discord.ApplicationContext):
+        """
+        Verify every member of this server with Bloxlink in the background (admin only).
+        """
+        running = self._sweeps.get(ctx.guild.id)
+        if running and not running.done():
+            await ctx.respond("A verification sweep is already running for this server.", ephemeral=True)
+            return
+        
+        await ctx.respond("Starting verification sweep; progress will be posted below.", ephemeral=True)
+        # A channel message outlives the 15 minute interaction token, so progress goes there
+        message = await ctx.channel.send(f"Verification sweep started by {ctx.author.mention}...")
+        self._start_sweep(ctx.guild, message)
+
 
 # Add the required setup function
 def setup(bot: commands.Bot):
@@ -1,95 +1,91 @@
 import discord
-from typing import Optional, Callable, Any, Dict
-from database.models.invitation import InvitationStatus
+from typing import Optional, Callable, Tuple
 
+# Buttons carry "invitation:<action>:<invitation id>" so any bot process can
+# handle a click after a restart by looking the invitation up in the database.
+CUSTOM_ID_PREFIX = "invitation"
 
-class PlayerInviteView(discord.ui.View):
-    def __init__(self, invitation_data: Dict[str, Any], callback: Callable):
-        """
-        View to handle player accepting or declining team invitation in DMs
-        
-        Args:
-            invitation_data: Dictionary containing invitation details
-            callback: Function to call when a button is pressed
-        """
+PLAYER_ACTIONS = ("accept", "decline")
+ADMIN_ACTIONS = ("approve", "reject")
+
+
+def invitation_custom_id(action: str, invitation_id: int) -> str:
+    """Build the custom_id for an invitation button."""
+    return f"{CUSTOM_ID_PREFIX}:{action}:{invitation_id}"
+
+
+def parse_invitation_custom_id(custom_id: Optional[str]) -> Optional[Tuple[str, int]]:
+    """
+    Parse an invitation button custom_id.
+
+    Returns:
+        Tuple of (action, invitation ID), or None if it is not an invitation button
+    """
+    if not custom_id:
+        return None
+    parts = custom_id.split(":")
+    if len(parts) != 3 or parts[0] != CUSTOM_ID_PREFIX or parts[1] not in PLAYER_ACTIONS + ADMIN_ACTIONS:
+        return None
+    try:
+        return parts[1], int(parts[2])
+    except ValueError:
+        return None
+
+
+class InvitationButtonsView(discord.ui.View):
+    """
+    Component-only view: it renders the buttons but holds no state or callbacks.
+
+    Clicks are routed by TeamCommands.on_interaction using the custom_id, so
+    the view is stopped right after sending and nothing stays in memory.
+    """
+    def __init__(self, invitation_id: int, buttons: Tuple[Tuple[str, str, discord.ButtonStyle], ...]):
         super().__init__(timeout=None)
-        self.invitation_data = invitation_data
-        self.callback = callback
-        self.invitation_id = invitation_data.get('invitation_id')
-    
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        """
-        Check if the user interacting with the view is the target user
-        """
-        # Only allow the invited user to interact with these buttons
-        if interaction.user.id != self.invitation_data.get('user_id'):
-            await interaction.response.send_message("This invitation is not for you.", ephemeral=True)
-            return False
-        return True
-    
-    async def on_timeout(self) -> None:
-        """
-        Handle view timeout
-        """
-        # Mark invitation as expired in the callback
-        await self.callback(self.invitation_id, InvitationStatus.expired, None)
-    
-    @discord.ui.button(label="Accept", style=discord.ButtonStyle.success, custom_id="accept_button")
-    async def accept_button(self, button: discord.ui.Button, interaction: discord.Interaction):
-        await interaction.response.send_message("You've accepted the team invitation!", ephemeral=True)
-        await self.callback(self.invitation_id, InvitationStatus.accepted, interaction)
-    
-    @discord.ui.button(label="Decline", style=discord.ButtonStyle.danger, custom_id="decline_button")
-    async def decline_button(self, button: discord.ui.Button, interaction: discord.Interaction):
-        await interaction.response.send_message("You've declined the team invitation.", ephemeral=True)
-        await self.callback(self.invitation_id, InvitationStatus.declined, interaction)
-
-
-class AdminApprovalView(discord.ui.View):
-    def __init__(self, invitation_data: Dict[str, Any], callback: Callable):
+        for action, label, style in buttons:
+            self.add_item(discord.ui.Button(
+                label=label,
+                style=style,
+                custom_id=invitation_custom_id(action, invitation_id)
+            ))
+
+
+class PlayerInviteView(InvitationButtonsView):
+    def __init__(self, invitation_id: int):
         """
-        View for admins to approve or reject a team invitation in the approval channel
-        
+        Accept/decline buttons sent to the invited player in DMs
+
         Args:
-            invitation_data: Dictionary containing invitation details
-            callback: Function to call when a button is pressed
+            invitation_id: The ID of the invitation
         """
-        super().__init__(timeout=None)
-        self.invitation_data = invitation_data
-        self.callback = callback
-        self.invitation_id = invitation_data.get('invitation_id')
-        self.rejection_modal = None
-    
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        super().__init__(invitation_id, (
+            ("accept", "Accept", discord.ButtonStyle.success),
+            ("decline", "Decline", discord.ButtonStyle.danger),
+        ))
+
+
+class AdminApprovalView(InvitationButtonsView):
+    def __init__(self, invitation_id: int):
         """
-        Check if the user interacting with the view has admin permissions
+        Approve/reject buttons posted in the approval channel
+
+        Args:
+            invitation_id: The ID of the invitation
         """
-        # This will be enhanced in the team_commands cog to check for admin role
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message("You don't have permission to approve team invitations.", ephemeral=True)
-            return False
-        return True
-    
-    @discord.ui.button(label="Approve", style=discord.ButtonStyle.success, custom_id="approve_button")
-    async def approve_button(self, button: discord.ui.Button, interaction: discord.Interaction):
-        # Send a temporary response
-        await interaction.response.send_message("Processing approval...", ephemeral=True)
-        # Let the callback know we've already responded
-        await self.callback(self.invitation_id, True, interaction)
-    
-    @discord.ui.button(label="Reject", style=discord.ButtonStyle.danger, custom_id="reject_button")
-    async def reject_button(self, button: discord.ui.Button, interaction: discord.Interaction):
-        # Create rejection modal
-        self.rejection_modal = RejectionReasonModal(self.invitation_id, self.callback)
-        await interaction.response.send_modal(self.rejection_modal)
+        super().__init__(invitation_id, (
+            ("approve", "Approve", discord.ButtonStyle.success),
+            ("reject", "Reject", discord.ButtonStyle.danger),
+        ))
 
 
 class RejectionReasonModal(discord.ui.Modal):
+    # Abandoned modals are dropped after this many seconds
+    TIMEOUT = 600
+
     def __init__(self, invitation_id: int, callback: Callable):
-        super().__init__(title="Provide Rejection Reason")
+        super().__init__(title="Provide Rejection Reason", timeout=self.TIMEOUT)
         self.invitation_id = invitation_id
-        self.callback = callback
-        
+        self.on_reason = callback
+
         self.reason = discord.ui.InputText(
             label="Reason for rejection",
             placeholder="Please provide a reason for rejecting this invitation",
@@ -98,8 +94,8 @@ class RejectionReasonModal(discord.ui.Modal):
             max_length=1000
         )
         self.add_item(self.reason)
-    
-    async def on_submit(self, interaction: discord.Interaction):
+
+    async def callback(self, interaction: discord.Interaction):
         reason = self.reason.value
         await interaction.response.send_message("Invitation rejected with reason provided.", ephemeral=True)
-        await self.callback(self.invitation_id, False, interaction, reason)
+        await self.on_reason(self.invitation_id, False, interaction, reason)
@@ -9,9 +9,73 @@ SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 
 # Database Configuration
 DATABASE_URL = os.getenv('DATABASE_URL')
+# Optional override for the asyncpg URL used by the repositories
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
 
 # Discord Bot Configuration
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 
 # Logo download path
 LOGO_PATH = os.getenv('LOGO_PATH')
+LOGO_MAX_BYTES = int(os.getenv('LOGO_MAX_BYTES', str(5 * 1024 * 1024)))
+LOGO_DOWNLOAD_TIMEOUT = float(os.getenv('LOGO_DOWNLOAD_TIMEOUT', '15'))
+LOGO_SIZE = int(os.getenv('LOGO_SIZE', '512'))
+LOGO_THUMBNAIL_SIZE = int(os.getenv('LOGO_THUMBNAIL_SIZE', '128'))
+LOGO_WORKERS = int(os.getenv('LOGO_WORKERS', '2'))
+
+# Bloxlink API client
+BLOXLINK_BASE_URL = os.getenv('BLOXLINK_BASE_URL', 'https://api.blox.link/v4/public')
+BLOXLINK_API_KEY = os.getenv('BLOXLINK_API_KEY', '819a60d0-21b2-4a93-acc6-abfc19d8f013')
+BLOXLINK_TIMEOUT = float(os.getenv('BLOXLINK_TIMEOUT', '10'))
+BLOXLINK_CONNECT_TIMEOUT = float(os.getenv('BLOXLINK_CONNECT_TIMEOUT', '3'))
+BLOXLINK_POOL_SIZE = int(os.getenv('BLOXLINK_POOL_SIZE', '100'))
+BLOXLINK_POOL_PER_HOST = int(os.getenv('BLOXLINK_POOL_PER_HOST', '20'))
+BLOXLINK_CACHE_TTL = float(os.getenv('BLOXLINK_CACHE_TTL', '3600'))
+BLOXLINK_NEGATIVE_CACHE_TTL = float(os.getenv('BLOXLINK_NEGATIVE_CACHE_TTL', '60'))
+BLOXLINK_CACHE_SIZE = int(os.getenv('BLOXLINK_CACHE_SIZE', '10000'))
+BLOXLINK_RATE_LIMIT = float(os.getenv('BLOXLINK_RATE_LIMIT', '10'))  # requests per second
+BLOXLINK_RATE_BURST = int(os.getenv('BLOXLINK_RATE_BURST', '20'))
+BLOXLINK_MAX_RETRIES = int(os.getenv('BLOXLINK_MAX_RETRIES', '2'))
+BLOXLINK_BREAKER_THRESHOLD = int(os.getenv('BLOXLINK_BREAKER_THRESHOLD', '5'))
+BLOXLINK_BREAKER_RESET = float(os.getenv('BLOXLINK_BREAKER_RESET', '30'))
+
+# Gateway intents / cache profile: minimal, standard or full (see intents.py)
+BOT_CACHE_PROFILE = os.getenv('BOT_CACHE_PROFILE', 'standard').lower()
+# Optional override of the profile's guild chunking at startup (true/false)
+BOT_CHUNK_GUILDS_AT_STARTUP = {'true': True, 'false': False}.get(os.getenv('BOT_CHUNK_GUILDS_AT_STARTUP', '').lower())
+
+# Where the hash of the last uploaded slash command tree is recorded
+COMMAND_SYNC_STATE_PATH = os.getenv('COMMAND_SYNC_STATE_PATH', '.command_sync_state.json')
+
+# Sharding: run AutoShardedBot when enabled. BOT_SHARD_COUNT defaults to Discord's
+# recommendation; BOT_SHARD_IDS (e.g. "0-3" or "0,2,4") limits this process to
+# some of the shards so several processes can split them (needs BOT_SHARD_COUNT)
+BOT_SHARDED = os.getenv('BOT_SHARDED', 'false').lower() == 'true'
+BOT_SHARD_COUNT = int(os.getenv('BOT_SHARD_COUNT')) if os.getenv('BOT_SHARD_COUNT') else None
+BOT_SHARD_IDS = os.getenv('BOT_SHARD_IDS')
+SHARD_METRICS_INTERVAL = float(os.getenv('SHARD_METRICS_INTERVAL', '60'))
+
+# The league's own server, used for admin commands and invitation notifications
+HOME_GUILD_ID = int(os.getenv('HOME_GUILD_ID', '1370422733086658631'))
+
+# Repository caches: local (in-process LRU), shared (Redis) or tiered (local L1
+# in front of Redis). CACHE_URL points at the shared server for the latter two
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'local').lower()
+CACHE_URL = os.getenv('CACHE_URL')
+CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'era:')
+# In-process entries per cache namespace; each namespace has its own LRU
+CACHE_LOCAL_SIZE = int(os.getenv('CACHE_LOCAL_SIZE', '10000'))
+# The verified-user set is warmed in full at startup, so it gets its own size
+CACHE_VERIFIED_LOCAL_SIZE = int(os.getenv('CACHE_VERIFIED_LOCAL_SIZE', '100000'))
+CACHE_L1_TTL = float(os.getenv('CACHE_L1_TTL', '5'))
+# Postgres NOTIFY channel repositories publish cache invalidations on
+CACHE_INVALIDATION_CHANNEL = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache_invalidation')
+
+# Audit log writer: records are queued and inserted in batches of up to
+# TRANSACTION_LOG_BATCH_SIZE, at least every TRANSACTION_LOG_FLUSH_INTERVAL
+# seconds. Once TRANSACTION_LOG_QUEUE_SIZE records are pending, new ones are
+# dropped with a warning; this is deliberate rather than backpressure, since a
+# stalled database should cost audit records, not block every command
+TRANSACTION_LOG_BATCH_SIZE = int(os.getenv('TRANSACTION_LOG_BATCH_SIZE', '200'))
+TRANSACTION_LOG_FLUSH_INTERVAL = float(os.getenv('TRANSACTION_LOG_FLUSH_INTERVAL', '2'))
+TRANSACTION_LOG_QUEUE_SIZE = int(os.getenv('TRANSACTION_LOG_QUEUE_SIZE', '10000'))
@@ -1,3 +1,3 @@
-from .db import engine, Session, Base
+from .db import engine, Session, Base, async_engine, AsyncSessionLocal
 
-__all__ = ['engine', 'Session', 'Base']
\ No newline at end of file
+__all__ = ['engine', 'Session', 'Base', 'async_engine', 'AsyncSessionLocal']
\ No newline at end of file
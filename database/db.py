@@ -1,10 +1,11 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DATABASE_URL
+from config import DATABASE_URL, ASYNC_DATABASE_URL
 
 # Create the SQLAlchemy engine
 # For PostgreSQL with psycopg2, the URL format is:
@@ -15,6 +16,25 @@ engine = create_engine(DATABASE_URL)
 # Create a session factory using scoped_session for thread safety
 Session = scoped_session(sessionmaker(bind=engine))
 
+
+def _to_async_url(url: str) -> str:
+    """Rewrite a sync PostgreSQL URL so it uses the asyncpg driver."""
+    for prefix in ('postgresql+psycopg2://', 'postgresql://', 'postgres://'):
+        if url.startswith(prefix):
+            return 'postgresql+asyncpg://' + url[len(prefix):]
+    return url
+
+
+# Async engine used by the repositories so queries never block the event loop.
+# ASYNC_DATABASE_URL can override the URL derived from DATABASE_URL.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL or _to_async_url(DATABASE_URL),
+    pool_pre_ping=True
+)
+
+# expire_on_commit=False keeps loaded attributes readable after the transaction ends
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
 # Create base class for declarative models
 Base = declarative_base()
 
@@ -26,6 +46,14 @@ def close_db_session():
     """Removes the current session."""
     Session.remove()
 
+def get_async_db_session() -> AsyncSession:
+    """Returns a new async database session."""
+    return AsyncSessionLocal()
+
+async def close_async_engine():
+    """Dispose of the async engine's connection pool."""
+    await async_engine.dispose()
+
 def init_db():
     """Initialize the database by creating all tables."""
-    Base.metadata.create_all(engine)
\ No newline at end of file
+    Base.metadata.create_all(engine)
@@ -1,27 +1,78 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from abc import ABC
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+
+def _compile_row_constructor(dto_class: type) -> Callable[[Sequence[Any]], Any]:
+    """
+    Generate a constructor that builds a DTO straight from a result row.
+    
+    The row must hold one value per DTO field, in field order. The generated
+    function skips __init__ and stores each value directly into its slot.
+    """
+    lines = ["def from_row(row):", "    obj = _new(_cls)"]
+    for index, name in enumerate(dto_class.field_names()):
+        lines.append(f"    obj.{name} = row[{index}]")
+    lines.append("    return obj")
+    
+    namespace = {'_new': object.__new__, '_cls': dto_class}
+    exec("\n".join(lines), namespace)
+    return namespace['from_row']
 
 
-@dataclass(init=False)
 class BaseDTO(ABC):
-    def __init__(self, **kwargs):
-        for key, value in kwargs.items():
-            setattr(self, key, value)
-
-
-@dataclass(init=False)
+    __slots__ = ()
+    
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        """Names of the DTO fields, in declaration order."""
+        names = cls.__dict__.get('_field_names')
+        if names is None:
+            names = tuple(field.name for field in fields(cls))
+            cls._field_names = names
+        return names
+    
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> 'BaseDTO':
+        """Build a DTO from a result row selected in field order."""
+        constructor = cls.__dict__.get('_row_constructor')
+        if constructor is None:
+            constructor = _compile_row_constructor(cls)
+            cls._row_constructor = constructor
+        return constructor(row)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the DTO fields as a plain dictionary."""
+        return {name: getattr(self, name) for name in self.field_names()}
+
+
+@dataclass(slots=True)
 class TeamDTO(BaseDTO):
     team_id: int
     name: str
     hexcode: str
     logo_path: str
+    logo_hash: str
+    logo_url: str
+    logo_url_hash: str
     created_at: str
     active: bool
     team_captain_id: int
     team_role_id: int
 
 
-@dataclass(init=False)
+@dataclass(slots=True)
+class TeamSummaryDTO(BaseDTO):
+    team_id: int
+    name: str
+    hexcode: str
+    team_role_id: int
+    captain_id: int = None
+    vice_captain_id: int = None
+    member_count: int = 0
+
+
+@dataclass(slots=True)
 class TeamMemberDTO(BaseDTO):
     team_id: int
     user_id: int
@@ -31,7 +82,7 @@ class TeamMemberDTO(BaseDTO):
     rating: int = None
 
 
-@dataclass(init=False)
+@dataclass(slots=True)
 class UserDTO(BaseDTO):
     user_id: int
     username: str
@@ -43,7 +94,7 @@ class UserDTO(BaseDTO):
     position: str = None
 
 
-@dataclass(init=False)
+@dataclass(slots=True)
 class TransactionDTO(BaseDTO):
     transaction_id: int
     team_id: int
@@ -54,7 +105,7 @@ class TransactionDTO(BaseDTO):
     timestamp: str
 
 
-@dataclass(init=False)
+@dataclass(slots=True)
 class InvitationDTO(BaseDTO):
     invitation_id: int
     team_id: int
@@ -63,9 +114,13 @@ class InvitationDTO(BaseDTO):
     created_at: str
     expires_at: str
     status: str
+    dm_channel_id: int = None
+    dm_message_id: int = None
+    approval_channel_id: int = None
+    approval_message_id: int = None
 
 
-@dataclass(init=False)
+@dataclass(slots=True)
 class GuildDTO(BaseDTO):
     id: int
     name: str
@@ -77,14 +132,18 @@ class GuildDTO(BaseDTO):
     is_active: bool
 
 
-@dataclass(init=False)
+@dataclass(slots=True)
 class ServerConfigDTO(BaseDTO):
-    guild_id: int
-    settings: dict
-    updated_at: str
+    server_id: int
+    log_channel_id: int = None
+    transaction_channel_id: int = None
+    bot_command_channel_id: int = None
+    team_invite_approval_channel_id: int = None
+    admin_role_ids: list = None
+    last_updated: str = None
 
 
-@dataclass(init=False)
+@dataclass(slots=True)
 class ScrimDTO(BaseDTO):
     scrim_id: int = None
     creator_id: int = None
@@ -103,7 +162,7 @@ class ScrimDTO(BaseDTO):
     notes: str = None
 
 
-@dataclass(init=False)
+@dataclass(slots=True)
 class ScrimConfigDTO(BaseDTO):
     config_id: int = None
     guild_id: int = None
@@ -0,0 +1,211 @@
+"""
+Report which repository queries still plan a sequential scan.
+
+The statements are captured from the repositories themselves, so the check
+follows the code. Caches are bypassed during the capture, and a query that
+produces no statement fails the check rather than passing silently. Each
+statement is EXPLAINed (never executed) with enable_seqscan
+turned off, which makes Postgres pick an index whenever one is usable; any
+Seq Scan left in a plan means no index covers that lookup.
+
+Usage:
+    python -m database.explain_check
+"""
+import asyncio
+import json
+import sys
+import os
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import Executable
+from database.db import async_engine
+from database.models.invitation import InvitationStatus
+from database.models.team_member import RoleType
+from database.repository import session_manager
+from database.repository.team_repository import TeamRepository
+from database.repository.team_member_repository import TeamMemberRepository
+from database.repository.user_repository import UserRepository
+from database.repository.invitation_repository import InvitationRepository
+from database.repository.server_config_repository import ServerConfigRepository
+from database.repository.scrim_repository import ScrimRepository
+from utils.cache import CacheBackend, CacheNamespace
+
+
+# Sample IDs only shape the plans; nothing is read or written
+SAMPLE_ID = 1
+
+# (label, repository call) pairs covering the hot lookup paths
+QUERIES: List[Tuple[str, Callable[[], Awaitable[Any]]]] = [
+    ('TeamRepository.get_by_id', lambda: TeamRepository().get_by_id(SAMPLE_ID)),
+    ('TeamRepository.get_by_ids', lambda: TeamRepository().get_by_ids([SAMPLE_ID, SAMPLE_ID + 1])),
+    ('TeamRepository.get_by_name', lambda: TeamRepository().get_by_name('team')),
+    ('TeamRepository.get_summaries', lambda: TeamRepository().get_summaries(limit=25)),
+    ('TeamMemberRepository.get_by_user_id', lambda: TeamMemberRepository().get_by_user_id(SAMPLE_ID)),
+    ('TeamMemberRepository.get_by_team_id', lambda: TeamMemberRepository().get_by_team_id(SAMPLE_ID)),
+    ('TeamMemberRepository.update_role', lambda: TeamMemberRepository().update_role(SAMPLE_ID, SAMPLE_ID, RoleType.member)),
+    ('TeamMemberRepository.delete', lambda: TeamMemberRepository().delete(SAMPLE_ID)),
+    ('UserRepository.get_by_id', lambda: UserRepository().get_by_id(SAMPLE_ID)),
+    ('UserRepository.get_by_roblox_username', lambda: UserRepository().get_by_roblox_username('roblox')),
+    ('InvitationRepository.get_by_id', lambda: InvitationRepository().get_by_id(SAMPLE_ID)),
+    ('InvitationRepository.get_pending_by_user_id', lambda: InvitationRepository().get_pending_by_user_id(SAMPLE_ID)),
+    ('InvitationRepository.get_pending_by_inviter_id', lambda: InvitationRepository().get_pending_by_inviter_id(SAMPLE_ID)),
+    ('InvitationRepository.count_pending_by_inviter_id', lambda: InvitationRepository().count_pending_by_inviter_id(SAMPLE_ID)),
+    ('InvitationRepository.create_within_quota', lambda: InvitationRepository().create_within_quota(SAMPLE_ID, SAMPLE_ID, SAMPLE_ID, 3)),
+    ('InvitationRepository.update_status', lambda: InvitationRepository().update_status(SAMPLE_ID, InvitationStatus.expired)),
+    ('InvitationRepository.transition_status', lambda: InvitationRepository().transition_status(SAMPLE_ID, [InvitationStatus.pending], InvitationStatus.expired)),
+    ('InvitationRepository.expire_due', lambda: InvitationRepository().expire_due()),
+    ('ServerConfigRepository.get_by_guild_id', lambda: ServerConfigRepository().get_by_guild_id(SAMPLE_ID)),
+    ('ScrimRepository.get_scrim_by_message', lambda: ScrimRepository().get_scrim_by_message(SAMPLE_ID)),
+    ('ScrimRepository.get_open_scrims', lambda: ScrimRepository().get_open_scrims()),
+    ('ScrimRepository.get_user_scrims', lambda: ScrimRepository().get_user_scrims(SAMPLE_ID)),
+    ('ScrimRepository.leave_queue', lambda: ScrimRepository().leave_queue(SAMPLE_ID)),
+]
+
+
+# Repositories whose cache namespaces are bypassed while capturing
+REPOSITORIES = [TeamRepository, TeamMemberRepository, UserRepository, InvitationRepository,
+                ServerConfigRepository, ScrimRepository]
+
+
+class _EmptyResult:
+    """Stand-in result so repository methods finish without touching the database."""
+    rowcount = 0
+    
+    def first(self):
+        return None
+    
+    def all(self):
+        return []
+    
+    def scalars(self):
+        return self
+    
+    def scalar(self):
+        return None
+    
+    def scalar_one(self):
+        return 0
+    
+    def __iter__(self):
+        return iter(())
+
+
+class _NoCache(CacheBackend):
+    """Backend that never hits, so every repository call reaches the session."""
+    name = 'none'
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return {}
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        pass
+    
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        pass
+
+
+@contextmanager
+def caches_bypassed() -> Iterator[None]:
+    """Point every repository cache namespace at _NoCache for the duration."""
+    namespaces = [
+        value for repository in REPOSITORIES for value in vars(repository).values()
+        if isinstance(value, CacheNamespace)
+    ]
+    backends = [namespace.backend for namespace in namespaces]
+    for namespace in namespaces:
+        namespace.backend = _NoCache()
+    try:
+        yield
+    finally:
+        for namespace, backend in zip(namespaces, backends):
+            namespace.backend = backend
+
+
+class _RecordingSession:
+    """Ambient session that records statements instead of executing them."""
+    def __init__(self):
+        self.statements: List[Executable] = []
+        self.info: Dict[str, Any] = {}
+    
+    async def execute(self, statement: Executable, *args, **kwargs) -> _EmptyResult:
+        self.statements.append(statement)
+        return _EmptyResult()
+
+
+async def capture_statements(call: Callable[[], Awaitable[Any]]) -> List[Executable]:
+    """Run a repository call against a recording session, caches bypassed, and return its statements."""
+    recorder = _RecordingSession()
+    token = session_manager._ambient_session.set(recorder)
+    try:
+        with caches_bypassed():
+            await call()
+    finally:
+        session_manager._ambient_session.reset(token)
+    return recorder.statements
+
+
+def _seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """Collect the relations read by Seq Scan nodes anywhere in a plan tree."""
+    relations = []
+    if plan.get('Node Type') == 'Seq Scan':
+        relations.append(plan.get('Relation Name', '?'))
+    for child in plan.get('Plans', []):
+        relations.extend(_seq_scans(child))
+    return relations
+
+
+async def find_seq_scans() -> Dict[str, Optional[List[str]]]:
+    """
+    EXPLAIN every captured repository statement.
+    
+    Returns:
+        Mapping of query label to the tables it still scans sequentially, or
+        None if the call produced no statement to check
+    """
+    report = {}
+    async with async_engine.connect() as connection:
+        await connection.exec_driver_sql("SET enable_seqscan = off")
+        for label, call in QUERIES:
+            statements = await capture_statements(call)
+            if not statements:
+                report[label] = None
+                continue
+            relations = []
+            for statement in statements:
+                sql = str(statement.compile(
+                    dialect=async_engine.dialect,
+                    compile_kwargs={'literal_binds': True}
+                ))
+                result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                relations.extend(_seq_scans(plan[0]['Plan']))
+            report[label] = relations
+        await connection.rollback()
+    return report
+
+
+async def main() -> int:
+    report = await find_seq_scans()
+    await async_engine.dispose()
+    
+    failing = {label: tables for label, tables in report.items() if tables}
+    missing = [label for label, tables in report.items() if tables is None]
+    for label, tables in report.items():
+        if tables is None:
+            status = "NO STATEMENT captured"
+        else:
+            status = f"SEQ SCAN on {', '.join(sorted(set(tables)))}" if tables else "ok"
+        print(f"{label:<50} {status}")
+    
+    print(f"\n{len(failing)} of {len(report)} queries still use sequential scans.")
+    if missing:
+        print(f"{len(missing)} queries produced no statement to check.")
+    return 1 if failing or missing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
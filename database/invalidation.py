@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional
+import asyncpg
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import CACHE_INVALIDATION_CHANNEL, CACHE_KEY_PREFIX
+from database.db import async_engine
+from utils.cache import CacheBackend, cache
+from utils.resilience import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+def invalidation_payload(namespace: str, keys: Iterable[Any]) -> str:
+    """Compact JSON event: namespace and the unprefixed keys."""
+    return json.dumps({'n': namespace, 'k': [str(key) for key in keys]}, separators=(',', ':'))
+
+
+async def publish_invalidation(session: AsyncSession, namespace: str, keys: Iterable[Any]) -> None:
+    """
+    Publish a cache invalidation event on the session's transaction.
+
+    Postgres delivers NOTIFY on commit, so listeners never evict before the
+    change is visible and never see events for rolled back writes.
+    """
+    await session.execute(select(func.pg_notify(CACHE_INVALIDATION_CHANNEL, invalidation_payload(namespace, keys))))
+
+
+class CacheInvalidationListener:
+    """
+    LISTENs for invalidation events and evicts the keys from this process's
+    in-process cache tier.
+
+    A process applies its own events too: the writer evicts after commit,
+    but a read that started before the commit can still cache the old row
+    after that eviction, and the event (delivered later) removes it again.
+
+    Keeps one dedicated asyncpg connection (outside the pool) and reconnects
+    with backoff. Events sent while it was disconnected are lost, so the local
+    tier is cleared on every reconnect.
+    """
+    def __init__(self, backend: CacheBackend = cache, channel: str = CACHE_INVALIDATION_CHANNEL, dsn: Optional[str] = None):
+        self.backend = backend
+        self.channel = channel
+        self.dsn = dsn or async_engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.evicted = 0
+        self.reconnects = 0
+
+    def start(self) -> None:
+        """Start listening in the background; a no-op without an in-process tier."""
+        if not self.backend.has_local_tier or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_notify(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        self.received += 1
+        try:
+            event = json.loads(payload)
+            prefix = f"{CACHE_KEY_PREFIX}{event['n']}:"
+            keys = [prefix + key for key in event['k']]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed cache invalidation event: {str(e)}")
+            return
+        self.backend.evict_local(keys)
+        self.evicted += len(keys)
+
+    async def _run(self) -> None:
+        attempt = 0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                if attempt:
+                    # Anything could have changed while we were not listening
+                    self.backend.clear_local()
+                    self.reconnects += 1
+                attempt = 0
+                await lost.wait()
+                logger.warning("Cache invalidation listener lost its connection, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Whatever broke, keep listening; stale local entries are worse than a retry
+                logger.exception("Cache invalidation listener failed")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(backoff_delay(attempt, 1.0, 30.0))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'listening': self._task is not None and not self._task.done(),
+            'received': self.received,
+            'evicted': self.evicted,
+            'reconnects': self.reconnects,
+        }
+
+
+# Started and stopped by the bot
+invalidation_listener = CacheInvalidationListener()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, func, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, func, Enum, Index, text
 import enum
 import sys
 import os
@@ -11,9 +11,16 @@ class InvitationStatus(enum.Enum):
     accepted = 'accepted'
     declined = 'declined'
     expired = 'expired'
+    approved = 'approved'
 
 class Invitation(Base):
     __tablename__ = 'invitations'
+    __table_args__ = (
+        # Partial indexes for the pending-invitation lookups
+        Index('ix_invitations_user_id_pending', 'user_id', postgresql_where=text("status = 'pending'")),
+        Index('ix_invitations_inviter_id_pending', 'inviter_id', postgresql_where=text("status = 'pending'")),
+        Index('ix_invitations_expires_at_pending', 'expires_at', postgresql_where=text("status = 'pending'")),
+    )
     
     invitation_id = Column(Integer, primary_key=True)
     team_id = Column(Integer, ForeignKey('teams.team_id'), nullable=False)
@@ -22,6 +29,11 @@ class Invitation(Base):
     created_at = Column(DateTime, server_default=func.now())
     expires_at = Column(DateTime, nullable=False)
     status = Column(Enum(InvitationStatus), default=InvitationStatus.pending, nullable=False)
+    # Messages carrying the invitation buttons, so they can be updated later
+    dm_channel_id = Column(BigInteger)
+    dm_message_id = Column(BigInteger)
+    approval_channel_id = Column(BigInteger)
+    approval_message_id = Column(BigInteger)
     
     def __repr__(self):
         return f"<Invitation(invitation_id={self.invitation_id}, team_id={self.team_id}, user_id={self.user_id}, status={self.status})>"
\ No newline at end of file
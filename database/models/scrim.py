@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, func, BigInteger, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, func, BigInteger, Text, Index, text
 from sqlalchemy.orm import relationship
 from typing import Optional
 import sys
@@ -9,10 +9,13 @@ from database.db import Base
 
 class Scrim(Base):
     __tablename__ = 'scrims'
+    __table_args__ = (
+        Index('ix_scrims_status_open', 'status', postgresql_where=text("status = 'open'")),
+    )
     
     scrim_id = Column(Integer, primary_key=True)
     # The Discord user ID who created the scrim ad
-    creator_id = Column(BigInteger, nullable=False)
+    creator_id = Column(BigInteger, nullable=False, index=True)
     # The team ID of the creator (if applicable)
     creator_team_id = Column(Integer, ForeignKey('teams.team_id'), nullable=True)
     # Type of scrim: 'now' or 'scheduled'
@@ -24,13 +27,13 @@ class Scrim(Base):
     # Status: 'open', 'matched', 'completed', 'cancelled'
     status = Column(String(20), default='open')
     # ID of the Discord message containing the scrim ad
-    message_id = Column(BigInteger, nullable=True)
+    message_id = Column(BigInteger, nullable=True, index=True)
     # Channel where the ad was posted
     channel_id = Column(BigInteger, nullable=True)
     # Team size (optional parameter for future extension)
     team_size = Column(Integer, default=5)
     # The team/user that accepted the scrim
-    opponent_id = Column(BigInteger, nullable=True)
+    opponent_id = Column(BigInteger, nullable=True, index=True)
     # The team ID of the opponent (if applicable)
     opponent_team_id = Column(Integer, ForeignKey('teams.team_id'), nullable=True)
     # When the scrim was created
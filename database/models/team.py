@@ -14,6 +14,9 @@ class Team(Base):
     name = Column(String(100), unique=True, nullable=False)
     hexcode = Column(String(7))
     logo_path = Column(String(255))
+    logo_hash = Column(String(64))  # SHA-256 of the stored logo file
+    logo_url = Column(String(512))  # Discord CDN URL of the uploaded logo
+    logo_url_hash = Column(String(255))  # Logo hash (or path) logo_url was uploaded for
     created_at = Column(DateTime, server_default=func.now())
     active = Column(Boolean, default=True)
     team_captain_id = Column(BigInteger, default=None)
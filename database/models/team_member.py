@@ -15,7 +15,7 @@ class TeamMember(Base):
     __tablename__ = 'team_members'
     
     team_id = Column(Integer, ForeignKey('teams.team_id'), primary_key=True)
-    user_id = Column(BigInteger, ForeignKey('users.user_id'), primary_key=True)
+    user_id = Column(BigInteger, ForeignKey('users.user_id'), primary_key=True, index=True)
     role = Column(Enum(RoleType), nullable=False, default=RoleType.member)
     team_display_name = Column(String(100), nullable=False)  # in-game name
     joined_at = Column(DateTime, server_default=func.now())
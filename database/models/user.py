@@ -24,7 +24,7 @@ class User(Base):
     display_name = Column(String(100))
     joined_at = Column(DateTime, server_default=func.now())
     is_roblox_verified = Column(Boolean, default=False)
-    roblox_username = Column(String(100), nullable=True)
+    roblox_username = Column(String(100), nullable=True, index=True)
     rating = Column(BigInteger, nullable=True)  # Player rating (0-10 for half stars)
     position = Column(SQLEnum(PositionType), nullable=True)  # Player position
     
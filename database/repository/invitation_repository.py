@@ -1,15 +1,17 @@
-from database.repository.session_manager import Repository
+from database.repository.session_manager import AsyncRepository
 from database.models.invitation import Invitation, InvitationStatus
+from sqlalchemy import select, insert, update, func, literal
 from typing import Optional, List
 from database.dtos import InvitationDTO
+from database.repository.mapper import to_dto
 import datetime
 
 
-class InvitationRepository(Repository):
+class InvitationRepository(AsyncRepository):
     def __init__(self):
-        super().__init__(model_class=Invitation)
+        super().__init__(model_class=Invitation, dto_class=InvitationDTO)
         
-    def create(self, team_id: int, user_id: int, inviter_id: int, expires_in_days: int = 7) -> InvitationDTO:
+    async def create(self, team_id: int, user_id: int, inviter_id: int, expires_in_days: int = 7) -> InvitationDTO:
         """
         Create a new invitation for a user to join a team.
         
@@ -24,22 +26,95 @@ class InvitationRepository(Repository):
         """
         expires_at = datetime.datetime.now() + datetime.timedelta(days=expires_in_days)
         
-        with self.session_scope() as session:
-            invitation = self.model_class(
+        return await self._fetch_one(
+            insert(self.model_class).values(
                 team_id=team_id,
                 user_id=user_id,
                 inviter_id=inviter_id,
                 expires_at=expires_at,
                 status=InvitationStatus.pending
+            ).returning(*self._returning())
+        )
+    
+    async def create_within_quota(self, team_id: int, user_id: int, inviter_id: int, max_pending: int, expires_in_days: int = 7) -> Optional[InvitationDTO]:
+        """
+        Create an invitation only if the inviter has fewer than max_pending pending ones.
+        
+        The inviter's advisory lock serializes concurrent invites from the same
+        inviter, and the count (served by the pending partial index) and the
+        insert are a single INSERT ... SELECT, so the quota holds across processes.
+        
+        Args:
+            team_id: The ID of the team
+            user_id: The Discord ID of the user being invited
+            inviter_id: The Discord ID of the user who sent the invitation
+            max_pending: Maximum pending invitations per inviter
+            expires_in_days: Number of days until the invitation expires
+            
+        Returns:
+            The created invitation as a DTO, or None if the quota is reached
+        """
+        expires_at = datetime.datetime.now() + datetime.timedelta(days=expires_in_days)
+        columns = self.model_class.__table__.c
+        
+        pending = select(func.count()).select_from(self.model_class).where(
+            self.model_class.inviter_id == inviter_id,
+            self.model_class.status == InvitationStatus.pending
+        ).scalar_subquery()
+        source = select(
+            literal(team_id, columns.team_id.type),
+            literal(user_id, columns.user_id.type),
+            literal(inviter_id, columns.inviter_id.type),
+            literal(expires_at, columns.expires_at.type),
+            literal(InvitationStatus.pending, columns.status.type)
+        ).where(pending < max_pending)
+        
+        async with self.session_scope() as session:
+            # Negated so inviter locks never collide with lock_invitee's keys
+            await session.execute(select(func.pg_advisory_xact_lock(-inviter_id)))
+            result = await session.execute(
+                insert(self.model_class)
+                .from_select(['team_id', 'user_id', 'inviter_id', 'expires_at', 'status'], source)
+                .returning(*self._returning())
             )
-            session.add(invitation)
-            session.flush()
+            return to_dto(result.first(), self.dto_class)
+    
+    async def count_pending_by_inviter_id(self, inviter_id: int) -> int:
+        """
+        Count the pending invitations sent by a user.
+        
+        Served by the pending partial index, so it is cheap enough to run
+        uncached; a per-process cache would go stale across bot processes.
+        
+        Args:
+            inviter_id: The Discord ID of the inviter
             
-            # Create DTO from the added invitation
-            invitation_dict = invitation.__dict__.copy()
-            return InvitationDTO(**invitation_dict)
+        Returns:
+            The number of pending invitations
+        """
+        async with self.session_scope() as session:
+            result = await session.execute(
+                select(func.count()).select_from(self.model_class).where(
+                    self.model_class.inviter_id == inviter_id,
+                    self.model_class.status == InvitationStatus.pending
+                )
+            )
+            return result.scalar_one()
+    
+    async def lock_invitee(self, user_id: int) -> None:
+        """
+        Serialize invitation checks for a user until the transaction ends.
+        
+        Takes a transaction-scoped advisory lock, so it only has an effect
+        inside unit_of_work() where the checks and the insert share it.
+        
+        Args:
+            user_id: The Discord ID of the user being invited
+        """
+        async with self.session_scope() as session:
+            await session.execute(select(func.pg_advisory_xact_lock(user_id)))
     
-    def get_by_id(self, invitation_id: int) -> Optional[InvitationDTO]:
+    async def get_by_id(self, invitation_id: int) -> Optional[InvitationDTO]:
         """
         Get an invitation by its ID.
         
@@ -49,17 +124,11 @@ class InvitationRepository(Repository):
         Returns:
             The invitation as a DTO, or None if not found
         """
-        with self.session_scope() as session:
-            invitation = session.query(self.model_class).filter(
-                self.model_class.invitation_id == invitation_id
-            ).first()
-            
-            if not invitation:
-                return None
-                
-            return InvitationDTO(**invitation.__dict__)
+        return await self._fetch_one(self._select().where(
+            self.model_class.invitation_id == invitation_id
+        ))
     
-    def get_pending_by_user_id(self, user_id: int) -> List[InvitationDTO]:
+    async def get_pending_by_user_id(self, user_id: int) -> List[InvitationDTO]:
         """
         Get all pending invitations for a user.
         
@@ -69,15 +138,12 @@ class InvitationRepository(Repository):
         Returns:
             A list of pending invitations as DTOs
         """
-        with self.session_scope() as session:
-            invitations = session.query(self.model_class).filter(
-                self.model_class.user_id == user_id,
-                self.model_class.status == InvitationStatus.pending
-            ).all()
-            
-            return [InvitationDTO(**inv.__dict__) for inv in invitations]
+        return await self._fetch_all(self._select().where(
+            self.model_class.user_id == user_id,
+            self.model_class.status == InvitationStatus.pending
+        ))
     
-    def get_pending_by_inviter_id(self, inviter_id: int) -> List[InvitationDTO]:
+    async def get_pending_by_inviter_id(self, inviter_id: int) -> List[InvitationDTO]:
         """
         Get all pending invitations sent by a user.
         
@@ -87,15 +153,12 @@ class InvitationRepository(Repository):
         Returns:
             A list of pending invitations as DTOs
         """
-        with self.session_scope() as session:
-            invitations = session.query(self.model_class).filter(
-                self.model_class.inviter_id == inviter_id,
-                self.model_class.status == InvitationStatus.pending
-            ).all()
-            
-            return [InvitationDTO(**inv.__dict__) for inv in invitations]
+        return await self._fetch_all(self._select().where(
+            self.model_class.inviter_id == inviter_id,
+            self.model_class.status == InvitationStatus.pending
+        ))
     
-    def get_pending_by_team_id(self, team_id: int) -> List[InvitationDTO]:
+    async def get_pending_by_team_id(self, team_id: int) -> List[InvitationDTO]:
         """
         Get all pending invitations for a team.
         
@@ -105,15 +168,12 @@ class InvitationRepository(Repository):
         Returns:
             A list of pending invitations as DTOs
         """
-        with self.session_scope() as session:
-            invitations = session.query(self.model_class).filter(
-                self.model_class.team_id == team_id,
-                self.model_class.status == InvitationStatus.pending
-            ).all()
-            
-            return [InvitationDTO(**inv.__dict__) for inv in invitations]
+        return await self._fetch_all(self._select().where(
+            self.model_class.team_id == team_id,
+            self.model_class.status == InvitationStatus.pending
+        ))
     
-    def update_status(self, invitation_id: int, status: InvitationStatus) -> Optional[InvitationDTO]:
+    async def update_status(self, invitation_id: int, status: InvitationStatus) -> Optional[InvitationDTO]:
         """
         Update the status of an invitation.
         
@@ -124,15 +184,73 @@ class InvitationRepository(Repository):
         Returns:
             The updated invitation as a DTO, or None if not found
         """
-        with self.session_scope() as session:
-            invitation = session.query(self.model_class).filter(
-                self.model_class.invitation_id == invitation_id
-            ).first()
+        return await self._fetch_one(
+            update(self.model_class)
+            .where(self.model_class.invitation_id == invitation_id)
+            .values(status=status)
+            .returning(*self._returning())
+        )
+    
+    async def transition_status(self, invitation_id: int, from_statuses: List[InvitationStatus], status: InvitationStatus) -> Optional[InvitationDTO]:
+        """
+        Move an invitation to a new status only if it is currently in one of from_statuses.
+        
+        A single conditional UPDATE, so of several concurrent transitions (two
+        clicks, a click and the expiry sweep, two admins) exactly one wins.
+        
+        Args:
+            invitation_id: The ID of the invitation
+            from_statuses: The statuses the invitation may be moved out of
+            status: The new status
             
-            if not invitation:
-                return None
-                
-            invitation.status = status
-            session.flush()
+        Returns:
+            The updated invitation as a DTO, or None if it does not exist or
+            was already moved out of from_statuses
+        """
+        return await self._fetch_one(
+            update(self.model_class)
+            .where(
+                self.model_class.invitation_id == invitation_id,
+                self.model_class.status.in_(from_statuses)
+            )
+            .values(status=status)
+            .returning(*self._returning())
+        )
+    
+    async def set_messages(self, invitation_id: int, **message_ids) -> Optional[InvitationDTO]:
+        """
+        Record the DM and/or approval messages that carry an invitation's buttons.
+        
+        Args:
+            invitation_id: The ID of the invitation
+            **message_ids: Any of dm_channel_id, dm_message_id, approval_channel_id, approval_message_id
             
-            return InvitationDTO(**invitation.__dict__)
+        Returns:
+            The updated invitation as a DTO, or None if not found
+        """
+        return await self._fetch_one(
+            update(self.model_class)
+            .where(self.model_class.invitation_id == invitation_id)
+            .values(**message_ids)
+            .returning(*self._returning())
+        )
+    
+    async def expire_due(self) -> List[InvitationDTO]:
+        """
+        Mark every overdue pending invitation as expired in one statement.
+        
+        expires_at is written from the bot's clock (see create), so it is
+        compared against the same clock rather than the database's now().
+        
+        Returns:
+            The invitations that were expired, as DTOs
+        """
+        return await self._fetch_all(
+            update(self.model_class)
+            .where(
+                self.model_class.status == InvitationStatus.pending,
+                self.model_class.expires_at < datetime.datetime.now()
+            )
+            .values(status=InvitationStatus.expired)
+            .returning(*self._returning())
+        )
@@ -0,0 +1,57 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+from sqlalchemy import Column, Select, select
+
+from database.dtos import BaseDTO
+
+
+D = TypeVar('D', bound=BaseDTO)
+
+# (model class, DTO class) -> table columns backing each DTO field
+_columns_cache: Dict[Tuple[type, type], Tuple[Column, ...]] = {}
+
+
+def dto_columns(model_class: type, dto_class: Type[D]) -> Tuple[Column, ...]:
+    """
+    Get the model columns that back a DTO, in the DTO's field order.
+    
+    Args:
+        model_class: The SQLAlchemy model class
+        dto_class: The DTO class the rows will be mapped to
+        
+    Returns:
+        Tuple of table columns, one per DTO field
+    """
+    key = (model_class, dto_class)
+    columns = _columns_cache.get(key)
+    if columns is None:
+        table_columns = model_class.__table__.c
+        columns = tuple(table_columns[name] for name in dto_class.field_names())
+        _columns_cache[key] = columns
+    return columns
+
+
+def select_dto(model_class: type, dto_class: Type[D]) -> Select:
+    """
+    Build a SELECT for only the columns a DTO needs.
+    
+    Args:
+        model_class: The SQLAlchemy model class
+        dto_class: The DTO class the rows will be mapped to
+        
+    Returns:
+        A select statement whose rows can be passed to to_dto()/to_dtos()
+    """
+    return select(*dto_columns(model_class, dto_class))
+
+
+def to_dto(row: Optional[Any], dto_class: Type[D]) -> Optional[D]:
+    """Map a single result row to a DTO, or None if there is no row."""
+    if row is None:
+        return None
+    return dto_class.from_row(row)
+
+
+def to_dtos(rows: Iterable[Any], dto_class: Type[D]) -> List[D]:
+    """Map result rows to a list of DTOs."""
+    from_row = dto_class.from_row
+    return [from_row(row) for row in rows]
@@ -1,34 +1,99 @@
-from database.repository.session_manager import Repository
+from database.repository.session_manager import AsyncRepository
 from database.models.server_config import ServerConfig
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from typing import Optional, Dict, Any, List
 from database.dtos import ServerConfigDTO
+from utils.cache import cache
 
 
-class ServerConfigRepository(Repository):
+class ServerConfigRepository(AsyncRepository):
+    # Guild configs are tiny and read on nearly every command, so they live in
+    # the cache backend keyed by guild ID, warmed in one query by load_all() at
+    # startup and written through on every change. Guilds without a config are
+    # cached as None so they do not hit the database either.
+    CACHE_TTL_SECONDS = 3600
+    _cache = cache.namespace('server_config', ttl=CACHE_TTL_SECONDS)
+    
     def __init__(self):
-        super().__init__(model_class=ServerConfig)
+        super().__init__(model_class=ServerConfig, dto_class=ServerConfigDTO)
     
-    def get_by_guild_id(self, guild_id: int) -> Optional[ServerConfigDTO]:
+    async def load_all(self) -> int:
+        """
+        Load every guild's configuration into the cache in a single query.
+        
+        Returns:
+            The number of configurations loaded
+        """
+        configs = await self._fetch_all(self._select())
+        await self._cache.set_many({config.server_id: config for config in configs})
+        return len(configs)
+    
+    async def get_by_guild_id(self, guild_id: int) -> Optional[ServerConfigDTO]:
         """
         Get server configuration for a guild by its ID.
         
+        Served from the cache, which also remembers guilds that have no
+        configuration; the database is only hit on a cache miss.
+        
         Args:
             guild_id: The Discord guild ID
             
         Returns:
             Server configuration as a DTO, or None if not found
         """
-        with self.session_scope() as session:
-            config = session.query(self.model_class).filter(
-                self.model_class.server_id == guild_id
-            ).first()
+        cached = await self._cache.get_many([guild_id])
+        if guild_id in cached:
+            return cached[guild_id]
+        
+        config = await self._fetch_one(self._select().where(
+            self.model_class.server_id == guild_id
+        ))
+        await self._cache.set(guild_id, config)
+        return config
+    
+    async def get_admin_role_ids(self, guild_id: int) -> List[int]:
+        """
+        Get the configured admin role IDs for a guild.
+        
+        Args:
+            guild_id: The Discord guild ID
+            
+        Returns:
+            List of role IDs, empty if none are configured
+        """
+        config = await self.get_by_guild_id(guild_id)
+        if not config or not config.admin_role_ids:
+            return []
+        return [int(role_id) for role_id in config.admin_role_ids]
+    
+    async def get_log_channel_id(self, guild_id: int) -> Optional[int]:
+        """
+        Get the log channel ID for a guild.
+        
+        Args:
+            guild_id: The Discord guild ID
+            
+        Returns:
+            The channel ID, or None if not configured
+        """
+        config = await self.get_by_guild_id(guild_id)
+        return config.log_channel_id if config else None
+    
+    async def get_transaction_channel_id(self, guild_id: int) -> Optional[int]:
+        """
+        Get the transaction channel ID for a guild.
+        
+        Args:
+            guild_id: The Discord guild ID
             
-            if not config:
-                return None
-                
-            return ServerConfigDTO(**config.__dict__)
+        Returns:
+            The channel ID, or None if not configured
+        """
+        config = await self.get_by_guild_id(guild_id)
+        return config.transaction_channel_id if config else None
     
-    def create_or_update(self, guild_id: int, **kwargs) -> ServerConfigDTO:
+    async def create_or_update(self, guild_id: int, **kwargs) -> ServerConfigDTO:
         """
         Create or update server configuration for a guild.
         
@@ -39,25 +104,22 @@ class ServerConfigRepository(Repository):
         Returns:
             Updated server configuration as a DTO
         """
-        with self.session_scope() as session:
-            config = session.query(self.model_class).filter(
-                self.model_class.server_id == guild_id
-            ).first()
-            
-            if not config:
-                config = self.model_class(server_id=guild_id)
-                session.add(config)
-            
-            # Update fields
-            for key, value in kwargs.items():
-                if hasattr(config, key):
-                    setattr(config, key, value)
-            
-            session.flush()
-            
-            return ServerConfigDTO(**config.__dict__)
+        # Only update fields that exist on the model
+        values = {key: value for key, value in kwargs.items() if hasattr(self.model_class, key)}
+        
+        # Upsert in a single statement; last_updated is bumped explicitly since
+        # onupdate does not fire for ON CONFLICT DO UPDATE
+        statement = insert(self.model_class).values(server_id=guild_id, **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model_class.server_id],
+            set_={**values, 'last_updated': func.now()}
+        )
+        config = await self._fetch_one(statement.returning(*self._returning()))
+        # Evict rather than write through; the next read caches the committed row
+        await self._invalidate(self._cache, [guild_id])
+        return config
     
-    def set_approval_channel(self, guild_id: int, channel_id: int) -> ServerConfigDTO:
+    async def set_approval_channel(self, guild_id: int, channel_id: int) -> ServerConfigDTO:
         """
         Set the team invitation approval channel for a guild.
         
@@ -68,4 +130,4 @@ class ServerConfigRepository(Repository):
         Returns:
             Updated server configuration as a DTO
         """
-        return self.create_or_update(guild_id, team_invite_approval_channel_id=channel_id)
+        return await self.create_or_update(guild_id, team_invite_approval_channel_id=channel_id)
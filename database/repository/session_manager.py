@@ -1,14 +1,25 @@
-from contextlib import contextmanager
-from typing import Generator, Optional, TypeVar, Type, Any, Dict, List
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import Generator, AsyncGenerator, Optional, TypeVar, Type, Any, Awaitable, Callable, Dict, List
+from sqlalchemy import select, insert, update, delete, inspect, Select, Executable
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
-from database.db import get_db_session
+from database.db import get_db_session, get_async_db_session
 from database.models import Base
+from database.dtos import BaseDTO
+from database.repository.mapper import dto_columns, select_dto, to_dto, to_dtos
+from database.invalidation import publish_invalidation
+from utils.cache import CacheNamespace
 from copy import deepcopy
 
 
 T = TypeVar('T', bound=Base)
+D = TypeVar('D', bound=BaseDTO)
+
+# Session shared by every AsyncRepository call made inside unit_of_work()
+_ambient_session: ContextVar[Optional[AsyncSession]] = ContextVar('ambient_session', default=None)
 
 
 @contextmanager
@@ -42,6 +53,74 @@ def db_session() -> Generator[Session, None, None]:
         session.close()
 
 
+@asynccontextmanager
+async def async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async context manager for database sessions using session.begin().
+    
+    Same transaction semantics as db_session(), but queries are awaited
+    on the asyncpg driver so they never block the event loop.
+    
+    Usage:
+        async with async_db_session() as session:
+            result = await session.execute(select(User).where(User.user_id == 1))
+            user = result.scalars().first()
+    
+    Yields:
+        SQLAlchemy async session
+        
+    Raises:
+        SQLAlchemyError: If any database error occurs
+    """
+    session = get_async_db_session()
+    try:
+        async with session.begin():
+            yield session
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Run several repository calls against one session and one transaction.
+    
+    Every AsyncRepository method awaited inside the block joins the ambient
+    session instead of opening its own, so a command pays for a single
+    connection checkout and commit. Nested blocks join the outermost one.
+    
+    Callbacks registered with after_commit() run once the transaction has
+    committed, and not at all if it rolls back.
+    
+    Usage:
+        async with unit_of_work():
+            team = await team_repository.get_by_name(name)
+            member = await team_member_repository.get_by_user_id(user_id)
+    
+    Yields:
+        The shared SQLAlchemy async session
+    """
+    current = _ambient_session.get()
+    if current is not None:
+        yield current
+        return
+    
+    async with async_db_session() as session:
+        token = _ambient_session.set(session)
+        try:
+            yield session
+        finally:
+            _ambient_session.reset(token)
+    
+    for callback in session.info.pop('after_commit', []):
+        await callback()
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """Run callback after the unit_of_work() transaction of session commits."""
+    session.info.setdefault('after_commit', []).append(callback)
+
+
 class Repository:
     """Base repository class with session management."""
     
@@ -165,4 +244,188 @@ class Repository:
             if key in kwargs:
                 return key, kwargs[key]
 
-        raise ValueError(f"Primary key not found in kwargs: {kwargs}")
\ No newline at end of file
+        raise ValueError(f"Primary key not found in kwargs: {kwargs}")
+
+
+class AsyncRepository:
+    """Base repository class with async session management."""
+    
+    def __init__(self, model_class: Type[T], dto_class: Type[D]):
+        """
+        Initialize the repository with the model class.
+        
+        Args:
+            model_class: The SQLAlchemy model class this repository will handle
+            dto_class: The DTO class rows of this model are mapped to
+        """
+        self.model_class = model_class
+        self.dto_class = dto_class
+    
+    @asynccontextmanager
+    async def session_scope(self, session: Optional[AsyncSession] = None) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Async context manager for handling sessions within this repository.
+        
+        Uses the given session, or the ambient one from unit_of_work(), and
+        only opens (and commits) a new session when neither is available.
+        """
+        session = session or _ambient_session.get()
+        if session is not None:
+            yield session
+            return
+        
+        async with async_db_session() as session:
+            yield session
+    
+    def _select(self) -> Select:
+        """SELECT of only the columns this repository's DTO needs."""
+        return select_dto(self.model_class, self.dto_class)
+    
+    def _returning(self) -> tuple:
+        """Columns to put in a RETURNING clause to build this repository's DTO."""
+        return dto_columns(self.model_class, self.dto_class)
+    
+    async def _fetch_one(self, statement: Executable, dto_class: Optional[Type[D]] = None) -> Optional[D]:
+        """Execute a statement and map its first row to a DTO (the repository's by default)."""
+        async with self.session_scope() as session:
+            result = await session.execute(statement)
+            return to_dto(result.first(), dto_class or self.dto_class)
+    
+    async def _fetch_all(self, statement: Executable, dto_class: Optional[Type[D]] = None) -> List[D]:
+        """Execute a statement and map all its rows to DTOs (the repository's by default)."""
+        async with self.session_scope() as session:
+            result = await session.execute(statement)
+            return to_dtos(result.all(), dto_class or self.dto_class)
+    
+    async def _execute_count(self, statement: Executable) -> int:
+        """Execute an UPDATE/DELETE and return the number of affected rows."""
+        async with self.session_scope() as session:
+            result = await session.execute(statement)
+            return result.rowcount
+    
+    async def _after_write(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Run callback once the write just made has committed.
+        
+        Inside unit_of_work() it is deferred until the transaction commits and
+        dropped if it rolls back; otherwise the write has already committed.
+        """
+        ambient = _ambient_session.get()
+        if ambient is not None:
+            after_commit(ambient, callback)
+        else:
+            await callback()
+    
+    async def _invalidate(self, namespace: CacheNamespace, keys: List[Any]) -> None:
+        """
+        Evict cache keys once the write commits and tell every process to evict them too.
+        
+        Inside unit_of_work() the eviction waits for the commit; evicting
+        earlier would let a concurrent reader cache the old row again. The
+        event rides on the same transaction, so it is only delivered if the
+        write commits. It is skipped when the backend keeps nothing
+        in-process (every process then reads the shared entries just deleted).
+        """
+        if namespace.backend.has_local_tier:
+            async with self.session_scope() as session:
+                await publish_invalidation(session, namespace.name, keys)
+        
+        await self._after_write(lambda: namespace.delete_many(keys))
+    
+    async def create(self, **kwargs) -> D:
+        """
+        Create a new instance of the model.
+        
+        Args:
+            **kwargs: Model attributes
+            
+        Returns:
+            The created row as a DTO
+            
+        Raises:
+            SQLAlchemyError: If the creation fails
+        """
+        return await self._fetch_one(
+            insert(self.model_class).values(**kwargs).returning(*self._returning())
+        )
+
+    async def get_by_id(self, id: Any) -> Optional[D]:
+        """
+        Get a model instance by its ID.
+        
+        Args:
+            id: The ID of the instance to retrieve
+            
+        Returns:
+            The row as a DTO or None if not found
+        """
+        pk_column = inspect(self.model_class).primary_key[0]
+        return await self._fetch_one(self._select().where(pk_column == id))
+
+    async def get_all(self) -> List[D]:
+        """
+        Get all instances of the model.
+        
+        Returns:
+            List of all rows as DTOs
+        """
+        return await self._fetch_all(self._select())
+
+    async def update(self, **kwargs) -> Optional[D]:
+        """
+        Update a model instance.
+        
+        Args:
+            **kwargs: Attributes to update, must include the primary key field
+            
+        Returns:
+            Updated row as a DTO or None if not found
+            
+        Raises:
+            SQLAlchemyError: If the update fails
+        """
+        # Extract primary key from kwargs based on model class
+        pk_name, pk_value = self._get_common_pk(kwargs)
+                
+        if pk_name is None:
+            raise ValueError(f"Primary key not found in kwargs: {kwargs}")
+            
+        # Dynamically build the filter using the primary key name
+        filter_expr = getattr(self.model_class, pk_name) == pk_value
+        values = {key: value for key, value in kwargs.items()
+                  if key != pk_name and hasattr(self.model_class, key)}
+        if not values:
+            return await self._fetch_one(self._select().where(filter_expr))
+            
+        return await self._fetch_one(
+            update(self.model_class).where(filter_expr).values(**values).returning(*self._returning())
+        )
+
+    async def delete(self, id: Any) -> bool:
+        """
+        Delete a model instance.
+        
+        Args:
+            id: The ID of the instance to delete
+            
+        Returns:
+            True if deleted, False if not found
+            
+        Raises:
+            SQLAlchemyError: If the deletion fails
+        """
+        # check if model uses user_id
+        if hasattr(self.model_class, 'user_id'):
+            filter_expr = self.model_class.user_id == id
+        else:
+            filter_expr = self.model_class.id == id
+        return await self._execute_count(delete(self.model_class).where(filter_expr)) > 0
+        
+    def _get_common_pk(self, kwargs: dict) -> tuple[str, Any]:
+        common_pks = ['id', 'team_id', 'user_id', f'{self.model_class.__name__.lower()}_id']
+        
+        for key in common_pks:
+            if key in kwargs:
+                return key, kwargs[key]
+
+        raise ValueError(f"Primary key not found in kwargs: {kwargs}")
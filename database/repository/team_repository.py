@@ -1,20 +1,39 @@
-from database.repository.session_manager import Repository
+from database.repository.session_manager import AsyncRepository
 from database.models.team import Team
-from database.dtos import TeamDTO
-from typing import Optional, List
-from copy import deepcopy
+from database.models.team_member import TeamMember, RoleType
+from database.dtos import TeamDTO, TeamSummaryDTO
+from sqlalchemy import insert, delete, select, func
+from typing import Optional, List, Dict, Any
+from utils.cache import cache
 import discord
 
 
-class TeamRepository(Repository):
+def _name_key(name: str) -> str:
+    """
+    Normalize a team name the way get_by_name() looks it up: surrounding
+    whitespace is dropped, and the lookup is otherwise an exact,
+    case-sensitive match, so the key keeps the case.
+    """
+    return name.strip()
+
+
+class TeamRepository(AsyncRepository):
     """Repository for Team model operations."""
+    
+    # Read-through cache in the configured backend, shared by every instance
+    # (and every process when the backend is shared). "id:<team_id>" holds the
+    # team; "name:<name>" only points at a team ID, so renames and deletes just
+    # drop the ID entry and a stale name pointer fails its name check on read.
+    CACHE_TTL_SECONDS = 300
+    _cache = cache.namespace('team', ttl=CACHE_TTL_SECONDS)
+    
     def __init__(self):
         """Initialize with the Team model."""
-        super().__init__(model_class=Team)
+        super().__init__(model_class=Team, dto_class=TeamDTO)
         
-    def get_by_id(self, id: int) -> Optional[TeamDTO]:
+    async def get_by_id(self, id: int) -> Optional[TeamDTO]:
         """
-        Get a team by its ID.
+        Get a team by its ID, served from the cache when possible.
         
         Args:
             id: The ID of the team to retrieve
@@ -22,28 +41,59 @@ class TeamRepository(Repository):
         Returns:
             The team with the given ID as a DTO, or None if not found
         """
-        with self.session_scope() as session:
-            team = session.query(self.model_class).filter(self.model_class.team_id == id).first()
-            if team:
-                return TeamDTO(**team.__dict__)
-            return None
+        team = await self._cache.get(f"id:{id}")
+        if team is not None:
+            return team
+        
+        team = await self._fetch_one(self._select().where(self.model_class.team_id == id))
+        if team:
+            await self._cache_team(team)
+        return team
+        
+    async def get_by_ids(self, ids: List[int]) -> Dict[int, TeamDTO]:
+        """
+        Get several teams at once: cached ones in one batched read, the rest
+        in a single IN (...) query.
+        
+        Args:
+            ids: The IDs of the teams to retrieve
+            
+        Returns:
+            Mapping of team ID to team DTO; IDs without a team are left out
+        """
+        ids = set(ids)
+        cached = await self._cache.get_many([f"id:{team_id}" for team_id in ids])
+        teams = {team.team_id: team for team in cached.values() if team is not None}
+        
+        missing = [team_id for team_id in ids if team_id not in teams]
+        if missing:
+            fetched = await self._fetch_all(self._select().where(self.model_class.team_id.in_(missing)))
+            entries = {}
+            for team in fetched:
+                teams[team.team_id] = team
+                entries[f"id:{team.team_id}"] = team
+                entries[f"name:{_name_key(team.name)}"] = team.team_id
+            if entries:
+                await self._cache.set_many(entries)
+        return teams
         
     async def create(self, create_role_func: callable, ctx: discord.ApplicationContext, **kwargs) -> Optional[TeamDTO]:
-        if self.get_by_name(kwargs['name']):
+        if await self.get_by_name(kwargs['name']):
             return None
         
-        with self.session_scope() as session:
-            team = Team(**kwargs)
-            role_id = await create_role_func(ctx, team)
-            team.team_role_id = role_id
-            session.add(team)
-            session.flush()  # Flush to get the ID
-            # Return a DTO to avoid detached instance errors
-            return TeamDTO(**team.__dict__)
+        # The role callback only needs the team's name and color
+        role_id = await create_role_func(ctx, Team(**kwargs))
+        team = await self._fetch_one(
+            insert(self.model_class)
+            .values(**kwargs, team_role_id=role_id)
+            .returning(*self._returning())
+        )
+        await self._invalidate(self._cache, [f"name:{_name_key(kwargs['name'])}"])
+        return team
         
-    def get_by_name(self, name: str) -> Optional[TeamDTO]:
+    async def get_by_name(self, name: str) -> Optional[TeamDTO]:
         """
-        Get a team by its name.
+        Get a team by its name, served from the cache when possible.
         
         Args:
             name: The name of the team to retrieve
@@ -51,13 +101,75 @@ class TeamRepository(Repository):
         Returns:
             The team with the given name as a DTO, or None if not found
         """
-        with self.session_scope() as session:
-            team = session.query(self.model_class).filter(self.model_class.name == name).first()
-            if team:
-                return TeamDTO(**team.__dict__)
-            return None
+        key = _name_key(name)
+        team_id = await self._cache.get(f"name:{key}")
+        if team_id is not None:
+            team = await self.get_by_id(team_id)
+            if team and _name_key(team.name) == key:
+                return team
+        
+        team = await self._fetch_one(self._select().where(self.model_class.name == key))
+        if team:
+            await self._cache_team(team)
+        return team
+    
+    async def update(self, **kwargs) -> Optional[TeamDTO]:
+        """
+        Update a team and drop it from the cache.
+        
+        Args:
+            **kwargs: Attributes to update, must include team_id
+            
+        Returns:
+            Updated team as a DTO or None if not found
+        """
+        team = await super().update(**kwargs)
+        keys = [f"id:{kwargs['team_id']}"]
+        if 'name' in kwargs:
+            keys.append(f"name:{_name_key(kwargs['name'])}")
+        await self._invalidate(self._cache, keys)
+        return team
+    
+    async def delete(self, id: int) -> bool:
+        """
+        Delete a team and drop it from the cache.
+        
+        Args:
+            id: The ID of the team to delete
+            
+        Returns:
+            True if deleted, False if not found
+        """
+        deleted = await self._execute_count(
+            delete(self.model_class).where(self.model_class.team_id == id)
+        )
+        await self.invalidate(id)
+        return deleted > 0
+    
+    async def invalidate(self, team_id: int) -> None:
+        """
+        Drop a team from the cache, in this and every other process.
+        
+        Name pointers to it are left in place; they are checked against the
+        team's current name whenever they are followed.
+        
+        Args:
+            team_id: The ID of the team to evict
+        """
+        await self._invalidate(self._cache, [f"id:{team_id}"])
     
-    def get_all(self, limit: Optional[int] = None) -> List[TeamDTO]:
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """Hit/miss counters of the cache backend the team cache lives in."""
+        return cls._cache.backend.stats()
+    
+    async def _cache_team(self, team: TeamDTO) -> None:
+        await self._cache.set_many({
+            f"id:{team.team_id}": team,
+            f"name:{_name_key(team.name)}": team.team_id,
+        })
+    
+    async def get_all(self, limit: Optional[int] = None) -> List[TeamDTO]:
         """
         Get all teams from the database.
         
@@ -67,10 +179,38 @@ class TeamRepository(Repository):
         Returns:
             List of all teams as DTOs
         """
-        with self.session_scope() as session:
-            query = session.query(self.model_class)
-            if limit:
-                query = query.limit(limit)
-                
-            teams = query.all()
-            return [TeamDTO(**team.__dict__) for team in teams]
+        query = self._select()
+        if limit:
+            query = query.limit(limit)
+            
+        return await self._fetch_all(query)
+    
+    async def get_summaries(self, limit: Optional[int] = None) -> List[TeamSummaryDTO]:
+        """
+        Get teams with their captain, vice captain and member count in one query.
+        
+        Args:
+            limit: Optional limit on the number of teams to return
+            
+        Returns:
+            List of team summaries as DTOs, ordered by team ID
+        """
+        member = TeamMember
+        query = (
+            select(
+                self.model_class.team_id,
+                self.model_class.name,
+                self.model_class.hexcode,
+                self.model_class.team_role_id,
+                func.min(member.user_id).filter(member.role == RoleType.captain).label('captain_id'),
+                func.min(member.user_id).filter(member.role == RoleType.vice_captain).label('vice_captain_id'),
+                func.count(member.user_id).label('member_count')
+            )
+            .outerjoin(member, member.team_id == self.model_class.team_id)
+            .group_by(self.model_class.team_id)
+            .order_by(self.model_class.team_id)
+        )
+        if limit:
+            query = query.limit(limit)
+            
+        return await self._fetch_all(query, TeamSummaryDTO)
@@ -0,0 +1,70 @@
+from database.repository.session_manager import AsyncRepository
+from database.models.transaction import Transaction
+from database.models.user import User
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Any, Dict, List, Optional
+from database.dtos import TransactionDTO
+
+
+class TransactionRepository(AsyncRepository):
+    """Repository for the transaction (audit log) table."""
+
+    def __init__(self):
+        super().__init__(model_class=Transaction, dto_class=TransactionDTO)
+
+    async def insert_many(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Insert audit records in a single multi-row INSERT.
+
+        actor_id references users, and actors (typically admins) often have
+        no users row. Those are created first from actor_username and
+        actor_display_name, in the same transaction; existing rows are left
+        untouched.
+
+        Args:
+            records: Dicts with action_type, actor_id and optionally
+                actor_username, actor_display_name, team_id, user_id, details
+                and timestamp
+
+        Returns:
+            The number of rows inserted
+        """
+        if not records:
+            return 0
+
+        actors = {}
+        rows = []
+        for record in records:
+            row = dict(record)
+            username = row.pop('actor_username', None)
+            display_name = row.pop('actor_display_name', None)
+            if username is not None:
+                actors[row['actor_id']] = {'user_id': row['actor_id'], 'username': username, 'display_name': display_name}
+            rows.append(row)
+
+        async with self.session_scope() as session:
+            if actors:
+                await session.execute(
+                    pg_insert(User).values(list(actors.values())).on_conflict_do_nothing(index_elements=[User.user_id])
+                )
+            result = await session.execute(insert(self.model_class).values(rows))
+            return result.rowcount
+
+    async def get_by_team_id(self, team_id: int, limit: Optional[int] = 25) -> List[TransactionDTO]:
+        """
+        Get a team's most recent audit records.
+
+        Args:
+            team_id: The ID of the team
+            limit: Optional limit on the number of records to return
+
+        Returns:
+            List of records as DTOs, newest first
+        """
+        query = self._select().where(self.model_class.team_id == team_id).order_by(
+            self.model_class.timestamp.desc()
+        )
+        if limit:
+            query = query.limit(limit)
+        return await self._fetch_all(query)
@@ -1,15 +1,69 @@
-from database.repository.session_manager import Repository
+from database.repository.session_manager import AsyncRepository
 from database.models.user import User
-from typing import Optional, Dict, Any, List
+from sqlalchemy import select, insert, update, delete, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Optional, Dict, Any, List, Set
 from database.dtos import UserDTO
+from utils.cache import cache
+from config import CACHE_VERIFIED_LOCAL_SIZE
 import discord
 
 
-class UserRepository(Repository):
+class UserRepository(AsyncRepository):
+    # Users known to be Roblox-verified, kept in the cache backend so the
+    # verification gate can usually answer without touching the database.
+    # Warmed by load_verified_ids() at startup and kept current by the writes below.
+    CACHE_TTL_SECONDS = 86400
+    WARM_BATCH_SIZE = 1000
+    _verified = cache.namespace('verified', ttl=CACHE_TTL_SECONDS, maxsize=CACHE_VERIFIED_LOCAL_SIZE)
+    
     def __init__(self):
-        super().__init__(model_class=User)
+        super().__init__(model_class=User, dto_class=UserDTO)
     
-    def get_by_id(self, user_id: int) -> Optional[UserDTO]:
+    async def load_verified_ids(self) -> int:
+        """
+        Load the IDs of all verified users into the verified cache.
+        
+        Returns:
+            The number of verified users loaded
+        """
+        async with self.session_scope() as session:
+            result = await session.execute(
+                select(self.model_class.user_id).where(self.model_class.is_roblox_verified.is_(True))
+            )
+            verified_ids = result.scalars().all()
+        
+        for start in range(0, len(verified_ids), self.WARM_BATCH_SIZE):
+            batch = verified_ids[start:start + self.WARM_BATCH_SIZE]
+            await self._verified.set_many(dict.fromkeys(batch, True))
+        return len(verified_ids)
+    
+    @classmethod
+    async def is_known_verified(cls, user_id: int) -> bool:
+        """
+        Check the verified cache without touching the database.
+        
+        A False result only means the user is not known to be verified; callers
+        should fall back to the database or Bloxlink.
+        
+        Args:
+            user_id: The Discord user ID
+            
+        Returns:
+            True if the user is known to be verified
+        """
+        return await cls._verified.get(user_id, False)
+    
+    async def track_verification(self, user: Optional[UserDTO]) -> None:
+        """Keep the verified cache in line with a freshly written user row once it commits."""
+        if user is None:
+            return
+        if user.is_roblox_verified:
+            await self._after_write(lambda: self._verified.set(user.user_id, True))
+        else:
+            await self._invalidate(self._verified, [user.user_id])
+    
+    async def get_by_id(self, user_id: int) -> Optional[UserDTO]:
         """
         Get a user by their Discord ID.
         
@@ -19,17 +73,11 @@ class UserRepository(Repository):
         Returns:
             The user as a DTO, or None if not found
         """
-        with self.session_scope() as session:
-            user = session.query(self.model_class).filter(
-                self.model_class.user_id == user_id
-            ).first()
-            
-            if not user:
-                return None
-                
-            return UserDTO(**user.__dict__)
+        return await self._fetch_one(self._select().where(
+            self.model_class.user_id == user_id
+        ))
     
-    def create(self, user_id: int, username: str, display_name: str, is_roblox_verified: bool = False, roblox_username: str = None) -> UserDTO:
+    async def create(self, user_id: int, username: str, display_name: str, is_roblox_verified: bool = False, roblox_username: str = None) -> UserDTO:
         """
         Create a new user.
         
@@ -43,20 +91,86 @@ class UserRepository(Repository):
         Returns:
             The created user as a DTO
         """
-        with self.session_scope() as session:
-            user = self.model_class(
+        user = await self._fetch_one(
+            insert(self.model_class).values(
                 user_id=user_id,
                 username=username,
                 display_name=display_name,
                 is_roblox_verified=is_roblox_verified,
                 roblox_username=roblox_username
+            ).returning(*self._returning())
+        )
+        await self.track_verification(user)
+        return user
+    
+    async def get_verified_ids(self, user_ids: List[int]) -> Set[int]:
+        """
+        Get which of the given users are already Roblox-verified.
+        
+        Answered from the verified cache in one batched read; only the IDs it
+        does not know are looked up in the database.
+        
+        Args:
+            user_ids: Discord user IDs to check
+            
+        Returns:
+            The subset of IDs that are verified
+        """
+        if not user_ids:
+            return set()
+        
+        verified = set(await self._verified.get_many(user_ids))
+        unknown = [user_id for user_id in user_ids if user_id not in verified]
+        if not unknown:
+            return verified
+        
+        async with self.session_scope() as session:
+            result = await session.execute(
+                select(self.model_class.user_id).where(
+                    self.model_class.user_id.in_(unknown),
+                    self.model_class.is_roblox_verified.is_(True)
+                )
             )
-            session.add(user)
-            session.flush()
+            found = result.scalars().all()
+        
+        if found:
+            await self._verified.set_many(dict.fromkeys(found, True))
+        return verified.union(found)
+    
+    async def bulk_upsert_verified(self, users: List[Dict[str, Any]]) -> int:
+        """
+        Insert or mark as verified many users in a single statement.
+        
+        Args:
+            users: Dicts with user_id, username, display_name and roblox_username
             
-            return UserDTO(**user.__dict__)
+        Returns:
+            The number of rows written
+        """
+        if not users:
+            return 0
+        
+        statement = pg_insert(self.model_class).values([
+            {**user, 'is_roblox_verified': True} for user in users
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model_class.user_id],
+            set_={
+                'username': statement.excluded.username,
+                'display_name': statement.excluded.display_name,
+                'is_roblox_verified': True,
+                'roblox_username': statement.excluded.roblox_username,
+            }
+        ).returning(self.model_class.user_id)
+        
+        async with self.session_scope() as session:
+            result = await session.execute(statement)
+            written = result.scalars().all()
+        
+        await self._after_write(lambda: self._verified.set_many(dict.fromkeys(written, True)))
+        return len(written)
     
-    def update(self, user_id: int, **kwargs) -> Optional[UserDTO]:
+    async def update(self, user_id: int, **kwargs) -> Optional[UserDTO]:
         """
         Update a user.
         
@@ -67,24 +181,21 @@ class UserRepository(Repository):
         Returns:
             The updated user as a DTO, or None if not found
         """
-        with self.session_scope() as session:
-            user = session.query(self.model_class).filter(
-                self.model_class.user_id == user_id
-            ).first()
-            
-            if not user:
-                return None
-            
-            # Update fields
-            for key, value in kwargs.items():
-                if hasattr(user, key):
-                    setattr(user, key, value)
-            
-            session.flush()
-            
-            return UserDTO(**user.__dict__)
+        # Only update fields that exist on the model
+        values = {key: value for key, value in kwargs.items() if hasattr(self.model_class, key)}
+        if not values:
+            return await self.get_by_id(user_id)
+        
+        user = await self._fetch_one(
+            update(self.model_class)
+            .where(self.model_class.user_id == user_id)
+            .values(**values)
+            .returning(*self._returning())
+        )
+        await self.track_verification(user)
+        return user
     
-    def update_roblox_verification(self, user_id: int, is_verified: bool, roblox_username: str = None) -> Optional[UserDTO]:
+    async def update_roblox_verification(self, user_id: int, is_verified: bool, roblox_username: str = None) -> Optional[UserDTO]:
         """
         Update a user's Roblox verification status.
         
@@ -96,13 +207,13 @@ class UserRepository(Repository):
         Returns:
             The updated user as a DTO, or None if not found
         """
-        return self.update(
+        return await self.update(
             user_id=user_id,
             is_roblox_verified=is_verified,
             roblox_username=roblox_username
         )
-
-    def set_player_rating(self, user_id: int, rating: float) -> Optional[UserDTO]:
+    
+    async def set_player_rating(self, user_id: int, rating: float) -> Optional[UserDTO]:
         """
         Set a player's star rating (0-5)
         
@@ -116,12 +227,12 @@ class UserRepository(Repository):
         # Convert the rating to an integer between 0 and 10 (so we can store half stars)
         db_rating = min(max(int(rating * 2), 0), 10)
         
-        return self.update(
+        return await self.update(
             user_id=user_id,
             rating=db_rating
         )
-        
-    def set_player_position(self, user_id: int, position: str) -> Optional[UserDTO]:
+    
+    async def set_player_position(self, user_id: int, position: str) -> Optional[UserDTO]:
         """
         Set a player's position
         
@@ -137,15 +248,16 @@ class UserRepository(Repository):
         # Validate the position against the enum
         try:
             position_enum = PositionType[position.lower().replace(' ', '_')]
-            return self.update(
-                user_id=user_id,
-                position=position_enum
-            )
         except KeyError:
             # Invalid position name
             return None
-            
-    def get_top_players_by_position(self, position: str, limit: int = 10) -> List[UserDTO]:
+        
+        return await self.update(
+            user_id=user_id,
+            position=position_enum
+        )
+    
+    async def get_top_players_by_position(self, position: str, limit: int = 10) -> List[UserDTO]:
         """
         Get the top-rated players for a specific position.
         
@@ -161,21 +273,18 @@ class UserRepository(Repository):
         # Validate the position against the enum
         try:
             position_enum = PositionType[position.lower().replace(' ', '_')]
-            
-            with self.session_scope() as session:
-                users = session.query(self.model_class).filter(
-                    self.model_class.position == position_enum,
-                    self.model_class.rating.isnot(None)  # Only include rated players
-                ).order_by(
-                    self.model_class.rating.desc()  # Sort by rating, highest first
-                ).limit(limit).all()
-                
-                return [UserDTO(**user.__dict__) for user in users]
         except KeyError:
             # Invalid position name
             return []
+        
+        return await self._fetch_all(self._select().where(
+            self.model_class.position == position_enum,
+            self.model_class.rating.isnot(None)  # Only include rated players
+        ).order_by(
+            self.model_class.rating.desc()  # Sort by rating, highest first
+        ).limit(limit))
     
-    def get_by_roblox_username(self, roblox_username: str) -> Optional[UserDTO]:
+    async def get_by_roblox_username(self, roblox_username: str) -> Optional[UserDTO]:
         """
         Get a user by their Roblox username.
         
@@ -185,17 +294,11 @@ class UserRepository(Repository):
         Returns:
             The user as a DTO, or None if not found
         """
-        with self.session_scope() as session:
-            user = session.query(self.model_class).filter(
-                self.model_class.username == roblox_username
-            ).first()
-            
-            if not user:
-                return None
-                
-            return UserDTO(**user.__dict__)
-        
-    def delete_by_user_id_or_roblox_username(self, user_id: int = None, roblox_username: str = None) -> bool:
+        return await self._fetch_one(self._select().where(
+            self.model_class.roblox_username == roblox_username
+        ))
+    
+    async def delete_by_user_id_or_roblox_username(self, user_id: int = None, roblox_username: str = None) -> bool:
         """
         Delete a user by their Discord user ID or Roblox username.
         
@@ -206,16 +309,15 @@ class UserRepository(Repository):
         Returns:
             True if deleted, False if not found
         """
-        with self.session_scope() as session:
-            user = session.query(self.model_class).filter(
+        async with self.session_scope() as session:
+            result = await session.execute(delete(self.model_class).where(
                 or_(
                     self.model_class.user_id == user_id,
-                    self.model_class.username == roblox_username
+                    self.model_class.roblox_username == roblox_username
                 )
-            ).first()
-            
-            if not user:
-                return False
-                
-            session.delete(user)
-            return True
\ No newline at end of file
+            ).returning(self.model_class.user_id))
+            deleted_ids = result.scalars().all()
+        
+        if deleted_ids:
+            await self._invalidate(self._verified, deleted_ids)
+        return len(deleted_ids) > 0
\ No newline at end of file
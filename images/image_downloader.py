@@ -1,14 +1,111 @@
-import requests
+import aiohttp
+import asyncio
+import hashlib
 import os
-from config import LOGO_PATH
-
-
-def download_and_save_image(url, team_name):
-    response = requests.get(url)
-    if response.status_code == 200:
-        os.makedirs(LOGO_PATH, exist_ok=True)
-        file_path = os.path.join(LOGO_PATH, f"{team_name}.png")
-        with open(file_path, 'wb') as f:
-            f.write(response.content)
-        return file_path
-    return None
\ No newline at end of file
+import uuid
+from typing import Optional, Tuple
+from config import LOGO_PATH, LOGO_MAX_BYTES, LOGO_DOWNLOAD_TIMEOUT
+
+LOGO_DIR = LOGO_PATH or os.path.join('images', 'logos')
+CHUNK_SIZE = 64 * 1024
+# Bytes needed to recognise every supported format
+SNIFF_BYTES = 12
+
+# Leading magic bytes of the image formats we accept, mapped to a file extension
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+
+class LogoDownloadError(Exception):
+    """Raised when a logo cannot be downloaded or is not an acceptable image."""
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Return the file extension for an image's first bytes, or None if it is not a supported image."""
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def _require_image_type(head: bytes) -> str:
+    extension = sniff_image_type(head)
+    if extension is None:
+        raise LogoDownloadError("Logo URL does not point to a PNG, JPEG, GIF or WebP image.")
+    return extension
+
+
+def logo_path_for(logo_hash: str, extension: str) -> str:
+    """Path of the stored logo for a content hash."""
+    return os.path.join(LOGO_DIR, f"{logo_hash}.{extension}")
+
+
+async def download_logo(url: str, max_bytes: int = LOGO_MAX_BYTES, timeout: float = LOGO_DOWNLOAD_TIMEOUT) -> Tuple[str, str]:
+    """
+    Stream an image to disk and store it under its SHA-256 content hash.
+
+    The body is written in chunks while it is hashed, so it is never held in
+    memory, and the download is aborted once it exceeds max_bytes or the timeout.
+    Identical logos end up as the same file.
+
+    Args:
+        url: The image URL
+        max_bytes: Maximum accepted size in bytes
+        timeout: Total seconds allowed for the download
+
+    Returns:
+        Tuple of (content hash, file path)
+
+    Raises:
+        LogoDownloadError: If the download fails, is too large or is not an image
+    """
+    os.makedirs(LOGO_DIR, exist_ok=True)
+    temp_path = os.path.join(LOGO_DIR, f".download-{uuid.uuid4().hex}")
+    digest = hashlib.sha256()
+    extension = None
+    head = b''
+    size = 0
+
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    raise LogoDownloadError(f"Logo URL returned HTTP {response.status}.")
+                if response.content_length and response.content_length > max_bytes:
+                    raise LogoDownloadError(f"Logo is larger than {max_bytes // 1024} KB.")
+
+                with open(temp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        if extension is None:
+                            head += chunk
+                            if len(head) >= SNIFF_BYTES:
+                                extension = _require_image_type(head)
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise LogoDownloadError(f"Logo is larger than {max_bytes // 1024} KB.")
+                        digest.update(chunk)
+                        await asyncio.to_thread(f.write, chunk)
+
+        if extension is None:
+            # Body shorter than the sniff window
+            extension = _require_image_type(head)
+
+        logo_hash = digest.hexdigest()
+        file_path = logo_path_for(logo_hash, extension)
+        if os.path.exists(file_path):
+            # Same logo already stored; keep the existing file
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+        return logo_hash, file_path
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise LogoDownloadError(f"Could not download logo: {str(e) or type(e).__name__}") from e
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from config import LOGO_SIZE, LOGO_THUMBNAIL_SIZE, LOGO_WORKERS
+from images.image_downloader import LOGO_DIR, logo_path_for
+
+DERIVED_DIR = os.path.join(LOGO_DIR, 'derived')
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class LogoProcessingError(Exception):
+    """Raised when a logo file cannot be decoded or converted."""
+
+
+def normalized_path_for(logo_hash: str) -> str:
+    """Path of the normalized logo for a content hash."""
+    return os.path.join(DERIVED_DIR, f"{logo_hash}_{LOGO_SIZE}.png")
+
+
+def thumbnail_path_for(logo_hash: str) -> str:
+    """Path of the logo thumbnail for a content hash."""
+    return os.path.join(DERIVED_DIR, f"{logo_hash}_{LOGO_THUMBNAIL_SIZE}.png")
+
+
+def _render(source_path: str, logo_hash: str, size: int, thumbnail_size: int) -> Tuple[str, str]:
+    """
+    Convert a logo into a square normalized PNG and a thumbnail.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    from PIL import Image
+
+    normalized_path = normalized_path_for(logo_hash)
+    thumbnail_path = thumbnail_path_for(logo_hash)
+    if os.path.exists(normalized_path) and os.path.exists(thumbnail_path):
+        return normalized_path, thumbnail_path
+
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    with Image.open(source_path) as image:
+        # Animated images keep their first frame
+        image.seek(0)
+        image = image.convert('RGBA')
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        # Centre on a transparent square canvas so every logo has the same shape
+        canvas = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        canvas.paste(image, ((size - image.width) // 2, (size - image.height) // 2))
+        canvas.save(normalized_path, 'PNG', optimize=True)
+        canvas.resize((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS).save(thumbnail_path, 'PNG', optimize=True)
+
+    return normalized_path, thumbnail_path
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=LOGO_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the worker processes; called when the bot shuts down."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def normalize_logo(source_path: str, logo_hash: str) -> Tuple[str, str]:
+    """
+    Produce the normalized logo and thumbnail for a stored logo without blocking the event loop.
+
+    Args:
+        source_path: Path of the downloaded logo
+        logo_hash: Content hash of the logo
+
+    Returns:
+        Tuple of (normalized path, thumbnail path)
+
+    Raises:
+        LogoProcessingError: If the image cannot be decoded
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            _get_executor(), _render, source_path, logo_hash, LOGO_SIZE, LOGO_THUMBNAIL_SIZE
+        )
+    except Exception as e:
+        raise LogoProcessingError(f"Could not process logo: {str(e)}") from e
+
+
+async def import_logo(path: str) -> Tuple[str, str]:
+    """
+    Move a legacy logo file into content-addressed storage and normalize it.
+
+    Args:
+        path: Path of an existing logo file (e.g. LOGO_PATH/<team name>.png)
+
+    Returns:
+        Tuple of (content hash, stored path)
+    """
+    loop = asyncio.get_running_loop()
+    logo_hash = await loop.run_in_executor(_get_executor(), _hash_file, path)
+
+    extension = os.path.splitext(path)[1].lstrip('.').lower() or 'png'
+    stored_path = logo_path_for(logo_hash, extension)
+    if not os.path.exists(stored_path):
+        await asyncio.to_thread(shutil.copyfile, path, stored_path)
+
+    await normalize_logo(stored_path, logo_hash)
+    return logo_hash, stored_path
+
+
+def logo_file_for(logo_path: Optional[str], logo_hash: Optional[str]) -> str:
+    """
+    Pick the file to send for a team logo: the thumbnail if it has been
+    rendered, else the stored original, else the placeholder.
+    """
+    if logo_hash:
+        thumbnail_path = thumbnail_path_for(logo_hash)
+        if os.path.exists(thumbnail_path):
+            return thumbnail_path
+    if logo_path and os.path.exists(logo_path):
+        return logo_path
+    return "images/nologo.png"
@@ -0,0 +1,59 @@
+import time
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+import discord
+
+# Treat URLs as dead this many seconds before Discord's signed expiry
+EXPIRY_MARGIN_SECONDS = 3600
+
+
+def logo_key(logo_hash: Optional[str], logo_path: Optional[str]) -> str:
+    """
+    Identity of the logo a CDN URL was uploaded for: the content hash, or the
+    file path for logos stored before hashing.
+    """
+    return logo_hash or logo_path or "images/nologo.png"
+
+
+def url_expired(url: str, now: Optional[float] = None) -> bool:
+    """
+    Check whether a Discord CDN attachment URL has (nearly) expired.
+
+    Attachment URLs are signed with an `ex` query parameter holding the expiry
+    as a hex Unix timestamp; URLs without one are assumed to stay valid.
+    """
+    expires = parse_qs(urlparse(url).query).get('ex')
+    if not expires:
+        return False
+    try:
+        expires_at = int(expires[0], 16)
+    except ValueError:
+        return True
+    return expires_at - EXPIRY_MARGIN_SECONDS <= (time.time() if now is None else now)
+
+
+def cached_logo_url(logo_url: Optional[str], logo_url_hash: Optional[str], current_key: str) -> Optional[str]:
+    """
+    Return the stored CDN URL if it was uploaded for the current logo and still works.
+
+    Args:
+        logo_url: The stored CDN URL
+        logo_url_hash: The logo key the URL was uploaded for
+        current_key: The team's current logo key (see logo_key)
+
+    Returns:
+        The URL to reuse, or None if the logo must be uploaded again
+    """
+    if not logo_url or logo_url_hash != current_key or url_expired(logo_url):
+        return None
+    return logo_url
+
+
+def uploaded_logo_url(message: discord.Message) -> Optional[str]:
+    """Get the CDN URL Discord assigned to a logo sent as an embed thumbnail attachment."""
+    for embed in message.embeds:
+        if embed.thumbnail and embed.thumbnail.url:
+            return embed.thumbnail.url
+    if message.attachments:
+        return message.attachments[0].url
+    return None
@@ -1,5 +1,86 @@
 import discord
+from config import BOT_CACHE_PROFILE, BOT_CHUNK_GUILDS_AT_STARTUP
 
-def get_intents():
-    intents = discord.Intents.all()
-    return intents
\ No newline at end of file
+# Gateway intents and member caching per profile. The cogs only use slash
+# commands, components, roles/channels and member events, so nothing below
+# "full" subscribes to presences, typing, reactions or message content.
+#   minimal:  no member list; members are cached only when they interact
+#   standard: member events and join-cached members, guilds chunked on demand
+#   full:     everything (the previous behaviour)
+PROFILES = {
+    'minimal': {
+        'intents': lambda: discord.Intents(guilds=True),
+        'member_cache_flags': lambda: discord.MemberCacheFlags(voice=False, joined=False, interaction=True),
+        'chunk_guilds_at_startup': False,
+        'max_messages': None,
+    },
+    'standard': {
+        'intents': lambda: discord.Intents(guilds=True, members=True),
+        'member_cache_flags': lambda: discord.MemberCacheFlags(voice=False, joined=True, interaction=True),
+        'chunk_guilds_at_startup': False,
+        'max_messages': None,
+    },
+    'full': {
+        'intents': discord.Intents.all,
+        'member_cache_flags': discord.MemberCacheFlags.all,
+        'chunk_guilds_at_startup': True,
+        'max_messages': 1000,
+    },
+}
+
+# Rough resident cost per cached object, used only for the startup estimate
+MEMBER_BYTES = 1200
+PRESENCE_BYTES = 600
+MESSAGE_BYTES = 2500
+
+
+def _profile() -> dict:
+    if BOT_CACHE_PROFILE not in PROFILES:
+        raise ValueError(f"Unknown BOT_CACHE_PROFILE '{BOT_CACHE_PROFILE}', expected one of {', '.join(PROFILES)}")
+    return PROFILES[BOT_CACHE_PROFILE]
+
+
+def get_intents() -> discord.Intents:
+    return _profile()['intents']()
+
+
+def get_bot_options() -> dict:
+    """
+    Keyword arguments for the bot constructor: intents, member cache flags,
+    guild chunking and message cache size for the configured profile.
+    """
+    profile = _profile()
+    chunk = profile['chunk_guilds_at_startup'] if BOT_CHUNK_GUILDS_AT_STARTUP is None else BOT_CHUNK_GUILDS_AT_STARTUP
+    return {
+        'intents': profile['intents'](),
+        'member_cache_flags': profile['member_cache_flags'](),
+        'chunk_guilds_at_startup': chunk,
+        'max_messages': profile['max_messages'],
+    }
+
+
+def intents_report(bot: discord.Client) -> str:
+    """
+    Describe the intents and caching in effect with a rough memory estimate
+    for a full member list in every guild the bot is in.
+    """
+    intents = bot.intents
+    enabled = sorted(name for name, value in intents if value)
+    flags = bot._connection.member_cache_flags
+    member_total = sum(guild.member_count or 0 for guild in bot.guilds)
+
+    members_cached = intents.members and flags.joined
+    member_bytes = member_total * MEMBER_BYTES if members_cached else 0
+    presence_bytes = member_total * PRESENCE_BYTES if intents.presences else 0
+    message_bytes = (bot._connection.max_messages or 0) * MESSAGE_BYTES
+    total_mb = (member_bytes + presence_bytes + message_bytes) / (1024 * 1024)
+
+    return "\n".join([
+        f"Cache profile: {BOT_CACHE_PROFILE}",
+        f"Intents: {', '.join(enabled)}",
+        f"Member cache: voice={flags.voice}, joined={flags.joined}, interaction={flags.interaction}; "
+        f"chunk at startup: {bot._connection._chunk_guilds}",
+        f"Estimated cache memory at full load: ~{total_mb:.1f} MB "
+        f"(members {member_bytes / 1048576:.1f} MB, presences {presence_bytes / 1048576:.1f} MB, "
+        f"messages {message_bytes / 1048576:.1f} MB; {member_total} members in {len(bot.guilds)} guilds)",
+    ])
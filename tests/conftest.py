@@ -0,0 +1,74 @@
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+import pytest
+
+# The modules read DATABASE_URL at import; nothing here connects to it
+os.environ.setdefault('DATABASE_URL', 'postgresql://localhost/era_league_test')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.repository import session_manager
+
+
+class FakeResult:
+    """Result of a FakeSession statement: the given rows, or none."""
+    def __init__(self, rows: List[Any] = None, rowcount: int = 0):
+        self.rows = rows or []
+        self.rowcount = rowcount
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return FakeResult([row[0] for row in self.rows])
+
+    def scalar_one(self):
+        return self.rows[0][0]
+
+
+class FakeSession:
+    """
+    Stand-in AsyncSession: records every statement and answers from a queue
+    of results (an empty result once the queue runs out).
+    """
+    def __init__(self, results: List[FakeResult] = None):
+        self.statements: List[Any] = []
+        self.results = list(results or [])
+        self.info: Dict[str, Any] = {}
+        self.committed = False
+
+    async def execute(self, statement, *args, **kwargs) -> FakeResult:
+        self.statements.append(statement)
+        return self.results.pop(0) if self.results else FakeResult()
+
+
+class FakeSessions(list):
+    """Sessions opened so far; results queued here answer the next session opened."""
+    def __init__(self):
+        super().__init__()
+        self.results: List[FakeResult] = []
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """
+    Route repository sessions to FakeSessions; yields the sessions opened.
+    A session is marked committed when its block exits cleanly.
+    """
+    sessions = FakeSessions()
+
+    @asynccontextmanager
+    async def fake_async_db_session():
+        session = FakeSession(sessions.results)
+        sessions.results = []
+        sessions.append(session)
+        yield session
+        session.committed = True
+
+    monkeypatch.setattr(session_manager, 'async_db_session', fake_async_db_session)
+    return sessions
@@ -0,0 +1,182 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from utils import bloxlink
+from utils.bloxlink import BloxlinkAPI, BloxlinkUnavailableError
+from utils.cache import TTLCache
+from utils.resilience import CircuitBreaker, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: Any = None, headers: Dict[str, str] = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+    async def text(self):
+        return str(self.body)
+
+
+class FakeHTTP:
+    """Stand-in aiohttp session answering from a queue of responses."""
+    def __init__(self, responses: List[FakeResponse] = None):
+        self.responses = list(responses or [])
+        self.requests: List[str] = []
+        self.gate: Optional[asyncio.Event] = None
+
+    @asynccontextmanager
+    async def get(self, url: str):
+        self.requests.append(url)
+        if self.gate is not None:
+            await self.gate.wait()
+        yield self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def http(monkeypatch, clock):
+    fake = FakeHTTP()
+
+    async def open_session(cls, *args, **kwargs):
+        return fake
+
+    monkeypatch.setattr(BloxlinkAPI, 'open', classmethod(open_session))
+    monkeypatch.setattr(BloxlinkAPI, '_cache', TTLCache(maxsize=100, ttl=3600, timer=clock))
+    monkeypatch.setattr(BloxlinkAPI, '_inflight', {})
+    monkeypatch.setattr(BloxlinkAPI, '_coalesced', 0)
+    return fake
+
+
+ROBLOX_USER = {'robloxID': '42', 'robloxUsername': 'builder'}
+
+
+def test_verified_lookup_is_cached(http):
+    http.responses = [FakeResponse(200, ROBLOX_USER)]
+
+    async def run():
+        first = await BloxlinkAPI.get_roblox_user(1, 2)
+        second = await BloxlinkAPI.get_roblox_user(1, 2)
+        return first, second
+
+    assert asyncio.run(run()) == ((True, ROBLOX_USER), (True, ROBLOX_USER))
+    assert len(http.requests) == 1
+
+
+def test_not_verified_lookup_is_cached_briefly(http, clock):
+    http.responses = [FakeResponse(404), FakeResponse(200, ROBLOX_USER)]
+
+    async def run():
+        results = [await BloxlinkAPI.get_roblox_user(1, 2)]
+        clock.now = bloxlink.BLOXLINK_NEGATIVE_CACHE_TTL - 1
+        results.append(await BloxlinkAPI.get_roblox_user(1, 2))
+        # Once the short negative TTL is over the user is looked up again
+        clock.now = bloxlink.BLOXLINK_NEGATIVE_CACHE_TTL
+        results.append(await BloxlinkAPI.get_roblox_user(1, 2))
+        return results
+
+    assert asyncio.run(run()) == [(False, None), (False, None), (True, ROBLOX_USER)]
+    assert len(http.requests) == 2
+
+
+def test_lookups_are_cached_per_guild_and_user(http):
+    http.responses = [FakeResponse(200, ROBLOX_USER)]
+
+    async def run():
+        for key in ((1, 2), (1, 3), (4, 2), (1, 2)):
+            await BloxlinkAPI.get_roblox_user(*key)
+
+    asyncio.run(run())
+    assert len(http.requests) == 3
+
+
+def test_concurrent_misses_share_one_request(http):
+    http.responses = [FakeResponse(200, ROBLOX_USER)]
+
+    async def run():
+        http.gate = asyncio.Event()
+        lookups = [asyncio.ensure_future(BloxlinkAPI.get_roblox_user(1, 2)) for _ in range(5)]
+        await asyncio.sleep(0)
+        http.gate.set()
+        return await asyncio.gather(*lookups)
+
+    assert asyncio.run(run()) == [(True, ROBLOX_USER)] * 5
+    assert len(http.requests) == 1
+    assert BloxlinkAPI._coalesced == 4
+    assert BloxlinkAPI._inflight == {}
+
+
+@pytest.fixture
+def upstream(monkeypatch, http, clock):
+    """The http fixture plus a fresh limiter and breaker, and no backoff delay."""
+    monkeypatch.setattr(BloxlinkAPI, '_limiter', TokenBucket(rate=1000, capacity=1000))
+    monkeypatch.setattr(BloxlinkAPI, '_breaker', CircuitBreaker(failure_threshold=2, reset_timeout=30, timer=clock))
+    monkeypatch.setattr(bloxlink, 'backoff_delay', lambda *args, **kwargs: 0)
+    return http
+
+
+def test_failed_lookups_raise_are_not_cached_and_open_the_circuit(upstream):
+    upstream.responses = [FakeResponse(500)]
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(BloxlinkUnavailableError):
+                await BloxlinkAPI.get_roblox_user(1, 2)
+        requests = len(upstream.requests)
+        # The circuit is open now, so the next lookup fails fast
+        with pytest.raises(BloxlinkUnavailableError):
+            await BloxlinkAPI.get_roblox_user(1, 2)
+        return requests
+
+    assert asyncio.run(run()) == 2 * (bloxlink.BLOXLINK_MAX_RETRIES + 1)
+    assert len(upstream.requests) == 2 * (bloxlink.BLOXLINK_MAX_RETRIES + 1)
+    assert BloxlinkAPI._breaker.state == CircuitBreaker.OPEN
+
+
+def test_long_retry_after_is_not_retried(upstream):
+    upstream.responses = [FakeResponse(429, headers={'Retry-After': '60'})]
+
+    async def run():
+        with pytest.raises(BloxlinkUnavailableError):
+            await BloxlinkAPI.get_roblox_user(1, 2)
+
+    asyncio.run(run())
+    assert len(upstream.requests) == 1
+    assert BloxlinkAPI._limiter.stats()['paused_for'] > 0
+
+
+def test_unexpected_error_settles_the_half_open_probe(upstream, clock):
+    BloxlinkAPI._breaker.record_failure()
+    BloxlinkAPI._breaker.record_failure()
+    clock.now = 30
+    upstream.responses = [FakeResponse(200, ValueError("not JSON")), FakeResponse(200, ROBLOX_USER)]
+
+    async def run():
+        with pytest.raises(BloxlinkUnavailableError):
+            await BloxlinkAPI.get_roblox_user(1, 2)
+        # The failed probe re-opened the circuit instead of leaving it stuck half-open
+        assert BloxlinkAPI._breaker.state == CircuitBreaker.OPEN
+        clock.now = 60
+        return await BloxlinkAPI.get_roblox_user(1, 2)
+
+    assert asyncio.run(run()) == (True, ROBLOX_USER)
+    assert BloxlinkAPI._breaker.state == CircuitBreaker.CLOSED
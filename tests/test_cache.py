@@ -0,0 +1,106 @@
+import asyncio
+
+from utils.cache import LocalCache, TieredCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Reading 'a' makes 'b' the least recently used
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, timer=clock)
+    cache.set('default', 1)
+    cache.set('short', 2, ttl=5)
+
+    clock.now = 5
+    assert cache.get('short') is None
+    assert cache.get('default') == 1
+    assert dict(cache.items()) == {'default': 1}
+
+    clock.now = 60
+    assert cache.get('default', 'gone') == 'gone'
+    assert len(cache) == 0
+
+
+def test_ttl_cache_counts_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('missing')
+    assert cache.pop('a') == 1 and cache.pop('a') is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+    assert stats['size'] == 0
+
+
+def test_namespaces_prefix_keys_and_default_their_ttl():
+    backend = LocalCache(maxsize=100)
+    teams = backend.namespace('team', ttl=60)
+    configs = backend.namespace('server_config')
+
+    async def run():
+        await teams.set(1, 'team')
+        await configs.set(1, 'config')
+        await teams.set_many({2: 'other team'})
+        found = await teams.get_many([1, 2, 3])
+        await teams.delete(1)
+        return found, await teams.get(1), await configs.get(1)
+
+    assert asyncio.run(run()) == ({1: 'team', 2: 'other team'}, None, 'config')
+    assert teams.key(1) != configs.key(1)
+
+
+def test_namespaces_do_not_evict_each_other():
+    backend = LocalCache(maxsize=2)
+    config = backend.namespace('server_config')
+    verified = backend.namespace('verified', maxsize=1000)
+
+    async def run():
+        await config.set(1, 'config')
+        # Warming a large namespace only cycles its own LRU
+        await verified.set_many(dict.fromkeys(range(500), True))
+        return await config.get(1), len(await verified.get_many(range(500)))
+
+    assert asyncio.run(run()) == ('config', 500)
+    assert backend.stats()['size'] == 501
+    backend.clear_local()
+    assert asyncio.run(config.get(1)) is None
+
+
+def test_tiered_cache_fills_l1_from_l2():
+    l1, l2 = LocalCache(maxsize=10), LocalCache(maxsize=10)
+    tiered = TieredCache(l1, l2, l1_ttl=5)
+    teams = tiered.namespace('team')
+
+    async def run():
+        await l2.set(teams.key(1), 'shared')
+        assert await teams.get(1) == 'shared'
+        assert await l1.get(teams.key(1)) == 'shared'
+
+        # An invalidation event only drops the local copy
+        tiered.evict_local([teams.key(1)])
+        assert await l1.get(teams.key(1)) is None
+        assert await teams.get(1) == 'shared'
+
+        await teams.delete(1)
+        return await l1.get(teams.key(1)), await l2.get(teams.key(1))
+
+    assert asyncio.run(run()) == (None, None)
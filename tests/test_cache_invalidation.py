@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+
+from conftest import FakeResult
+from database import invalidation
+from database.dtos import ServerConfigDTO
+from database.invalidation import CacheInvalidationListener, invalidation_payload
+from database.repository import session_manager
+from database.repository.server_config_repository import ServerConfigRepository
+from database.repository.team_repository import TeamRepository
+from utils.cache import LocalCache
+
+
+@pytest.fixture
+def team_cache(monkeypatch):
+    backend = LocalCache(maxsize=100)
+    namespace = backend.namespace('team', ttl=60)
+    monkeypatch.setattr(TeamRepository, '_cache', namespace)
+    return namespace
+
+
+def _notifies(session):
+    return [statement for statement in session.statements if 'pg_notify' in str(statement)]
+
+
+def test_eviction_waits_for_commit(fake_db, team_cache):
+    async def run():
+        await team_cache.set('id:1', 'old')
+        async with session_manager.unit_of_work():
+            await TeamRepository().invalidate(1)
+            # A reader inside the transaction still sees the entry; evicting
+            # now would let it be re-cached from the uncommitted state
+            assert await team_cache.get('id:1') == 'old'
+        return await team_cache.get('id:1')
+
+    assert asyncio.run(run()) is None
+    (session,) = fake_db
+    assert session.committed
+    assert len(_notifies(session)) == 1
+
+
+def test_rolled_back_write_keeps_cache(fake_db, team_cache):
+    async def run():
+        await team_cache.set('id:1', 'current')
+        with pytest.raises(RuntimeError):
+            async with session_manager.unit_of_work():
+                await TeamRepository().invalidate(1)
+                raise RuntimeError("write failed")
+        return await team_cache.get('id:1')
+
+    assert asyncio.run(run()) == 'current'
+    assert not fake_db[0].committed
+
+
+def test_eviction_without_unit_of_work_is_immediate(fake_db, team_cache):
+    async def run():
+        await team_cache.set('id:1', 'old')
+        await TeamRepository().invalidate(1)
+        return await team_cache.get('id:1')
+
+    assert asyncio.run(run()) is None
+    # The event went out on its own (committed) session
+    assert fake_db[0].committed and len(_notifies(fake_db[0])) == 1
+
+
+def test_listener_applies_events_from_every_process_including_its_own(team_cache):
+    listener = CacheInvalidationListener(backend=team_cache.backend, dsn='postgresql://localhost/unused')
+
+    async def run():
+        await team_cache.set_many({'id:1': 'stale', 'id:2': 'kept'})
+        listener._on_notify(None, 0, listener.channel, invalidation_payload('team', ['id:1']))
+        return await team_cache.get('id:1'), await team_cache.get('id:2')
+
+    assert asyncio.run(run()) == (None, 'kept')
+    assert listener.received == 1 and listener.evicted == 1
+
+
+def test_listener_ignores_malformed_events(team_cache):
+    listener = CacheInvalidationListener(backend=team_cache.backend, dsn='postgresql://localhost/unused')
+    listener._on_notify(None, 0, listener.channel, 'not json')
+    listener._on_notify(None, 0, listener.channel, json.dumps({'k': ['id:1']}))
+    assert listener.received == 2 and listener.evicted == 0
+
+
+def test_listener_reconnects_after_unexpected_errors(monkeypatch, team_cache):
+    listener = CacheInvalidationListener(backend=team_cache.backend, dsn='postgresql://localhost/unused')
+    attempts = []
+
+    async def connect(dsn):
+        attempts.append(dsn)
+        if len(attempts) == 1:
+            raise RuntimeError("driver bug")
+        raise asyncio.CancelledError()
+
+    monkeypatch.setattr(invalidation.asyncpg, 'connect', connect)
+    monkeypatch.setattr(invalidation, 'backoff_delay', lambda *args: 0)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(listener._run())
+    assert len(attempts) == 2
+
+
+def test_config_upsert_evicts_instead_of_writing_through(fake_db, monkeypatch):
+    namespace = LocalCache(maxsize=100).namespace('server_config')
+    monkeypatch.setattr(ServerConfigRepository, '_cache', namespace)
+    fake_db.results = [FakeResult([tuple(range(len(ServerConfigDTO.field_names())))])]
+
+    async def run():
+        await namespace.set(1, 'old config')
+        config = await ServerConfigRepository().create_or_update(1, log_channel_id=5)
+        return config, await namespace.get(1)
+
+    config, cached = asyncio.run(run())
+    assert config is not None and cached is None
@@ -0,0 +1,79 @@
+import asyncio
+import json
+from typing import List, Optional
+
+from utils.command_sync import GLOBAL_SCOPE, _hash_commands, sync_changed_commands
+
+
+class FakeCommand:
+    type = 1
+
+    def __init__(self, name: str, description: str = 'A command', guild_ids: Optional[List[int]] = None):
+        self.name = name
+        self.description = description
+        self.guild_ids = guild_ids
+        self.id = None
+
+    def to_dict(self):
+        payload = {'name': self.name, 'description': self.description, 'type': self.type}
+        if self.guild_ids is not None:
+            payload['guild_ids'] = self.guild_ids
+        return payload
+
+
+class FakeBot:
+    def __init__(self, commands: List[FakeCommand], application_id: int = 99):
+        self.user = type('User', (), {'id': application_id})()
+        self.pending_application_commands = commands
+        self._application_commands = {}
+        self.registered = []
+
+    async def register_commands(self, commands, guild_id=None, method='bulk', force=False):
+        self.registered.append((guild_id, sorted(command.name for command in commands)))
+        return [
+            {'type': command.type, 'name': command.name, 'id': f'{guild_id or 0}-{command.name}'}
+            for command in commands
+        ]
+
+
+def test_hash_ignores_order_and_guild_ids():
+    a, b = FakeCommand('a'), FakeCommand('b')
+    assert _hash_commands([a, b]) == _hash_commands([b, a])
+    assert _hash_commands([FakeCommand('a', guild_ids=[1])]) == _hash_commands([FakeCommand('a', guild_ids=[2])])
+    assert _hash_commands([a]) != _hash_commands([FakeCommand('a', description='Changed')])
+
+
+def test_unchanged_commands_are_not_uploaded_again(tmp_path):
+    path = str(tmp_path / 'sync.json')
+    commands = [FakeCommand('ping'), FakeCommand('setup', guild_ids=[5])]
+
+    bot = FakeBot(commands)
+    assert sorted(asyncio.run(sync_changed_commands(bot, path))) == ['5', GLOBAL_SCOPE]
+    assert sorted(bot.registered, key=str) == [(5, ['setup']), (None, ['ping'])]
+
+    # A restart with the same tree costs no uploads but still knows the IDs
+    restarted = FakeBot([FakeCommand('ping'), FakeCommand('setup', guild_ids=[5])])
+    assert asyncio.run(sync_changed_commands(restarted, path)) == []
+    assert restarted.registered == []
+    assert restarted.pending_application_commands[0].id == '0-ping'
+    assert set(restarted._application_commands) == {'0-ping', '5-setup'}
+
+
+def test_only_changed_and_removed_scopes_are_synced(tmp_path):
+    path = str(tmp_path / 'sync.json')
+    asyncio.run(sync_changed_commands(FakeBot([FakeCommand('ping'), FakeCommand('setup', guild_ids=[5])]), path))
+
+    bot = FakeBot([FakeCommand('ping', description='Pong!')])
+    assert sorted(asyncio.run(sync_changed_commands(bot, path))) == ['5', GLOBAL_SCOPE]
+    # The guild scope lost its last command, so it is cleared
+    assert (5, []) in bot.registered
+    with open(path) as f:
+        assert set(json.load(f)['scopes']) == {GLOBAL_SCOPE}
+
+
+def test_other_application_starts_from_scratch(tmp_path):
+    path = str(tmp_path / 'sync.json')
+    asyncio.run(sync_changed_commands(FakeBot([FakeCommand('ping')]), path))
+
+    other = FakeBot([FakeCommand('ping')], application_id=100)
+    assert asyncio.run(sync_changed_commands(other, path)) == [GLOBAL_SCOPE]
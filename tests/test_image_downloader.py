@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import pytest
+
+from images import image_downloader
+from images.image_downloader import LogoDownloadError, download_logo, sniff_image_type
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100
+WEBP = b'RIFF\x00\x00\x00\x00WEBPVP8 ' + b'\x00' * 100
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, status: int = 200, content_length: Optional[int] = None):
+        self.status = status
+        self.content_length = content_length
+        self.content = FakeContent(body)
+
+
+def _serve(monkeypatch, response: FakeResponse) -> List[str]:
+    requests = []
+
+    class FakeClientSession:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+        @asynccontextmanager
+        async def get(self, url):
+            requests.append(url)
+            yield response
+
+    monkeypatch.setattr(image_downloader.aiohttp, 'ClientSession', FakeClientSession)
+    return requests
+
+
+@pytest.fixture
+def logo_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(image_downloader, 'LOGO_DIR', str(tmp_path))
+    monkeypatch.setattr(image_downloader, 'CHUNK_SIZE', 8)
+    return tmp_path
+
+
+def test_sniff_image_type_recognises_supported_formats():
+    assert sniff_image_type(PNG) == 'png'
+    assert sniff_image_type(b'\xff\xd8\xff\xe0' + b'\x00' * 8) == 'jpg'
+    assert sniff_image_type(b'GIF89a' + b'\x00' * 6) == 'gif'
+    assert sniff_image_type(WEBP) == 'webp'
+    assert sniff_image_type(b'<html><body>') is None
+    assert sniff_image_type(b'RIFF\x00\x00\x00\x00WAVE') is None
+
+
+def test_download_stores_logo_under_its_content_hash(monkeypatch, logo_dir):
+    _serve(monkeypatch, FakeResponse(PNG))
+
+    logo_hash, path = asyncio.run(download_logo('https://example.com/logo'))
+    assert logo_hash == hashlib.sha256(PNG).hexdigest()
+    assert path == os.path.join(str(logo_dir), f'{logo_hash}.png')
+    with open(path, 'rb') as f:
+        assert f.read() == PNG
+
+    # The same image again maps to the same file and leaves no temp files
+    assert asyncio.run(download_logo('https://example.com/copy')) == (logo_hash, path)
+    assert os.listdir(logo_dir) == [f'{logo_hash}.png']
+
+
+def test_download_rejects_declared_size_over_the_cap(monkeypatch, logo_dir):
+    _serve(monkeypatch, FakeResponse(PNG, content_length=10_000))
+
+    with pytest.raises(LogoDownloadError, match="larger"):
+        asyncio.run(download_logo('https://example.com/logo', max_bytes=1024))
+    assert os.listdir(logo_dir) == []
+
+
+def test_download_aborts_once_the_body_exceeds_the_cap(monkeypatch, logo_dir):
+    # No Content-Length, so the cap is enforced while streaming
+    _serve(monkeypatch, FakeResponse(PNG * 20))
+
+    with pytest.raises(LogoDownloadError, match="larger"):
+        asyncio.run(download_logo('https://example.com/logo', max_bytes=1024))
+    assert os.listdir(logo_dir) == []
+
+
+def test_download_rejects_non_images(monkeypatch, logo_dir):
+    _serve(monkeypatch, FakeResponse(b'<!doctype html><html></html>'))
+
+    with pytest.raises(LogoDownloadError, match="PNG, JPEG, GIF or WebP"):
+        asyncio.run(download_logo('https://example.com/page'))
+    assert os.listdir(logo_dir) == []
+
+
+def test_download_rejects_error_statuses(monkeypatch, logo_dir):
+    _serve(monkeypatch, FakeResponse(b'', status=404))
+
+    with pytest.raises(LogoDownloadError, match="404"):
+        asyncio.run(download_logo('https://example.com/missing'))
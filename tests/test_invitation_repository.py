@@ -0,0 +1,126 @@
+import asyncio
+import datetime
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert, Update
+
+from conftest import FakeResult, FakeSession
+from database.models.invitation import InvitationStatus
+from database.repository import session_manager
+from database.repository.invitation_repository import InvitationRepository
+
+
+def _row(invitation_id=1, status=InvitationStatus.pending):
+    now = datetime.datetime.now()
+    return (invitation_id, 10, 20, 30, now, now + datetime.timedelta(days=7), status, None, None, None, None)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _run_in(session, coroutine):
+    async def run():
+        token = session_manager._ambient_session.set(session)
+        try:
+            return await coroutine
+        finally:
+            session_manager._ambient_session.reset(token)
+    return asyncio.run(run())
+
+
+class _InvitationStore(FakeSession):
+    """Applies transition_status UPDATEs to one in-memory invitation, like Postgres would."""
+    def __init__(self, status):
+        super().__init__()
+        self.status = status
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        # Yield so concurrent callers interleave between their reads and writes
+        await asyncio.sleep(0)
+        params = statement.compile().params
+        if isinstance(statement, Update) and self.status in params['status_1']:
+            self.status = params['status']
+            return FakeResult([_row(status=self.status)])
+        return FakeResult()
+
+
+def test_transition_status_is_conditional_on_current_status():
+    session = FakeSession()
+    _run_in(session, InvitationRepository().transition_status(
+        1, [InvitationStatus.pending, InvitationStatus.accepted], InvitationStatus.declined
+    ))
+    (update,) = session.statements
+    sql = _sql(update)
+    assert 'invitations.status IN' in sql
+    assert 'RETURNING' in sql
+
+
+def test_concurrent_transitions_only_one_wins():
+    store = _InvitationStore(InvitationStatus.pending)
+    repository = InvitationRepository()
+
+    async def click(status):
+        return await repository.transition_status(1, [InvitationStatus.pending], status)
+
+    async def race():
+        token = session_manager._ambient_session.set(store)
+        try:
+            return await asyncio.gather(click(InvitationStatus.accepted), click(InvitationStatus.declined))
+        finally:
+            session_manager._ambient_session.reset(token)
+
+    accepted, declined = asyncio.run(race())
+    assert accepted is not None and accepted.status == InvitationStatus.accepted
+    # The second click finds nothing to update and is reported as already handled
+    assert declined is None
+    assert store.status == InvitationStatus.accepted
+
+
+def test_approval_only_happens_once():
+    store = _InvitationStore(InvitationStatus.accepted)
+    repository = InvitationRepository()
+    approve = lambda: repository.transition_status(1, [InvitationStatus.accepted], InvitationStatus.approved)
+
+    assert _run_in(store, approve()) is not None
+    assert _run_in(store, approve()) is None
+    # A late rejection cannot undo the approval either
+    assert _run_in(store, repository.transition_status(
+        1, [InvitationStatus.pending, InvitationStatus.accepted], InvitationStatus.declined
+    )) is None
+    assert store.status == InvitationStatus.approved
+
+
+def test_create_within_quota_locks_inviter_before_conditional_insert():
+    session = FakeSession([FakeResult(), FakeResult([_row()])])
+    invitation = _run_in(session, InvitationRepository().create_within_quota(10, 20, 30, max_pending=3))
+
+    assert invitation.invitation_id == 1
+    lock, insert = session.statements
+    assert 'pg_advisory_xact_lock' in _sql(lock)
+    # Negated key, so it never collides with lock_invitee's
+    assert lock.compile().params['pg_advisory_xact_lock_2'] == -30
+
+    assert isinstance(insert, Insert)
+    sql = _sql(insert)
+    assert 'INSERT INTO invitations' in sql and 'SELECT' in sql
+    assert 'count(*)' in sql and 'invitations.inviter_id' in sql
+    assert 'RETURNING' in sql
+    assert 3 in insert.compile().params.values()
+
+
+def test_create_within_quota_returns_none_when_quota_reached():
+    # The INSERT ... SELECT produced no row: the pending count was at the limit
+    session = FakeSession([FakeResult(), FakeResult()])
+    assert _run_in(session, InvitationRepository().create_within_quota(10, 20, 30, max_pending=3)) is None
+    assert len(session.statements) == 2
+
+
+def test_count_pending_by_inviter_id_always_queries():
+    session = FakeSession([FakeResult([(2,)]), FakeResult([(3,)])])
+    repository = InvitationRepository()
+    assert _run_in(session, repository.count_pending_by_inviter_id(30)) == 2
+    # No per-process cache: a change made by another process is seen at once
+    assert _run_in(session, repository.count_pending_by_inviter_id(30)) == 3
+    assert len(session.statements) == 2
@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+
+from database.dtos import BaseDTO, UserDTO
+from database.models.user import User
+from database.repository.mapper import dto_columns, select_dto, to_dto, to_dtos
+
+
+@dataclass(slots=True)
+class PointDTO(BaseDTO):
+    x: int
+    y: int
+    label: str = None
+
+
+def test_from_row_fills_fields_in_order():
+    point = PointDTO.from_row((1, 2, 'origin'))
+    assert (point.x, point.y, point.label) == (1, 2, 'origin')
+    assert point == PointDTO(1, 2, 'origin')
+    assert point.to_dict() == {'x': 1, 'y': 2, 'label': 'origin'}
+
+
+def test_from_row_constructor_is_compiled_once_per_class():
+    PointDTO.from_row((0, 0, None))
+    constructor = PointDTO.__dict__['_row_constructor']
+    PointDTO.from_row((1, 1, None))
+    assert PointDTO.__dict__['_row_constructor'] is constructor
+    # Each DTO class gets its own constructor
+    UserDTO.from_row(tuple(range(len(UserDTO.field_names()))))
+    assert UserDTO.__dict__['_row_constructor'] is not constructor
+
+
+def test_dto_columns_follow_dto_field_order():
+    columns = dto_columns(User, UserDTO)
+    assert tuple(column.name for column in columns) == UserDTO.field_names()
+    assert dto_columns(User, UserDTO) is columns
+    assert [column.name for column in select_dto(User, UserDTO).selected_columns] == list(UserDTO.field_names())
+
+
+def test_to_dto_and_to_dtos():
+    assert to_dto(None, PointDTO) is None
+    assert to_dto((3, 4, None), PointDTO) == PointDTO(3, 4)
+    assert to_dtos([(1, 2, 'a'), (5, 6, 'b')], PointDTO) == [PointDTO(1, 2, 'a'), PointDTO(5, 6, 'b')]
+    assert to_dtos([], PointDTO) == []
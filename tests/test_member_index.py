@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils import member_index as member_index_module
+from utils.member_index import MemberNameIndex, find_members_by_name
+
+GUILD = SimpleNamespace(id=1)
+
+
+def _member(member_id, name, nick=None, guild=GUILD):
+    return SimpleNamespace(id=member_id, name=name, nick=nick, guild=guild)
+
+
+def test_exact_lookup_matches_usernames_and_nicknames_case_insensitively():
+    index = MemberNameIndex()
+    index.add(_member(10, 'Alice', nick='Captain'))
+    index.add(_member(11, 'alice_2'))
+    index.add(_member(12, 'Bob', nick='ALICE'))
+
+    assert index.exact(1, 'alice') == {10, 12}
+    assert index.exact(1, 'captain') == {10}
+    assert index.exact(1, 'nobody') == set()
+    assert index.exact(2, 'alice') == set()
+    assert len(index) == 3
+
+
+def test_prefix_lookup_is_limited():
+    index = MemberNameIndex()
+    for member_id, name in enumerate(['ann', 'anna', 'annie', 'bert', 'an']):
+        index.add(_member(member_id, name))
+
+    assert index.prefix(1, 'AN') == {0, 1, 2, 4}
+    assert index.prefix(1, 'ann') == {0, 1, 2}
+    assert len(index.prefix(1, 'an', limit=2)) == 2
+    assert index.prefix(1, 'z') == set()
+
+
+def test_renames_and_removals_update_the_index():
+    index = MemberNameIndex()
+    index.add(_member(10, 'alice', nick='ace'))
+    index.add(_member(10, 'alice', nick='boss'))
+    assert index.exact(1, 'ace') == set()
+    assert index.exact(1, 'boss') == {10}
+    assert index.prefix(1, 'a') == {10}
+
+    index.remove(1, 10)
+    assert index.exact(1, 'alice') == set()
+    assert index.prefix(1, '') == set()
+    assert len(index) == 0
+
+
+def test_rebuild_and_drop_guild():
+    index = MemberNameIndex()
+    other = SimpleNamespace(id=2)
+    index.add(_member(10, 'stale'))
+    index.add(_member(20, 'elsewhere', guild=other))
+
+    guild = SimpleNamespace(id=1, members=[_member(11, 'fresh')])
+    index.rebuild(guild)
+    assert index.exact(1, 'stale') == set()
+    assert index.exact(1, 'fresh') == {11}
+
+    index.drop_guild(2)
+    assert index.exact(2, 'elsewhere') == set()
+
+
+def test_find_members_queries_discord_when_guild_is_not_chunked(monkeypatch):
+    index = MemberNameIndex()
+    monkeypatch.setattr(member_index_module, 'member_index', index)
+    queried = _member(30, 'Remote')
+    queries = []
+
+    class Guild:
+        id = 1
+        chunked = False
+
+        async def query_members(self, query, limit, cache):
+            queries.append(query)
+            return [queried]
+
+        def get_member(self, member_id):
+            return queried if member_id == 30 else None
+
+    guild = Guild()
+    assert asyncio.run(find_members_by_name(guild, 'remote')) == [queried]
+    # Now indexed, so the next lookup is answered locally
+    assert asyncio.run(find_members_by_name(guild, 'REMOTE')) == [queried]
+    assert queries == ['remote']
@@ -0,0 +1,136 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils import resilience
+from utils.resilience import CircuitBreaker, CircuitOpenError, RateLimitExceeded, TokenBucket, backoff_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the limiter's sleeps; each one lasts until wake is set."""
+    recorded = SimpleNamespace(delays=[], wake=None)
+
+    async def fake_sleep(delay):
+        recorded.delays.append(delay)
+        await recorded.wake.wait()
+
+    monkeypatch.setattr(resilience, 'asyncio', SimpleNamespace(Lock=asyncio.Lock, sleep=fake_sleep))
+    return recorded
+
+
+def test_token_bucket_allows_burst_then_rejects(sleeps):
+    bucket = TokenBucket(rate=1, capacity=2, timer=FakeClock())
+
+    async def run():
+        await bucket.acquire(max_wait=0)
+        await bucket.acquire(max_wait=0)
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire(max_wait=0.5)
+
+    asyncio.run(run())
+    assert (bucket.acquired, bucket.rejected) == (2, 1)
+    assert sleeps.delays == []
+
+
+def test_token_bucket_waiters_queue_behind_reservations_without_the_lock(sleeps):
+    bucket = TokenBucket(rate=10, capacity=1, timer=FakeClock())
+
+    async def run():
+        sleeps.wake = asyncio.Event()
+        await bucket.acquire(max_wait=1)
+        second = asyncio.ensure_future(bucket.acquire(max_wait=1))
+        await asyncio.sleep(0)
+        assert sleeps.delays == [pytest.approx(0.1)]
+
+        # The second caller is asleep but holds no lock, so the next callers
+        # are answered at once, queued behind its reservation
+        with pytest.raises(RateLimitExceeded):
+            await asyncio.wait_for(bucket.acquire(max_wait=0.15), 1)
+        third = asyncio.ensure_future(bucket.acquire(max_wait=1))
+        await asyncio.sleep(0)
+        assert sleeps.delays == [pytest.approx(0.1), pytest.approx(0.2)]
+
+        sleeps.wake.set()
+        await asyncio.gather(second, third)
+
+    asyncio.run(run())
+    assert (bucket.acquired, bucket.rejected) == (3, 1)
+
+
+def test_token_bucket_pause_holds_tokens_back(sleeps):
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=5, timer=clock)
+
+    async def run():
+        bucket.pause(5)
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire(max_wait=1)
+        clock.now = 5.2
+        await bucket.acquire(max_wait=0)
+
+    asyncio.run(run())
+    assert bucket.stats()['paused_for'] == 0
+    assert sleeps.delays == []
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, timer=FakeClock())
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()['rejected'] == 1 and breaker.times_opened == 1
+
+
+def test_circuit_breaker_lets_one_probe_through_when_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, timer=clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # A failed probe re-opens the circuit for another reset_timeout
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 60
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_release_frees_the_probe_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, timer=clock)
+    breaker.record_failure()
+    clock.now = 30
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_backoff_delay_is_capped_and_floored():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 0.5, 8.0) <= 8.0
+    assert backoff_delay(0, 0.5, 8.0, floor=3.0) >= 3.0
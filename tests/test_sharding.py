@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import sharding
+from utils.sharding import ShardMetrics, get_local_guild, get_shard_options, owns_guild, parse_shard_ids, shard_id_for
+
+
+def test_parse_shard_ids():
+    assert parse_shard_ids(None) is None
+    assert parse_shard_ids('  ') is None
+    assert parse_shard_ids('0-3') == [0, 1, 2, 3]
+    assert parse_shard_ids('4, 0,2') == [0, 2, 4]
+    assert parse_shard_ids('0-1,6,1') == [0, 1, 6]
+    with pytest.raises(ValueError):
+        parse_shard_ids('3-1')
+    with pytest.raises(ValueError):
+        parse_shard_ids('a')
+
+
+def test_shard_options(monkeypatch):
+    monkeypatch.setattr(sharding, 'BOT_SHARDED', False)
+    assert get_shard_options() == {}
+
+    monkeypatch.setattr(sharding, 'BOT_SHARDED', True)
+    monkeypatch.setattr(sharding, 'BOT_SHARD_COUNT', 4)
+    monkeypatch.setattr(sharding, 'BOT_SHARD_IDS', '2-3')
+    assert get_shard_options() == {'shard_count': 4, 'shard_ids': [2, 3]}
+
+    monkeypatch.setattr(sharding, 'BOT_SHARD_IDS', '3-4')
+    with pytest.raises(ValueError):
+        get_shard_options()
+
+    monkeypatch.setattr(sharding, 'BOT_SHARD_COUNT', None)
+    monkeypatch.setattr(sharding, 'BOT_SHARD_IDS', '0')
+    with pytest.raises(ValueError):
+        get_shard_options()
+
+
+def test_guilds_are_routed_by_shard():
+    guild_id = (5 << 22) | 12345
+    assert shard_id_for(guild_id, 4) == 1
+    assert shard_id_for(guild_id, None) == 0
+
+    guild = SimpleNamespace(id=guild_id)
+    bot = SimpleNamespace(shard_id=1, shard_count=4, get_guild=lambda _: guild)
+    assert owns_guild(bot, guild_id)
+    assert get_local_guild(bot, guild_id) is guild
+
+    other = SimpleNamespace(shard_id=0, shard_count=4, get_guild=lambda _: guild)
+    assert not owns_guild(other, guild_id)
+    # Another process owns the guild: no lookup in a cache that cannot have it
+    assert get_local_guild(other, guild_id) is None
+
+
+def test_metrics_count_events_from_gateway_sequence(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(sharding.time, 'monotonic', lambda: clock.now)
+    ws = SimpleNamespace(latency=0.05, sequence=10)
+    bot = SimpleNamespace(shard_id=None, shard_count=None, ws=ws, guilds=[SimpleNamespace(shard_id=0)])
+    metrics = ShardMetrics()
+
+    metrics.record_connect(None)
+    metrics.sample(bot)
+    clock.now = 110.0
+    ws.sequence = 60
+    metrics.sample(bot)
+    stats = metrics.shards[0]
+    assert (stats.events, stats.event_rate, stats.latency) == (60, 5.0, 0.05)
+
+    # A new session restarts the sequence; its events are counted from zero
+    metrics.record_disconnect(None)
+    metrics.record_connect(None)
+    clock.now = 120.0
+    ws.sequence = 5
+    metrics.sample(bot)
+    assert (stats.events, stats.reconnects, stats.disconnects) == (65, 1, 1)
+
+    (line,) = metrics.describe(bot)
+    assert line.startswith("Shard 0: 1 guilds, latency 50 ms")
@@ -0,0 +1,154 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from conftest import FakeResult, FakeSession
+from database.models.transaction import ActionType
+from database.repository import session_manager
+from database.repository.transaction import TransactionRepository
+from utils.transaction_log import TransactionLog
+
+ADMIN = SimpleNamespace(id=1, name='admin', display_name='Admin')
+
+
+class FakeRepository:
+    """Collects inserted records; fails with the queued exceptions first."""
+    def __init__(self, failures=()):
+        self.rows = []
+        self.failures = list(failures)
+
+    async def insert_many(self, records):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.rows.extend(records)
+        return len(records)
+
+
+def _log(repository, **kwargs):
+    options = {'batch_size': 10, 'flush_interval': 0.01, 'max_queue': 100}
+    options.update(kwargs)
+    return TransactionLog(repository, **options)
+
+
+def test_records_are_written_in_batches_and_flushed_on_close():
+    repository = FakeRepository()
+
+    async def run():
+        log = _log(repository, batch_size=2)
+        log.start()
+        for team_id in range(5):
+            log.record(ActionType.kick, ADMIN, team_id=team_id)
+        await log.close()
+        return log
+
+    log = asyncio.run(run())
+    assert [row['team_id'] for row in repository.rows] == list(range(5))
+    assert log.stats()['written'] == 5 and log.stats()['dropped'] == 0
+
+
+def test_unexpected_error_drops_the_batch_and_keeps_writing():
+    repository = FakeRepository(failures=[RuntimeError("driver bug")])
+
+    async def run():
+        log = _log(repository)
+        log.start()
+        log.record(ActionType.invite, ADMIN, team_id=1)
+        await asyncio.sleep(0.05)
+        log.record(ActionType.invite, ADMIN, team_id=2)
+        await log.close()
+        return log
+
+    log = asyncio.run(run())
+    assert [row['team_id'] for row in repository.rows] == [2]
+    assert log.dropped == 1 and log.restarts == 0
+
+
+def test_crashed_writer_is_restarted():
+    repository = FakeRepository()
+
+    async def run():
+        log = _log(repository)
+        get = log._queue.get
+        calls = []
+
+        async def crash_once():
+            if not calls:
+                calls.append(1)
+                raise RuntimeError("writer crashed")
+            return await get()
+
+        log._queue.get = crash_once
+        log.start()
+        await asyncio.sleep(0.01)
+        log.record(ActionType.join, ADMIN, team_id=1)
+        await log.close()
+        return log
+
+    log = asyncio.run(run())
+    assert log.restarts == 1
+    assert [row['team_id'] for row in repository.rows] == [1]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    repository = FakeRepository()
+
+    async def run():
+        # Not started: nothing drains the queue
+        log = _log(repository, max_queue=2)
+        for team_id in range(5):
+            log.record(ActionType.kick, ADMIN, team_id=team_id)
+        stats = log.stats()
+        log.start()
+        await log.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats['queued'] == 2 and stats['overflowed'] == 3 and stats['dropped'] == 3
+    assert [row['team_id'] for row in repository.rows] == [0, 1]
+
+
+def test_integrity_error_falls_back_to_single_rows():
+    error = IntegrityError('INSERT INTO transactions', {}, Exception('team was deleted'))
+    # The batch fails, then the first single-row retry fails too
+    repository = FakeRepository(failures=[error, error])
+
+    async def run():
+        log = _log(repository)
+        log.start()
+        log.record(ActionType.kick, ADMIN, team_id=1)
+        log.record(ActionType.kick, ADMIN, team_id=2)
+        await log.close()
+        return log
+
+    log = asyncio.run(run())
+    assert [row['team_id'] for row in repository.rows] == [2]
+    assert log.dropped == 1
+
+
+def test_insert_many_creates_missing_actor_users_first():
+    session = FakeSession([FakeResult(), FakeResult(rowcount=2)])
+    timestamp = datetime.datetime(2026, 1, 1)
+    records = [
+        {'action_type': ActionType.join, 'actor_id': ADMIN.id, 'actor_username': ADMIN.name,
+         'actor_display_name': ADMIN.display_name, 'team_id': team_id, 'user_id': 5,
+         'details': None, 'timestamp': timestamp}
+        for team_id in (1, 2)
+    ]
+
+    async def run():
+        token = session_manager._ambient_session.set(session)
+        try:
+            return await TransactionRepository().insert_many(records)
+        finally:
+            session_manager._ambient_session.reset(token)
+
+    assert asyncio.run(run()) == 2
+    users, transactions = (str(statement.compile(dialect=postgresql.dialect())) for statement in session.statements)
+    assert users.startswith('INSERT INTO users') and 'ON CONFLICT (user_id) DO NOTHING' in users
+    # One users row per actor, however many records they have
+    assert len(session.statements[0].compile().params) <= 4
+    assert transactions.startswith('INSERT INTO transactions')
+    assert 'actor_username' not in transactions
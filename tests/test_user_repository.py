@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from conftest import FakeResult
+from database.dtos import UserDTO
+from database.repository import session_manager
+from database.repository.user_repository import UserRepository
+from utils.cache import LocalCache
+
+
+@pytest.fixture
+def verified_cache(monkeypatch):
+    namespace = LocalCache(maxsize=100).namespace('verified')
+    monkeypatch.setattr(UserRepository, '_verified', namespace)
+    return namespace
+
+
+def _user(user_id: int, verified: bool) -> UserDTO:
+    return UserDTO(user_id, f'user{user_id}', f'User {user_id}', None, verified, f'roblox{user_id}')
+
+
+def test_verification_is_cached_only_after_commit(fake_db, verified_cache):
+    repository = UserRepository()
+
+    async def run():
+        async with session_manager.unit_of_work():
+            await repository.track_verification(_user(1, True))
+            assert not await repository.is_known_verified(1)
+        return await repository.is_known_verified(1)
+
+    assert asyncio.run(run())
+
+
+def test_rolled_back_verification_is_not_cached(fake_db, verified_cache):
+    repository = UserRepository()
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            async with session_manager.unit_of_work():
+                await repository.track_verification(_user(1, True))
+                raise RuntimeError("write failed")
+        return await repository.is_known_verified(1)
+
+    assert not asyncio.run(run())
+
+
+def test_unverified_user_is_evicted_after_commit(fake_db, verified_cache):
+    repository = UserRepository()
+
+    async def run():
+        await repository.track_verification(_user(1, True))
+        async with session_manager.unit_of_work():
+            await repository.track_verification(_user(1, False))
+            assert await repository.is_known_verified(1)
+        return await repository.is_known_verified(1)
+
+    assert not asyncio.run(run())
+
+
+def test_bulk_upsert_caches_written_users_after_commit(fake_db, verified_cache):
+    repository = UserRepository()
+    fake_db.results = [FakeResult([(1,), (2,)])]
+
+    async def run():
+        async with session_manager.unit_of_work():
+            written = await repository.bulk_upsert_verified([
+                {'user_id': user_id, 'username': 'u', 'display_name': 'U', 'roblox_username': 'r'}
+                for user_id in (1, 2)
+            ])
+            assert not await repository.is_known_verified(1)
+        return written, await repository.is_known_verified(1), await repository.is_known_verified(2)
+
+    assert asyncio.run(run()) == (2, True, True)
+
+
+def test_deleted_user_is_forgotten(fake_db, verified_cache):
+    repository = UserRepository()
+    fake_db.results = [FakeResult([(1,)])]
+
+    async def run():
+        await repository.track_verification(_user(1, True))
+        deleted = await repository.delete_by_user_id_or_roblox_username(user_id=1)
+        return deleted, await repository.is_known_verified(1)
+
+    assert asyncio.run(run()) == (True, False)
@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Dict, List
+
+import pytest
+
+from utils import verification
+from utils.bloxlink import BloxlinkAPI, BloxlinkUnavailableError
+from utils.verification import sweep_guild_verification
+
+
+class FakeUserRepository:
+    def __init__(self, verified_ids=()):
+        self.verified_ids = set(verified_ids)
+        self.upserts: List[List[Dict]] = []
+
+    async def get_verified_ids(self, user_ids):
+        return self.verified_ids.intersection(user_ids)
+
+    async def bulk_upsert_verified(self, rows):
+        self.upserts.append(rows)
+        return len(rows)
+
+
+def _guild(member_ids, bots=()):
+    members = [
+        SimpleNamespace(id=member_id, name=f'user{member_id}', display_name=f'User {member_id}', bot=member_id in bots)
+        for member_id in member_ids
+    ]
+    return SimpleNamespace(id=1, chunked=True, members=members)
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    fake = FakeUserRepository(verified_ids={1})
+    monkeypatch.setattr(verification, 'user_repository', fake)
+    return fake
+
+
+def _bloxlink(monkeypatch, answer):
+    lookups = []
+
+    async def get_roblox_user(cls, server_id, discord_id):
+        lookups.append(discord_id)
+        return answer(discord_id)
+
+    monkeypatch.setattr(BloxlinkAPI, 'get_roblox_user', classmethod(get_roblox_user))
+    return lookups
+
+
+def test_sweep_verifies_new_members_in_chunks(monkeypatch, repository):
+    def answer(discord_id):
+        if discord_id == 3:
+            return False, None
+        if discord_id == 4:
+            raise BloxlinkUnavailableError("timeout")
+        return True, {'robloxID': str(discord_id * 100), 'robloxUsername': f'roblox{discord_id}'}
+
+    lookups = _bloxlink(monkeypatch, answer)
+    reports = []
+
+    async def on_progress(progress):
+        reports.append(progress.processed)
+
+    guild = _guild(range(1, 7), bots={6})
+    progress = asyncio.run(sweep_guild_verification(guild, on_progress=on_progress, chunk_size=2))
+
+    # Bots are skipped and already verified members are never looked up
+    assert sorted(lookups) == [2, 3, 4, 5]
+    assert (progress.total, progress.processed) == (5, 5)
+    assert (progress.already_verified, progress.verified, progress.not_verified, progress.failed) == (1, 2, 1, 1)
+    assert not progress.aborted
+    assert reports == [2, 4, 5]
+    assert [[row['user_id'] for row in rows] for rows in repository.upserts] == [[2], [], [5]]
+    assert repository.upserts[0][0]['roblox_username'] == 'roblox2'
+
+
+def test_sweep_stops_when_bloxlink_is_down(monkeypatch, repository):
+    def answer(discord_id):
+        raise BloxlinkUnavailableError("circuit open")
+
+    lookups = _bloxlink(monkeypatch, answer)
+    progress = asyncio.run(sweep_guild_verification(_guild(range(1, 8)), chunk_size=3))
+
+    assert progress.aborted
+    assert progress.processed == 3
+    assert sorted(lookups) == [2, 3]
+    assert "aborted" in progress.describe()
@@ -1,47 +1,275 @@
 import aiohttp
+import asyncio
 import logging
+import time
 from typing import Dict, Any, Optional, Tuple
+from config import (
+    BLOXLINK_BASE_URL,
+    BLOXLINK_API_KEY,
+    BLOXLINK_TIMEOUT,
+    BLOXLINK_CONNECT_TIMEOUT,
+    BLOXLINK_POOL_SIZE,
+    BLOXLINK_POOL_PER_HOST,
+    BLOXLINK_CACHE_TTL,
+    BLOXLINK_NEGATIVE_CACHE_TTL,
+    BLOXLINK_CACHE_SIZE,
+    BLOXLINK_RATE_LIMIT,
+    BLOXLINK_RATE_BURST,
+    BLOXLINK_MAX_RETRIES,
+    BLOXLINK_BREAKER_THRESHOLD,
+    BLOXLINK_BREAKER_RESET,
+)
+from utils.cache import TTLCache
+from utils.resilience import TokenBucket, CircuitBreaker, RateLimitExceeded, CircuitOpenError, backoff_delay
 
 logger = logging.getLogger(__name__)
 
+# Statuses worth retrying; anything else that is not 200/404 fails immediately
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class BloxlinkUnavailableError(Exception):
+    """Raised when Bloxlink cannot give a definitive answer (outage, rate limit, open circuit)."""
+
+
 class BloxlinkAPI:
     """
-    Utility class for interacting with the Bloxlink API
+    Utility class for interacting with the Bloxlink API.
+
+    All requests share one long-lived aiohttp session so connections are pooled
+    and kept alive. The bot opens it on startup and closes it on shutdown; it is
+    also opened lazily on first use.
+
+    Lookups are cached per (guild, discord id): verified users for a long TTL,
+    404s for a short one. Errors are never cached. Concurrent misses for the
+    same key share a single upstream request.
+
+    Upstream calls go through a token bucket (paused when Bloxlink reports its
+    own limit is exhausted), are retried with jittered exponential backoff on
+    transient failures, and are guarded by a circuit breaker. When no definitive
+    answer can be had, BloxlinkUnavailableError is raised instead of reporting
+    the user as unverified.
     """
-    BASE_URL = "https://api.blox.link/v4/public"
-    
-    @staticmethod
-    async def get_roblox_user(server_id: int, discord_id: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    BASE_URL = BLOXLINK_BASE_URL
+
+    _session: Optional[aiohttp.ClientSession] = None
+    _cache = TTLCache(maxsize=BLOXLINK_CACHE_SIZE, ttl=BLOXLINK_CACHE_TTL)
+    _inflight: Dict[Tuple[int, int], "asyncio.Future"] = {}
+    _coalesced = 0
+    _upstream_calls = 0
+    _upstream_seconds = 0.0
+    _upstream_max_seconds = 0.0
+    _limiter = TokenBucket(rate=BLOXLINK_RATE_LIMIT, capacity=BLOXLINK_RATE_BURST)
+    _breaker = CircuitBreaker(failure_threshold=BLOXLINK_BREAKER_THRESHOLD, reset_timeout=BLOXLINK_BREAKER_RESET)
+
+    # Longest a caller waits for a rate-limit token before giving up
+    MAX_TOKEN_WAIT = 5.0
+    RETRY_BASE_DELAY = 0.5
+    RETRY_MAX_DELAY = 8.0
+
+    @classmethod
+    async def open(
+        cls,
+        base_url: Optional[str] = None,
+        timeout: float = BLOXLINK_TIMEOUT,
+        connect_timeout: float = BLOXLINK_CONNECT_TIMEOUT,
+        pool_size: int = BLOXLINK_POOL_SIZE,
+        pool_per_host: int = BLOXLINK_POOL_PER_HOST,
+    ) -> aiohttp.ClientSession:
+        """
+        Open the shared HTTP session if it is not already open.
+
+        Args:
+            base_url: Override the API base URL (e.g. a local stand-in server)
+            timeout: Total timeout per request in seconds
+            connect_timeout: Timeout for establishing a connection in seconds
+            pool_size: Maximum number of pooled connections
+            pool_per_host: Maximum number of pooled connections per host
+
+        Returns:
+            The shared session
+        """
+        if base_url:
+            cls.BASE_URL = base_url.rstrip('/')
+        if cls._session is not None and not cls._session.closed:
+            return cls._session
+
+        connector = aiohttp.TCPConnector(
+            limit=pool_size,
+            limit_per_host=pool_per_host,
+            keepalive_timeout=60,
+            ttl_dns_cache=300,
+        )
+        cls._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=timeout, connect=connect_timeout),
+            headers={'Authorization': BLOXLINK_API_KEY},
+        )
+        return cls._session
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared HTTP session and its connection pool."""
+        session, cls._session = cls._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    @classmethod
+    async def get_roblox_user(cls, server_id: int, discord_id: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """
         Check if a Discord user is verified with Bloxlink and get their Roblox info.
-        
+
         Args:
             server_id: The Discord server ID
             discord_id: The Discord user ID
-            
+
         Returns:
             Tuple containing:
                 - Success status (True if verified, False if not)
                 - User data if verified, or None if not verified
+
+        Raises:
+            BloxlinkUnavailableError: If Bloxlink is unhealthy or rate limited
         """
-        url = f"{BloxlinkAPI.BASE_URL}/guilds/{server_id}/discord-to-roblox/{discord_id}"
-        headers = {
-            'Authorization': '819a60d0-21b2-4a93-acc6-abfc19d8f013'
-        }
-        
+        key = (server_id, discord_id)
+        cached = cls._cache.get(key)
+        if cached is not None:
+            return cached
+
+        inflight = cls._inflight.get(key)
+        if inflight is not None:
+            cls._coalesced += 1
+        else:
+            inflight = asyncio.ensure_future(cls._load_roblox_user(key))
+            cls._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: cls._inflight.pop(key, None))
+
+        # Shield so a cancelled caller does not cancel the request for the others
+        return await asyncio.shield(inflight)
+
+    @classmethod
+    async def _load_roblox_user(cls, key: Tuple[int, int]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Fetch a user from upstream and cache the (always definitive) answer."""
+        verified, data = await cls._fetch_roblox_user(*key)
+        cls._cache.set(key, (verified, data), ttl=None if verified else BLOXLINK_NEGATIVE_CACHE_TTL)
+        return verified, data
+
+    @classmethod
+    async def _fetch_roblox_user(cls, server_id: int, discord_id: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Perform the upstream lookup with rate limiting, retries and the circuit breaker.
+
+        Returns:
+            Tuple of (verified, data) for a 200 or 404 response
+
+        Raises:
+            BloxlinkUnavailableError: If no definitive answer could be obtained
+        """
+        url = f"{cls.BASE_URL}/guilds/{server_id}/discord-to-roblox/{discord_id}"
+
+        try:
+            cls._breaker.before_call()
+        except CircuitOpenError as e:
+            raise BloxlinkUnavailableError(str(e)) from e
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return True, data
-                    elif response.status == 404:
-                        # User not found/not verified
-                        return False, None
-                    else:
-                        # Other API error
-                        logger.error(f"Bloxlink API error: {response.status}, {await response.text()}")
-                        return False, None
+            return await cls._request_with_retries(url)
+        except BloxlinkUnavailableError:
+            raise
         except Exception as e:
-            logger.error(f"Error checking Bloxlink verification: {str(e)}")
-            return False, None
+            # An unexpected response (bad JSON, ...) still counts against upstream
+            logger.exception("Unexpected error checking Bloxlink verification")
+            cls._breaker.record_failure()
+            raise BloxlinkUnavailableError(f"Bloxlink lookup failed: {str(e)}") from e
+        finally:
+            # Never leave a half-open probe slot taken, e.g. when cancelled
+            cls._breaker.release()
+
+    @classmethod
+    async def _request_with_retries(cls, url: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Request url until a definitive answer, settling the circuit breaker with the outcome."""
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                await cls._limiter.acquire(cls.MAX_TOKEN_WAIT)
+                status, data, retry_after = await cls._request(url)
+            except RateLimitExceeded as e:
+                # Our own limiter said no; this is not an upstream failure
+                cls._breaker.release()
+                raise BloxlinkUnavailableError(str(e)) from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Error checking Bloxlink verification: {str(e)}")
+                status = None
+            else:
+                if status == 200:
+                    cls._breaker.record_success()
+                    return True, data
+                if status == 404:
+                    # User not found/not verified
+                    cls._breaker.record_success()
+                    return False, None
+                logger.warning(f"Bloxlink API error: {status}")
+
+            retryable = status is None or status in RETRYABLE_STATUSES
+            # Don't hold a command hostage to a long upstream cooldown
+            if retry_after is not None and retry_after > cls.MAX_TOKEN_WAIT:
+                retryable = False
+            if not retryable or attempt >= BLOXLINK_MAX_RETRIES:
+                cls._breaker.record_failure()
+                raise BloxlinkUnavailableError(f"Bloxlink lookup failed (status {status})")
+
+            await asyncio.sleep(backoff_delay(attempt, cls.RETRY_BASE_DELAY, cls.RETRY_MAX_DELAY, floor=retry_after))
+            attempt += 1
+
+    @classmethod
+    async def _request(cls, url: str) -> Tuple[int, Optional[Dict[str, Any]], Optional[float]]:
+        """
+        Send one request and apply any rate-limit headers to the token bucket.
+
+        Returns:
+            Tuple of (status, JSON body for a 200, Retry-After seconds if given)
+        """
+        started = time.perf_counter()
+        try:
+            session = await cls.open()
+            async with session.get(url) as response:
+                retry_after = cls._apply_rate_limit_headers(response)
+                data = await response.json() if response.status == 200 else None
+                return response.status, data, retry_after
+        finally:
+            elapsed = time.perf_counter() - started
+            cls._upstream_calls += 1
+            cls._upstream_seconds += elapsed
+            cls._upstream_max_seconds = max(cls._upstream_max_seconds, elapsed)
+
+    @classmethod
+    def _apply_rate_limit_headers(cls, response: aiohttp.ClientResponse) -> Optional[float]:
+        """Pause the token bucket when the response says the upstream limit is spent."""
+        headers = response.headers
+        retry_after = None
+        try:
+            if 'Retry-After' in headers:
+                retry_after = float(headers['Retry-After'])
+            elif headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset-After' in headers:
+                retry_after = float(headers['X-RateLimit-Reset-After'])
+        except ValueError:
+            return None
+
+        if retry_after is not None:
+            cls._limiter.pause(retry_after)
+        return retry_after
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Cache hit rate, request coalescing and upstream latency figures."""
+        return {
+            'cache': cls._cache.stats(),
+            'coalesced': cls._coalesced,
+            'inflight': len(cls._inflight),
+            'upstream_calls': cls._upstream_calls,
+            'upstream_avg_ms': cls._upstream_seconds / cls._upstream_calls * 1000 if cls._upstream_calls else 0.0,
+            'upstream_max_ms': cls._upstream_max_seconds * 1000,
+            'limiter': cls._limiter.stats(),
+            'breaker': cls._breaker.stats(),
+        }
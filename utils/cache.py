@@ -0,0 +1,420 @@
+import logging
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from config import CACHE_BACKEND, CACHE_URL, CACHE_KEY_PREFIX, CACHE_LOCAL_SIZE, CACHE_L1_TTL
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process cache with LRU eviction and a fixed time-to-live per entry.
+    
+    Not thread-safe; meant to be used from the bot's event loop.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, timer: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            maxsize: Maximum number of entries before the least recently used is evicted
+            ttl: Seconds an entry stays valid after it was set
+            timer: Monotonic clock, replaceable for testing
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if it is missing or expired."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        
+        expires_at, value = entry
+        if expires_at <= self._timer():
+            del self._data[key]
+            self.misses += 1
+            return default
+        
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries past maxsize."""
+        self._data[key] = (self._timer() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value (expired or not)."""
+        entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        return entry[1]
+    
+    def clear(self) -> None:
+        """Remove every entry; counters are kept."""
+        self._data.clear()
+    
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Iterate over live (unexpired) entries without touching LRU order or counters."""
+        now = self._timer()
+        for key, (expires_at, value) in list(self._data.items()):
+            if expires_at > now:
+                yield key, value
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend:
+    """
+    Async key/value cache shared by the repositories.
+    
+    Keys are strings and values any picklable object (None included, so
+    "known to be missing" can be cached). The batched operations are the
+    primitives; backends fail open, so an unreachable cache reads as misses.
+    """
+    name = 'base'
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the cached entries among keys; missing keys are left out."""
+        raise NotImplementedError
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store several entries, each valid for ttl seconds (the backend default if None)."""
+        raise NotImplementedError
+    
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        """Remove entries."""
+        raise NotImplementedError
+    
+    async def get(self, key: str, default: Any = None) -> Any:
+        return (await self.get_many([key])).get(key, default)
+    
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.set_many({key: value}, ttl)
+    
+    async def delete(self, key: str) -> None:
+        await self.delete_many([key])
+    
+    def namespace(self, name: str, ttl: Optional[float] = None, maxsize: Optional[int] = None) -> 'CacheNamespace':
+        """
+        A view of this backend whose keys are prefixed with name.
+        
+        Args:
+            name: Namespace name, part of every key
+            ttl: Default seconds its entries stay valid
+            maxsize: Entries it may hold in the in-process tier (the backend's
+                size if None), in its own LRU so other namespaces cannot evict them
+        """
+        namespace = CacheNamespace(self, name, ttl)
+        self.reserve(namespace.key(''), maxsize)
+        return namespace
+    
+    def reserve(self, prefix: str, maxsize: Optional[int] = None) -> None:
+        """Give keys starting with prefix their own in-process capacity, if there is an in-process tier."""
+    
+    # Whether entries are held in this process, where other processes' writes
+    # can only reach them through invalidation events
+    has_local_tier = False
+    
+    def evict_local(self, keys: Iterable[str]) -> None:
+        """Drop entries from the in-process tier only, without any I/O."""
+    
+    def clear_local(self) -> None:
+        """Drop the whole in-process tier (e.g. after invalidation events may have been missed)."""
+    
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name}
+    
+    async def close(self) -> None:
+        pass
+
+
+class LocalCache(CacheBackend):
+    """
+    In-process backend: LRU TTLCaches. Entries are not shared between processes.
+    
+    Reserved key prefixes (one per namespace) each get their own LRU, so a
+    large namespace filling up only evicts its own entries.
+    """
+    name = 'local'
+    has_local_tier = True
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._partitions: Dict[str, TTLCache] = {}
+    
+    def reserve(self, prefix: str, maxsize: Optional[int] = None) -> None:
+        if prefix not in self._partitions:
+            self._partitions[prefix] = TTLCache(maxsize=maxsize or self.maxsize, ttl=self.ttl)
+    
+    def _cache_for(self, key: str) -> TTLCache:
+        for prefix, partition in self._partitions.items():
+            if key.startswith(prefix):
+                return partition
+        return self._cache
+    
+    def evict_local(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._cache_for(key).pop(key)
+    
+    def clear_local(self) -> None:
+        self._cache.clear()
+        for partition in self._partitions.values():
+            partition.clear()
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        found = {}
+        for key in keys:
+            value = self._cache_for(key).get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        for key, value in items.items():
+            self._cache_for(key).set(key, value, ttl)
+    
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._cache_for(key).pop(key)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters summed over every LRU, plus each namespace's own."""
+        caches = [self._cache, *self._partitions.values()]
+        hits = sum(lru.hits for lru in caches)
+        lookups = hits + sum(lru.misses for lru in caches)
+        return {
+            'backend': self.name,
+            'hits': hits,
+            'misses': lookups - hits,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'size': sum(len(lru) for lru in caches),
+            'maxsize': sum(lru.maxsize for lru in caches),
+            'namespaces': {prefix: partition.stats() for prefix, partition in self._partitions.items()},
+        }
+
+
+class RedisCache(CacheBackend):
+    """
+    Shared backend on Redis (or any server speaking its protocol, such as a
+    local in-memory stand-in). Values are pickled; batches are one MGET or
+    one pipelined round trip.
+    """
+    name = 'redis'
+    
+    def __init__(self, url: str, ttl: float = 300.0, client: Any = None):
+        """
+        Args:
+            url: Server URL, e.g. redis://localhost:6379/0
+            ttl: Default seconds an entry stays valid
+            client: An existing redis.asyncio client to use instead of url
+        """
+        if client is None:
+            # Only deployments using the shared backend need the redis package
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self._client = client
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = await self._client.mget(keys)
+        except Exception as e:
+            self.errors += 1
+            self.misses += len(keys)
+            logger.warning(f"Cache read failed: {str(e)}")
+            return {}
+        
+        found = {}
+        for key, raw in zip(keys, values):
+            if raw is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                found[key] = pickle.loads(raw)
+        return found
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        if not items:
+            return
+        expires_ms = max(int((self.ttl if ttl is None else ttl) * 1000), 1)
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), px=expires_ms)
+            await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache write failed: {str(e)}")
+    
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            await self._client.delete(*keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache delete failed: {str(e)}")
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'errors': self.errors,
+        }
+    
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class TieredCache(CacheBackend):
+    """
+    A short-lived local L1 in front of a shared L2.
+    
+    Reads try L1 first and fill it from L2; writes and deletes go to both.
+    Other processes' writes reach L1 through invalidation events, or at the
+    latest when the L1 entries expire.
+    """
+    name = 'tiered'
+    has_local_tier = True
+    
+    def __init__(self, l1: LocalCache, l2: CacheBackend, l1_ttl: float = 5.0):
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+    
+    def reserve(self, prefix: str, maxsize: Optional[int] = None) -> None:
+        self.l1.reserve(prefix, maxsize)
+    
+    def evict_local(self, keys: Iterable[str]) -> None:
+        self.l1.evict_local(keys)
+    
+    def clear_local(self) -> None:
+        self.l1.clear_local()
+    
+    def _l1_ttl(self, ttl: Optional[float]) -> float:
+        return self.l1_ttl if ttl is None else min(ttl, self.l1_ttl)
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found = await self.l1.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            remote = await self.l2.get_many(missing)
+            if remote:
+                await self.l1.set_many(remote, self.l1_ttl)
+                found.update(remote)
+        return found
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        await self.l2.set_many(items, ttl)
+        await self.l1.set_many(items, self._l1_ttl(ttl))
+    
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        await self.l2.delete_many(keys)
+        await self.l1.delete_many(keys)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'l1': self.l1.stats(), 'l2': self.l2.stats()}
+    
+    async def close(self) -> None:
+        await self.l2.close()
+
+
+class CacheNamespace:
+    """
+    One repository's slice of a backend: keys are prefixed with the namespace
+    and entries default to the namespace's TTL.
+    """
+    def __init__(self, backend: CacheBackend, name: str, ttl: Optional[float] = None):
+        self.backend = backend
+        self.name = name
+        self.ttl = ttl
+        self._prefix = f"{CACHE_KEY_PREFIX}{name}:"
+    
+    def key(self, key: Hashable) -> str:
+        """The full backend key for a key in this namespace."""
+        return f"{self._prefix}{key}"
+    
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        return await self.backend.get(self.key(key), default)
+    
+    async def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Return the cached entries among keys, keyed by the unprefixed keys."""
+        full_keys = {self.key(key): key for key in keys}
+        found = await self.backend.get_many(full_keys)
+        return {full_keys[full_key]: value for full_key, value in found.items()}
+    
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        await self.backend.set(self.key(key), value, self.ttl if ttl is None else ttl)
+    
+    async def set_many(self, items: Dict[Hashable, Any], ttl: Optional[float] = None) -> None:
+        await self.backend.set_many(
+            {self.key(key): value for key, value in items.items()},
+            self.ttl if ttl is None else ttl
+        )
+    
+    async def delete(self, key: Hashable) -> None:
+        await self.backend.delete(self.key(key))
+    
+    async def delete_many(self, keys: Iterable[Hashable]) -> None:
+        await self.backend.delete_many([self.key(key) for key in keys])
+
+
+def build_cache(backend: str = CACHE_BACKEND, url: Optional[str] = CACHE_URL) -> CacheBackend:
+    """
+    Build the configured cache backend.
+    
+    Args:
+        backend: local, shared (Redis only) or tiered (local L1 in front of Redis)
+        url: Shared server URL, required for shared and tiered
+    """
+    if backend == 'local':
+        return LocalCache(maxsize=CACHE_LOCAL_SIZE)
+    if not url:
+        raise ValueError(f"CACHE_BACKEND '{backend}' requires CACHE_URL")
+    if backend == 'shared':
+        return RedisCache(url)
+    if backend == 'tiered':
+        return TieredCache(LocalCache(maxsize=CACHE_LOCAL_SIZE), RedisCache(url), l1_ttl=CACHE_L1_TTL)
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}', expected local, shared or tiered")
+
+
+# Process-wide backend the repositories take their namespaces from
+cache = build_cache()
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+from discord.ext import commands
+from config import COMMAND_SYNC_STATE_PATH
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = 'global'
+
+
+def _scoped_commands(bot: commands.Bot) -> Dict[str, list]:
+    """Group the bot's pending application commands by scope ('global' or a guild ID)."""
+    scopes: Dict[str, list] = {}
+    for command in bot.pending_application_commands:
+        if command.guild_ids is None:
+            scopes.setdefault(GLOBAL_SCOPE, []).append(command)
+        else:
+            for guild_id in command.guild_ids:
+                scopes.setdefault(str(guild_id), []).append(command)
+    return scopes
+
+
+def _hash_commands(command_list: list) -> str:
+    payloads = sorted(
+        (command.to_dict() for command in command_list),
+        key=lambda payload: (payload.get('type', 1), payload['name'])
+    )
+    # guild_ids is not part of the uploaded payload but may appear in to_dict()
+    for payload in payloads:
+        payload.pop('guild_ids', None)
+    return hashlib.sha256(json.dumps(payloads, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _load_state(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(path: str, state: dict) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _restore_ids(bot: commands.Bot, command_list: list, ids: Dict[str, str]) -> None:
+    """Re-attach command IDs from the last sync so interactions resolve without a lookup scan."""
+    for command in command_list:
+        command_id = ids.get(f"{command.type}:{command.name}")
+        if command_id:
+            command.id = command_id
+            bot._application_commands[command_id] = command
+
+
+async def sync_changed_commands(bot: commands.Bot, path: Optional[str] = None) -> List[str]:
+    """
+    Upload slash commands only for scopes whose command tree changed since the last sync.
+
+    Each scope (global, and every guild with guild-specific commands) is hashed
+    and compared with the hash recorded in the sync state file; unchanged scopes
+    cost no API calls. Scopes that no longer have any commands are cleared.
+
+    Args:
+        bot: The bot, logged in
+        path: Sync state file, defaults to COMMAND_SYNC_STATE_PATH
+
+    Returns:
+        The scopes that were synced
+    """
+    path = path or COMMAND_SYNC_STATE_PATH
+    state = _load_state(path)
+    # A different application (e.g. a test bot token) starts from scratch
+    if state.get('application_id') != bot.user.id:
+        state = {'application_id': bot.user.id, 'scopes': {}}
+    recorded = state.setdefault('scopes', {})
+
+    local = _scoped_commands(bot)
+    synced = []
+
+    for scope in set(recorded) - set(local):
+        await bot.register_commands([], guild_id=None if scope == GLOBAL_SCOPE else int(scope), method='bulk', force=True)
+        del recorded[scope]
+        synced.append(scope)
+
+    for scope, command_list in local.items():
+        digest = _hash_commands(command_list)
+        previous = recorded.get(scope)
+        if previous and previous.get('hash') == digest:
+            _restore_ids(bot, command_list, previous.get('ids', {}))
+            continue
+
+        registered = await bot.register_commands(
+            command_list,
+            guild_id=None if scope == GLOBAL_SCOPE else int(scope),
+            method='bulk',
+            force=True
+        )
+        recorded[scope] = {
+            'hash': digest,
+            'ids': {f"{item.get('type', 1)}:{item['name']}": item['id'] for item in registered},
+        }
+        synced.append(scope)
+
+    if synced:
+        _save_state(path, state)
+    return synced
+
+
+async def attach_command_ids(bot: commands.Bot, path: Optional[str] = None) -> None:
+    """
+    Attach the IDs of already registered commands without uploading anything.
+
+    Used by processes that do not own the sync (e.g. shards other than 0):
+    IDs come from the sync state file when its hash matches, otherwise they
+    are read from Discord.
+
+    Args:
+        bot: The bot, logged in
+        path: Sync state file, defaults to COMMAND_SYNC_STATE_PATH
+    """
+    state = _load_state(path or COMMAND_SYNC_STATE_PATH)
+    recorded = state.get('scopes', {}) if state.get('application_id') == bot.user.id else {}
+
+    for scope, command_list in _scoped_commands(bot).items():
+        previous = recorded.get(scope)
+        if previous and previous.get('hash') == _hash_commands(command_list):
+            ids = previous.get('ids', {})
+        elif scope == GLOBAL_SCOPE:
+            registered = await bot.http.get_global_commands(bot.user.id)
+            ids = {f"{item.get('type', 1)}:{item['name']}": item['id'] for item in registered}
+        else:
+            registered = await bot.http.get_guild_commands(bot.user.id, int(scope))
+            ids = {f"{item.get('type', 1)}:{item['name']}": item['id'] for item in registered}
+        _restore_ids(bot, command_list, ids)
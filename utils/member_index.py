@@ -0,0 +1,126 @@
+import asyncio
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set
+import discord
+
+
+class MemberNameIndex:
+    """
+    Case-folded index of member usernames and nicknames to member IDs, per guild.
+
+    Kept current by the member join/update/remove events so name lookups never
+    have to scan guild.members. Each guild keeps a sorted key list alongside the
+    name -> IDs mapping so prefix lookups are a binary search.
+    """
+    def __init__(self):
+        self._names: Dict[int, Dict[str, Set[int]]] = {}
+        self._sorted: Dict[int, List[str]] = {}
+        self._keys_by_member: Dict[int, Dict[int, Set[str]]] = {}
+
+    @staticmethod
+    def _keys_for(member: discord.Member) -> Set[str]:
+        keys = {member.name.casefold()}
+        if member.nick:
+            keys.add(member.nick.casefold())
+        return keys
+
+    def _add_key(self, guild_id: int, key: str, member_id: int) -> None:
+        names = self._names.setdefault(guild_id, {})
+        ids = names.get(key)
+        if ids is None:
+            names[key] = {member_id}
+            insort(self._sorted.setdefault(guild_id, []), key)
+        else:
+            ids.add(member_id)
+
+    def _remove_key(self, guild_id: int, key: str, member_id: int) -> None:
+        names = self._names.get(guild_id, {})
+        ids = names.get(key)
+        if not ids:
+            return
+        ids.discard(member_id)
+        if not ids:
+            del names[key]
+            keys = self._sorted[guild_id]
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+
+    def add(self, member: discord.Member) -> None:
+        """Index a member (or re-index one whose names changed)."""
+        guild_id = member.guild.id
+        members = self._keys_by_member.setdefault(guild_id, {})
+        old_keys = members.get(member.id, set())
+        new_keys = self._keys_for(member)
+
+        for key in old_keys - new_keys:
+            self._remove_key(guild_id, key, member.id)
+        for key in new_keys - old_keys:
+            self._add_key(guild_id, key, member.id)
+        members[member.id] = new_keys
+
+    def remove(self, guild_id: int, member_id: int) -> None:
+        """Drop a member from a guild's index."""
+        for key in self._keys_by_member.get(guild_id, {}).pop(member_id, set()):
+            self._remove_key(guild_id, key, member_id)
+
+    def rebuild(self, guild: discord.Guild, members: Iterable[discord.Member] = None) -> None:
+        """Rebuild a guild's index from scratch (e.g. after the guild is chunked)."""
+        self.drop_guild(guild.id)
+        for member in guild.members if members is None else members:
+            self.add(member)
+
+    def drop_guild(self, guild_id: int) -> None:
+        """Forget everything indexed for a guild."""
+        self._names.pop(guild_id, None)
+        self._sorted.pop(guild_id, None)
+        self._keys_by_member.pop(guild_id, None)
+
+    def exact(self, guild_id: int, name: str) -> Set[int]:
+        """IDs of members whose username or nickname equals name (case-insensitive)."""
+        return set(self._names.get(guild_id, {}).get(name.casefold(), ()))
+
+    def prefix(self, guild_id: int, prefix: str, limit: int = 25) -> Set[int]:
+        """IDs of members whose username or nickname starts with prefix (case-insensitive)."""
+        prefix = prefix.casefold()
+        keys = self._sorted.get(guild_id, [])
+        names = self._names.get(guild_id, {})
+        found: Set[int] = set()
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix) and len(found) < limit:
+            found.update(names[keys[position]])
+            position += 1
+        return found
+
+    def __len__(self) -> int:
+        return sum(len(members) for members in self._keys_by_member.values())
+
+
+# Shared by the event listeners and every command that looks members up by name
+member_index = MemberNameIndex()
+
+
+async def find_members_by_name(guild: discord.Guild, name: str) -> List[discord.Member]:
+    """
+    Find guild members whose username or nickname matches name exactly (case-insensitive).
+
+    Served from the index; if nothing matches and the guild's member list is
+    not fully cached, Discord is asked for members with that username prefix
+    and the results are indexed.
+
+    Args:
+        guild: The guild to search
+        name: The username or nickname
+
+    Returns:
+        The matching members
+    """
+    ids = member_index.exact(guild.id, name)
+    if not ids and not guild.chunked:
+        try:
+            for member in await guild.query_members(query=name, limit=100, cache=True):
+                member_index.add(member)
+        except (asyncio.TimeoutError, discord.ClientException):
+            pass
+        ids = member_index.exact(guild.id, name)
+    return [member for member in map(guild.get_member, ids) if member]
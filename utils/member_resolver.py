@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import discord
+from typing import Dict, Iterable, List, Optional
+from database.dtos import UserDTO
+
+logger = logging.getLogger(__name__)
+
+# Discord caps a gateway member query at 100 user IDs
+QUERY_BATCH_SIZE = 100
+
+
+async def resolve_members(guild: discord.Guild, user_ids: Iterable[int], concurrency: int = 4) -> Dict[int, discord.Member]:
+    """
+    Resolve guild members by ID with as few Discord round trips as possible.
+
+    The gateway member cache is checked first; the misses are requested in
+    batches of up to 100 IDs per gateway query, at most `concurrency` at once.
+    If a batch query fails the batch falls back to REST fetch_member calls,
+    bounded by the same limit. Users that are not in the guild are left out.
+
+    Args:
+        guild: The guild to resolve members in
+        user_ids: Discord user IDs
+        concurrency: Maximum concurrent Discord requests
+
+    Returns:
+        Dict of user ID to member for every user that was found
+    """
+    resolved: Dict[int, discord.Member] = {}
+    missing: List[int] = []
+    for user_id in dict.fromkeys(user_ids):
+        member = guild.get_member(user_id)
+        if member:
+            resolved[user_id] = member
+        else:
+            missing.append(user_id)
+
+    if not missing:
+        return resolved
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(user_id: int) -> Optional[discord.Member]:
+        async with semaphore:
+            try:
+                return await guild.fetch_member(user_id)
+            except discord.HTTPException:
+                return None
+
+    async def fetch_batch(batch: List[int]) -> List[discord.Member]:
+        try:
+            async with semaphore:
+                return await guild.query_members(user_ids=batch, limit=len(batch), cache=True)
+        except (asyncio.TimeoutError, discord.ClientException) as e:
+            logger.warning(f"Member query failed, falling back to REST: {str(e)}")
+            members = await asyncio.gather(*(fetch_one(user_id) for user_id in batch))
+            return [member for member in members if member]
+
+    batches = [missing[i:i + QUERY_BATCH_SIZE] for i in range(0, len(missing), QUERY_BATCH_SIZE)]
+    for members in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+        for member in members:
+            resolved[member.id] = member
+
+    return resolved
+
+
+async def resolve_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """
+    Resolve a single guild member by ID, cache first.
+
+    Args:
+        guild: The guild to resolve the member in
+        user_id: The Discord user ID
+
+    Returns:
+        The member, or None if they are not in the guild
+    """
+    return (await resolve_members(guild, [user_id])).get(user_id)
+
+
+def display_name(user_id: int, members: Dict[int, discord.Member], user: Optional[UserDTO] = None) -> str:
+    """
+    Best available name for a user: the live member name, then the name stored
+    in the users table, then the raw ID.
+    """
+    member = members.get(user_id)
+    if member:
+        return member.name
+    if user:
+        return user.display_name or user.username
+    return str(user_id)
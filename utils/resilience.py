@@ -0,0 +1,183 @@
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a token cannot be acquired within the allowed wait."""
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. The bucket
+    can also be paused until a given time, e.g. when the upstream reports that
+    its own limit is exhausted.
+    """
+    def __init__(self, rate: float, capacity: int, timer: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+            timer: Monotonic clock, replaceable for testing
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._timer = timer
+        self._tokens = float(capacity)
+        self._updated = timer()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.rejected = 0
+
+    def _refill(self, now: float) -> None:
+        if now <= self._updated:
+            return
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, now: float) -> float:
+        """Seconds until the next unreserved token is available (0 if one is available now)."""
+        # While paused _updated lies in the future, so nothing refills before then
+        self._refill(now)
+        return max(0.0, self._updated - now) + max(0.0, 1 - self._tokens) / self.rate
+
+    async def acquire(self, max_wait: float) -> None:
+        """
+        Take one token, waiting up to max_wait seconds for it.
+
+        The token is reserved up front and only the wait for it happens outside
+        the lock, so concurrent callers queue behind each other's reservations
+        instead of behind one sleeping caller.
+
+        Raises:
+            RateLimitExceeded: If no token becomes available in time
+        """
+        async with self._lock:
+            wait = self._wait_time(self._timer())
+            if wait > max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(f"rate limited for another {wait:.1f}s")
+            self._tokens -= 1
+            self.acquired += 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds` and drain the bucket."""
+        now = self._timer()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+    def stats(self) -> Dict[str, Any]:
+        """Token and rejection counters."""
+        now = self._timer()
+        return {
+            'tokens': round(min(self.capacity, self._tokens + max(0.0, now - self._updated) * self.rate), 2),
+            'capacity': self.capacity,
+            'paused_for': max(0.0, self._paused_until - now),
+            'acquired': self.acquired,
+            'rejected': self.rejected,
+        }
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Closed: calls pass. After `failure_threshold` consecutive failures it opens
+    and rejects calls for `reset_timeout` seconds, then half-opens to let a
+    single probe through; the probe's outcome closes or re-opens it.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, timer: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to stay open before allowing a probe
+            timer: Monotonic clock, replaceable for testing
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._timer = timer
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._timer() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a probe is already running
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(f"circuit {state}")
+
+    def release(self) -> None:
+        """Give back a half-open probe slot when the call never reached upstream."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+            self._state = self.OPEN
+            self._opened_at = self._timer()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current state and counters."""
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'rejected': self.rejected,
+            'times_opened': self.times_opened,
+        }
+
+
+def backoff_delay(attempt: int, base: float, cap: float, floor: Optional[float] = None) -> float:
+    """
+    Full-jitter exponential backoff delay for a retry attempt (0-based).
+
+    Args:
+        attempt: How many retries have already been made
+        base: Delay scale in seconds
+        cap: Maximum delay in seconds
+        floor: Minimum delay, e.g. a server-provided Retry-After
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    return max(delay, floor or 0.0)
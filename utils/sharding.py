@@ -0,0 +1,176 @@
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import discord
+from config import BOT_SHARDED, BOT_SHARD_COUNT, BOT_SHARD_IDS
+
+
+def parse_shard_ids(spec: Optional[str]) -> Optional[List[int]]:
+    """
+    Parse a shard ID list such as "0-3", "0,2,4" or "0-1,6".
+
+    Returns:
+        Sorted shard IDs, or None if spec is empty
+    """
+    if not spec or not spec.strip():
+        return None
+    shard_ids = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = (int(bound) for bound in part.split('-', 1))
+            if end < start:
+                raise ValueError(f"Invalid shard ID range '{part}'")
+            shard_ids.update(range(start, end + 1))
+        elif part:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+
+def get_shard_options() -> dict:
+    """
+    Keyword arguments for the bot constructor: shard count and the shard IDs
+    this process runs. Empty unless sharding is enabled.
+    """
+    if not BOT_SHARDED:
+        return {}
+    shard_ids = parse_shard_ids(BOT_SHARD_IDS)
+    if shard_ids is not None:
+        if BOT_SHARD_COUNT is None:
+            raise ValueError("BOT_SHARD_IDS requires BOT_SHARD_COUNT")
+        if shard_ids[-1] >= BOT_SHARD_COUNT:
+            raise ValueError(f"BOT_SHARD_IDS must be below BOT_SHARD_COUNT ({BOT_SHARD_COUNT})")
+    return {'shard_count': BOT_SHARD_COUNT, 'shard_ids': shard_ids}
+
+
+def shard_id_for(guild_id: int, shard_count: Optional[int]) -> int:
+    """The shard Discord delivers a guild's events to."""
+    return (guild_id >> 22) % (shard_count or 1)
+
+
+def local_shard_ids(bot: discord.Client) -> List[int]:
+    """The shards this process runs."""
+    if isinstance(bot, discord.AutoShardedClient):
+        return list(bot.shard_ids or range(bot.shard_count or 1))
+    return [bot.shard_id or 0]
+
+
+def owns_guild(bot: discord.Client, guild_id: int) -> bool:
+    """Whether the guild's shard runs in this process (so it is in the local cache)."""
+    return shard_id_for(guild_id, bot.shard_count) in local_shard_ids(bot)
+
+
+def get_local_guild(bot: discord.Client, guild_id: int) -> Optional[discord.Guild]:
+    """
+    Get a guild from the cache if its shard runs in this process.
+
+    Returns None when another process owns the guild, so callers fall back to
+    routes that work from any shard (DMs, REST) instead of assuming the guild
+    is missing.
+    """
+    if not owns_guild(bot, guild_id):
+        return None
+    return bot.get_guild(guild_id)
+
+
+def _shard_sockets(bot: discord.Client) -> Dict[int, Optional[discord.gateway.DiscordWebSocket]]:
+    if isinstance(bot, discord.AutoShardedClient):
+        return {shard_id: shard._parent.ws for shard_id, shard in bot.shards.items()}
+    return {bot.shard_id or 0: bot.ws}
+
+
+@dataclass(slots=True)
+class ShardStats:
+    shard_id: int
+    latency: float = float('nan')
+    event_rate: float = 0.0
+    events: int = 0
+    connects: int = 0
+    resumes: int = 0
+    disconnects: int = 0
+    last_connected: Optional[float] = None
+    last_sequence: Optional[int] = None
+    last_sampled: Optional[float] = None
+
+    @property
+    def reconnects(self) -> int:
+        """Sessions re-established after the first one, by resume or fresh identify."""
+        return self.resumes + max(self.connects - 1, 0)
+
+
+@dataclass(slots=True)
+class ShardMetrics:
+    """
+    Per-shard latency, gateway event rate and reconnect counters.
+
+    Events are counted from each shard's gateway sequence number, which
+    increases by one per dispatched event within a session, so sampling it
+    periodically costs nothing per event.
+    """
+    shards: Dict[int, ShardStats] = field(default_factory=dict)
+
+    def _stats(self, shard_id: Optional[int]) -> ShardStats:
+        shard_id = shard_id or 0
+        stats = self.shards.get(shard_id)
+        if stats is None:
+            stats = self.shards[shard_id] = ShardStats(shard_id)
+        return stats
+
+    def record_connect(self, shard_id: Optional[int]) -> None:
+        stats = self._stats(shard_id)
+        stats.connects += 1
+        stats.last_connected = time.time()
+        # A fresh session restarts the sequence
+        stats.last_sequence = None
+
+    def record_resume(self, shard_id: Optional[int]) -> None:
+        stats = self._stats(shard_id)
+        stats.resumes += 1
+        stats.last_connected = time.time()
+
+    def record_disconnect(self, shard_id: Optional[int]) -> None:
+        self._stats(shard_id).disconnects += 1
+
+    def sample(self, bot: discord.Client) -> None:
+        """Read latency and the event sequence of every local shard."""
+        now = time.monotonic()
+        for shard_id, ws in _shard_sockets(bot).items():
+            stats = self._stats(shard_id)
+            if ws is None:
+                continue
+            stats.latency = ws.latency
+            sequence = ws.sequence
+            if sequence is None:
+                continue
+
+            previous = stats.last_sequence
+            # Sequence resets on a new session; count from zero then
+            delta = sequence - previous if previous is not None and sequence >= previous else sequence
+            if stats.last_sampled is not None and now > stats.last_sampled:
+                stats.event_rate = delta / (now - stats.last_sampled)
+            stats.events += delta
+            stats.last_sequence = sequence
+            stats.last_sampled = now
+
+    def describe(self, bot: discord.Client) -> List[str]:
+        """One line per local shard: guilds, latency, event rate and reconnects."""
+        guild_counts: Dict[int, int] = {}
+        for guild in bot.guilds:
+            shard_id = guild.shard_id or 0
+            guild_counts[shard_id] = guild_counts.get(shard_id, 0) + 1
+
+        lines = []
+        for shard_id in local_shard_ids(bot):
+            stats = self._stats(shard_id)
+            latency = 'n/a' if not math.isfinite(stats.latency) else f"{stats.latency * 1000:.0f} ms"
+            lines.append(
+                f"Shard {shard_id}: {guild_counts.get(shard_id, 0)} guilds, latency {latency}, "
+                f"{stats.event_rate:.1f} events/s ({stats.events} total), "
+                f"{stats.reconnects} reconnects, {stats.disconnects} disconnects"
+            )
+        return lines
+
+
+# Fed by the ShardEvents cog
+shard_metrics = ShardMetrics()
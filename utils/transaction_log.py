@@ -0,0 +1,207 @@
+import asyncio
+import datetime
+import logging
+import discord
+from typing import Any, Dict, List, Optional
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from config import TRANSACTION_LOG_BATCH_SIZE, TRANSACTION_LOG_FLUSH_INTERVAL, TRANSACTION_LOG_QUEUE_SIZE
+from database.models.transaction import ActionType
+from database.repository.transaction import TransactionRepository
+from utils.resilience import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Queued by close() so the writer flushes what it has and exits
+_STOP = object()
+
+
+class TransactionLog:
+    """
+    Asynchronous, batched writer for the transaction audit log.
+
+    record() only puts the entry on an in-memory queue and never waits; a
+    background task writes the queue out in multi-row inserts once
+    batch_size records are waiting or flush_interval seconds after the first
+    one arrived. When the queue is full the new record is dropped and
+    counted, so a stalled database never blocks commands. A batch that fails
+    is dropped and counted too, and a writer that dies anyway is restarted.
+    close() flushes everything still queued.
+    """
+    MAX_RETRIES = 3
+
+    def __init__(self, repository: Optional[TransactionRepository] = None,
+                 batch_size: int = TRANSACTION_LOG_BATCH_SIZE,
+                 flush_interval: float = TRANSACTION_LOG_FLUSH_INTERVAL,
+                 max_queue: int = TRANSACTION_LOG_QUEUE_SIZE):
+        self.repository = repository or TransactionRepository()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.overflowed = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Start the background writer."""
+        if self._task is None:
+            self._closed = False
+            self._spawn()
+
+    def _spawn(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_writer_done)
+
+    def _on_writer_done(self, task: asyncio.Task) -> None:
+        # The writer only returns on close(); anything else is a crash
+        if task.cancelled() or self._closed:
+            return
+        logger.error("Transaction log writer stopped unexpectedly, restarting", exc_info=task.exception())
+        self.restarts += 1
+        self._spawn()
+
+    def record(self, action_type: ActionType, actor: discord.abc.User, team_id: Optional[int] = None,
+               user_id: Optional[int] = None, **details: Any) -> None:
+        """
+        Queue an audit record. Never waits; drops the record if the queue is full.
+
+        Args:
+            action_type: What happened
+            actor: The user who did it; their name is kept so the writer can
+                create a users row for actors who have none (e.g. admins)
+            team_id: The team it happened to, if any
+            user_id: The Discord ID of the user it happened to, if any
+            **details: JSON-serializable extra information
+        """
+        if self._closed:
+            logger.warning(f"Transaction log closed, dropping {action_type.value} record by {actor.id}")
+            self.dropped += 1
+            return
+
+        entry = {
+            'action_type': action_type,
+            'actor_id': actor.id,
+            'actor_username': actor.name,
+            'actor_display_name': actor.display_name,
+            'team_id': team_id,
+            'user_id': user_id,
+            'details': details or None,
+            # Stamped now: the row is written later
+            'timestamp': datetime.datetime.now(),
+        }
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.overflowed += 1
+            self.dropped += 1
+            logger.warning(f"Transaction log queue full, dropping {action_type.value} record by {actor.id}")
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            # A failing batch is dropped; the writer keeps going
+            try:
+                stopping = await self._fill(batch)
+                await self._write(batch)
+            except Exception as e:
+                logger.exception(f"Dropping {len(batch)} transaction log records: {str(e)}")
+                self.dropped += len(batch)
+
+    async def _fill(self, batch: List[Dict[str, Any]]) -> bool:
+        """Add queued records to batch until it is full or flush_interval passed; True on the stop marker."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                entry = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if entry is _STOP:
+                return True
+            batch.append(entry)
+        return False
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                self.written += await self.repository.insert_many(batch)
+                self.batches += 1
+                return
+            except IntegrityError:
+                # One bad row (e.g. a team deleted meanwhile) must not sink the batch
+                await self._write_each(batch)
+                return
+            except (SQLAlchemyError, OSError) as e:
+                if attempt == self.MAX_RETRIES:
+                    logger.error(f"Dropping {len(batch)} transaction log records after {attempt + 1} attempts: {str(e)}")
+                    self.dropped += len(batch)
+                    return
+                logger.warning(f"Transaction log write failed, retrying: {str(e)}")
+                await asyncio.sleep(backoff_delay(attempt, 0.5, 10.0))
+
+    async def _write_each(self, batch: List[Dict[str, Any]]) -> None:
+        for entry in batch:
+            try:
+                self.written += await self.repository.insert_many([entry])
+            except Exception as e:
+                logger.warning(f"Dropping transaction log record {entry['action_type'].value} by {entry['actor_id']}: {str(e)}")
+                self.dropped += 1
+        self.batches += 1
+
+    async def close(self, timeout: float = 30.0) -> None:
+        """Stop accepting records and flush everything queued."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.put(_STOP), timeout)
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Transaction log did not flush within {timeout}s, {self._queue.qsize()} records lost")
+            self._task.cancel()
+        except Exception as e:
+            # Crashed after close() was called, so it was not restarted
+            logger.error(f"Transaction log writer failed while closing: {str(e)}")
+        self._task = None
+
+        # Whatever a failed or timed out writer left behind
+        leftover = []
+        while not self._queue.empty():
+            entry = self._queue.get_nowait()
+            if entry is not _STOP:
+                leftover.append(entry)
+        if leftover:
+            try:
+                await self._write(leftover)
+            except Exception as e:
+                logger.error(f"Dropping {len(leftover)} transaction log records: {str(e)}")
+                self.dropped += len(leftover)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'overflowed': self.overflowed,
+            'restarts': self.restarts,
+        }
+
+
+# Shared by every cog; started and closed by the bot
+transaction_log = TransactionLog()
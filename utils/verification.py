@@ -1,7 +1,9 @@
 import discord
-from typing import Optional, Dict, Any, Callable, Awaitable
+import asyncio
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Awaitable, List
 from database.repository.user_repository import UserRepository
-from utils.bloxlink import BloxlinkAPI
+from utils.bloxlink import BloxlinkAPI, BloxlinkUnavailableError
 import functools
 import logging
 
@@ -25,15 +27,27 @@ async def ensure_user_verified(ctx: discord.ApplicationContext, target_user: dis
     user = target_user or ctx.author
     guild = ctx.guild
     
+    # Fast path: known-verified users need no I/O at all
+    if await user_repository.is_known_verified(user.id):
+        return True
+    
     # Check if user exists in database
-    db_user = user_repository.get_by_id(user.id)
+    db_user = await user_repository.get_by_id(user.id)
     
     # If user already exists and is verified, we're good
     if db_user and db_user.is_roblox_verified:
+        await user_repository.track_verification(db_user)
         return True
         
     # Either user doesn't exist or isn't marked as verified, check with Bloxlink
-    verified, bloxlink_data = await BloxlinkAPI.get_roblox_user(guild.id, user.id)
+    try:
+        verified, bloxlink_data = await BloxlinkAPI.get_roblox_user(guild.id, user.id)
+    except BloxlinkUnavailableError as e:
+        # Upstream is unhealthy: fall back to what the database knows, which at
+        # this point is that the user is not (yet) verified
+        logger.warning(f"Bloxlink unavailable, falling back to stored verification state: {str(e)}")
+        await ctx.respond(f"Bloxlink verification is temporarily unavailable and {user.mention} is not verified in our records yet. Please try again in a few minutes.", ephemeral=True)
+        return False
     
     if not verified:
         # User is not verified with Bloxlink
@@ -53,13 +67,13 @@ async def ensure_user_verified(ctx: discord.ApplicationContext, target_user: dis
             
         # Update or create user in database
         if db_user:
-            user_repository.update_roblox_verification(
+            await user_repository.update_roblox_verification(
                 user_id=user.id,
                 is_verified=True,
                 roblox_username=roblox_username
             )
         else:
-            user_repository.create(
+            await user_repository.create(
                 user_id=user.id,
                 username=user.name,
                 display_name=user.display_name,
@@ -99,3 +113,101 @@ def require_verification(target_param: str = None):
             return await func(self, ctx, *args, **kwargs)
         return wrapper
     return decorator
+
+
+@dataclass(slots=True)
+class SweepProgress:
+    """Running totals for a guild verification sweep."""
+    total: int
+    processed: int = 0
+    already_verified: int = 0
+    verified: int = 0
+    not_verified: int = 0
+    failed: int = 0
+    aborted: bool = False
+    
+    def describe(self) -> str:
+        status = "aborted (Bloxlink unavailable)" if self.aborted else ("done" if self.processed >= self.total else "running")
+        return (
+            f"Verification sweep {status}: {self.processed}/{self.total} members checked\n"
+            f"Already verified: {self.already_verified} | Newly verified: {self.verified} | "
+            f"Not verified: {self.not_verified} | Failed: {self.failed}"
+        )
+
+
+async def sweep_guild_verification(
+    guild: discord.Guild,
+    on_progress: Callable[[SweepProgress], Awaitable[None]] = None,
+    chunk_size: int = 200,
+    concurrency: int = 8
+) -> SweepProgress:
+    """
+    Verify every member of a guild against Bloxlink.
+    
+    Members are processed in chunks: users already verified in the database are
+    skipped, the rest are looked up with at most `concurrency` requests in flight,
+    and the newly verified ones are written with one bulk upsert per chunk.
+    
+    Args:
+        guild: The guild to sweep
+        on_progress: Awaited after each chunk with the running totals
+        chunk_size: Members per chunk
+        concurrency: Maximum concurrent Bloxlink lookups
+        
+    Returns:
+        The final totals
+    """
+    if not guild.chunked:
+        await guild.chunk()
+    
+    members = [member for member in guild.members if not member.bot]
+    progress = SweepProgress(total=len(members))
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def lookup(member: discord.Member) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            verified, bloxlink_data = await BloxlinkAPI.get_roblox_user(guild.id, member.id)
+        if not verified or not bloxlink_data.get('robloxID'):
+            return None
+        roblox_id = bloxlink_data['robloxID']
+        return {
+            'user_id': member.id,
+            'username': member.name,
+            'display_name': member.display_name,
+            'roblox_username': bloxlink_data.get('robloxUsername', f'RobloxUser_{roblox_id}'),
+        }
+    
+    for start in range(0, len(members), chunk_size):
+        chunk = members[start:start + chunk_size]
+        
+        already_verified = await user_repository.get_verified_ids([member.id for member in chunk])
+        pending = [member for member in chunk if member.id not in already_verified]
+        progress.already_verified += len(already_verified)
+        
+        results = await asyncio.gather(*(lookup(member) for member in pending), return_exceptions=True)
+        
+        rows: List[Dict[str, Any]] = []
+        for result in results:
+            if isinstance(result, BloxlinkUnavailableError):
+                progress.failed += 1
+            elif isinstance(result, BaseException):
+                logger.error(f"Error verifying guild member: {str(result)}")
+                progress.failed += 1
+            elif result is None:
+                progress.not_verified += 1
+            else:
+                rows.append(result)
+        
+        progress.verified += await user_repository.bulk_upsert_verified(rows)
+        progress.processed += len(chunk)
+        
+        # Stop early rather than hammering Bloxlink when it is down
+        if pending and all(isinstance(result, BloxlinkUnavailableError) for result in results):
+            progress.aborted = True
+        
+        if on_progress:
+            await on_progress(progress)
+        if progress.aborted:
+            break
+    
+    return progress